@@ -0,0 +1,298 @@
+import math
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from models import DifficultyLevel
+
+LEVELS = (DifficultyLevel.EASY, DifficultyLevel.MEDIUM, DifficultyLevel.HARD)
+
+# Starting difficulty of each level on the ability (logit) scale
+LEVEL_PRIORS = {
+    DifficultyLevel.EASY: -1.0,
+    DifficultyLevel.MEDIUM: 0.0,
+    DifficultyLevel.HARD: 1.0,
+}
+
+# The level whose difficulty stays at its prior, fixing the origin of the scale
+ANCHOR_LEVEL = DifficultyLevel.MEDIUM
+
+# Estimates are kept within this range so a run of extreme scores cannot run away
+ABILITY_BOUND = 4.0
+
+# (question_id, level, score) for one answered question; id and level are None when unknown
+AnsweredItem = Tuple[Optional[str], Optional[DifficultyLevel], int]
+
+
+def expected_score(ability: float, difficulty: float) -> float:
+    """Expected score, as a fraction, of a candidate on a question (Rasch model)"""
+    return 1.0 / (1.0 + math.exp(difficulty - ability))
+
+
+class AbilityEstimate(NamedTuple):
+    """Gaussian estimate of a candidate's ability after `answers` scored answers"""
+    mean: float = 0.0
+    variance: float = 1.0
+    answers: int = 0
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class _Calibration:
+    """Calibrated difficulty of a level, or offset of a question from its level"""
+    __slots__ = ("difficulty", "answers", "level")
+
+    def __init__(self, difficulty: float, level: Optional[DifficultyLevel] = None):
+        self.difficulty = difficulty
+        self.answers = 0
+        self.level = level
+
+
+class AdaptiveDifficulty:
+    """
+    IRT-style adaptive difficulty: a Rasch model with Elo-style updates
+
+    Abilities and difficulties share one logit scale. A candidate of
+    ability θ is expected to score 100·σ(θ − b) on a question of
+    difficulty b. Each score updates the session's estimate with one
+    Newton step of a Gaussian approximation to the posterior, so the mean
+    and standard error are maintained incrementally. `score_weight` sets
+    how much one graded score counts relative to a pass/fail outcome.
+
+    Question and level difficulties are calibrated from the same outcomes
+    with Elo updates whose step shrinks as a difficulty accumulates
+    answers. The medium level stays at 0 to pin the scale; a question is
+    its level's difficulty plus an offset, centred so offsets average 0
+    per level and shrunk towards 0 while the question has few answers
+    (its level counts as `item_prior_answers` answers). Early estimates
+    are pulled towards the prior, which would compress calibrated
+    difficulties towards the middle, so a session's answers are held
+    until its standard error is at most `calibration_stderr` and
+    calibrated against that estimate with the prior's pull removed.
+
+    The next difficulty is the level with the most Fisher information at
+    the current estimate, σ(1 − σ), i.e. where the expected score is
+    closest to 50. An estimate is stable once its standard error is at
+    most `stable_stderr`. Estimates are cached per session (LRU,
+    `max_sessions`) and rebuilt from the session's scores when missing,
+    e.g. after a restart or on another worker.
+    """
+
+    def __init__(
+        self,
+        prior_variance: float = 1.0,
+        score_weight: float = 4.0,
+        stable_stderr: float = 0.35,
+        calibration_stderr: float = 0.5,
+        calibration_rate: float = 0.3,
+        min_calibration_rate: float = 0.02,
+        item_prior_answers: int = 20,
+        max_sessions: int = 10000,
+        max_items: int = 50000
+    ):
+        self.prior_variance = prior_variance
+        self.score_weight = score_weight
+        self.stable_stderr = stable_stderr
+        self.calibration_stderr = calibration_stderr
+        self.calibration_rate = calibration_rate
+        self.min_calibration_rate = min_calibration_rate
+        self.item_prior_answers = item_prior_answers
+        self.max_sessions = max_sessions
+        self.max_items = max_items
+        self._levels: Dict[DifficultyLevel, _Calibration] = {
+            level: _Calibration(LEVEL_PRIORS[level]) for level in LEVELS
+        }
+        self._items: "OrderedDict[str, _Calibration]" = OrderedDict()
+        # Sum of question offsets per level, for centring them
+        self._offsets: Dict[DifficultyLevel, float] = {level: 0.0 for level in LEVELS}
+        self._offset_counts: Dict[DifficultyLevel, int] = {level: 0 for level in LEVELS}
+        # Session id -> (estimate, answers awaiting calibration; None once calibrating directly)
+        self._sessions: "OrderedDict[str, Tuple[AbilityEstimate, Optional[List[AnsweredItem]]]]" = OrderedDict()
+        self.observed = 0
+        self.rebuilt = 0
+
+    def prior(self) -> AbilityEstimate:
+        return AbilityEstimate(0.0, self.prior_variance, 0)
+
+    def item_difficulty(self, question_id: Optional[str], level: Optional[DifficultyLevel]) -> float:
+        """Calibrated difficulty of a question, else of its level (medium when unknown)"""
+        item = self._items.get(question_id) if question_id else None
+        if item is None:
+            return self._levels[level or ANCHOR_LEVEL].difficulty
+        offset = item.difficulty - self._offsets[item.level] / self._offset_counts[item.level]
+        weight = item.answers / (item.answers + self.item_prior_answers)
+        return self._levels[item.level].difficulty + weight * offset
+
+    def update(self, estimate: AbilityEstimate, difficulty: float, score: int) -> AbilityEstimate:
+        """The estimate after one more score on a question of the given difficulty"""
+        outcome = min(max(score, 0), 100) / 100
+        expected = expected_score(estimate.mean, difficulty)
+        variance = 1.0 / (1.0 / estimate.variance + self.score_weight * expected * (1.0 - expected))
+        mean = estimate.mean + variance * self.score_weight * (outcome - expected)
+        return AbilityEstimate(min(max(mean, -ABILITY_BOUND), ABILITY_BOUND), variance, estimate.answers + 1)
+
+    def estimate(self, session_id: str, answers: int, history: Callable[[], Iterable[AnsweredItem]]) -> AbilityEstimate:
+        """
+        The session's current estimate
+
+        Served from the cache when it covers all `answers`, otherwise
+        rebuilt by folding `history()`, the session's answers in order.
+        """
+        cached = self._sessions.get(session_id)
+        if cached is not None and cached[0].answers == answers:
+            self._sessions.move_to_end(session_id)
+            return cached[0]
+        estimate = self.prior()
+        for question_id, level, score in history():
+            estimate = self.update(estimate, self.item_difficulty(question_id, level), score)
+        if answers:
+            self.rebuilt += 1
+        # Answers folded in here were calibrated when they were recorded, if at all
+        self._remember(session_id, estimate, [])
+        return estimate
+
+    def observe(
+        self,
+        session_id: str,
+        estimate: AbilityEstimate,
+        question_id: Optional[str],
+        level: Optional[DifficultyLevel],
+        score: int
+    ) -> AbilityEstimate:
+        """Fold a new score into the session's estimate and calibrate the question and level"""
+        self.observed += 1
+        cached = self._sessions.get(session_id)
+        pending = cached[1] if cached is not None else []
+        updated = self.update(estimate, self.item_difficulty(question_id, level), score)
+        if level is not None:
+            if pending is None:
+                self._calibrate(question_id, level, self._unshrunk(estimate), score)
+            else:
+                pending.append((question_id, level, score))
+        if pending is not None and updated.stderr <= self.calibration_stderr:
+            ability = self._unshrunk(updated)
+            for answered in pending:
+                self._calibrate(*answered[:2], ability, answered[2])
+            pending = None
+        self._remember(session_id, updated, pending)
+        return updated
+
+    def _unshrunk(self, estimate: AbilityEstimate) -> float:
+        # The posterior mean is the likelihood's estimate scaled by 1 - variance/prior_variance
+        return estimate.mean / max(1.0 - estimate.variance / self.prior_variance, 0.5)
+
+    def _calibrate(self, question_id: Optional[str], level: DifficultyLevel, ability: float, score: int):
+        item = None
+        if question_id:
+            item = self._items.get(question_id)
+            if item is None:
+                item = self._items[question_id] = _Calibration(0.0, level)
+                self._offset_counts[level] += 1
+                while len(self._items) > self.max_items:
+                    evicted = self._items.popitem(last=False)[1]
+                    self._offsets[evicted.level] -= evicted.difficulty
+                    self._offset_counts[evicted.level] -= 1
+        residual = min(max(score, 0), 100) / 100 - expected_score(ability, self.item_difficulty(question_id, level))
+        if item is not None:
+            step = self._step(item, residual)
+            self._offsets[item.level] += step
+        if level == ANCHOR_LEVEL:
+            self._levels[level].answers += 1
+        else:
+            self._step(self._levels[level], residual)
+
+    def _step(self, entry: _Calibration, residual: float) -> float:
+        # Elo step, smaller for entries calibrated from more answers
+        step = -max(self.calibration_rate / (1 + entry.answers / 10), self.min_calibration_rate) * residual
+        entry.difficulty += step
+        entry.answers += 1
+        return step
+
+    def _remember(self, session_id: str, estimate: AbilityEstimate, pending: Optional[List[AnsweredItem]]):
+        self._sessions[session_id] = (estimate, pending)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def information(self, estimate: AbilityEstimate, difficulty: float) -> float:
+        """Fisher information of a question of the given difficulty at the current estimate"""
+        expected = expected_score(estimate.mean, difficulty)
+        return expected * (1.0 - expected)
+
+    def next_difficulty(self, estimate: AbilityEstimate) -> DifficultyLevel:
+        """The most informative level"""
+        return max(LEVELS, key=lambda level: self.information(estimate, self._levels[level].difficulty))
+
+    def difficulty_after(
+        self,
+        estimate: AbilityEstimate,
+        question_id: Optional[str],
+        level: Optional[DifficultyLevel],
+        score: int
+    ) -> DifficultyLevel:
+        """The level that would follow this score, without recording it"""
+        return self.next_difficulty(self.update(estimate, self.item_difficulty(question_id, level), score))
+
+    def likely_difficulties(
+        self,
+        estimate: AbilityEstimate,
+        question_id: Optional[str],
+        level: Optional[DifficultyLevel],
+        spread: int = 20
+    ) -> List[DifficultyLevel]:
+        """
+        The levels most likely to follow the pending answer
+
+        The level after the expected score first, then the levels after a
+        score `spread` points below or above it, at most two in all.
+        """
+        expected = round(100 * expected_score(estimate.mean, self.item_difficulty(question_id, level)))
+        levels: List[DifficultyLevel] = []
+        for score in (expected, expected - spread, expected + spread):
+            after = self.difficulty_after(estimate, question_id, level, min(max(score, 0), 100))
+            if after not in levels:
+                levels.append(after)
+        return levels[:2]
+
+    def item_ranker(self, estimate: AbilityEstimate, level: DifficultyLevel) -> Callable[[str], float]:
+        """Information of each question id at the current estimate, for choosing between bank items"""
+        return lambda question_id: self.information(estimate, self.item_difficulty(question_id, level))
+
+    def is_stable(self, estimate: AbilityEstimate) -> bool:
+        return estimate.stderr <= self.stable_stderr
+
+    def summary(self, estimate: AbilityEstimate) -> dict:
+        """An estimate as reported with session statistics"""
+        return {
+            "ability": round(estimate.mean, 3),
+            "stderr": round(estimate.stderr, 3),
+            "stable": self.is_stable(estimate),
+            "next_difficulty": self.next_difficulty(estimate).value,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "levels": {
+                level.value: {"difficulty": round(entry.difficulty, 3), "answers": entry.answers}
+                for level, entry in self._levels.items()
+            },
+            "calibrated_questions": len(self._items),
+            "tracked_sessions": len(self._sessions),
+            "observed": self.observed,
+            "rebuilt": self.rebuilt,
+        }
+
+
+def create_adaptive_difficulty() -> Optional[AdaptiveDifficulty]:
+    """The engine configured by the ADAPTIVE_* settings, or None when ADAPTIVE_DIFFICULTY_ENABLED is off"""
+    if os.getenv("ADAPTIVE_DIFFICULTY_ENABLED", "true").lower() != "true":
+        return None
+    return AdaptiveDifficulty(
+        prior_variance=float(os.getenv("ADAPTIVE_PRIOR_VARIANCE", 1.0)),
+        score_weight=float(os.getenv("ADAPTIVE_SCORE_WEIGHT", 4.0)),
+        stable_stderr=float(os.getenv("ADAPTIVE_STABLE_STDERR", 0.35)),
+        max_sessions=int(os.getenv("ADAPTIVE_MAX_SESSIONS", 10000)),
+        max_items=int(os.getenv("ADAPTIVE_MAX_QUESTIONS", 50000)),
+    )
@@ -1,13 +1,21 @@
 import os
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterable, NamedTuple, Optional
 from dotenv import load_dotenv
-from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIModel
+
+# pydantic-ai and openai take most of the import time; they are only
+# imported when the agents are first built (see llm_agents below)
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from pydantic_ai.messages import ModelMessage, ModelResponse
+    from pydantic_ai.models import Model
 
 # Load environment variables
 load_dotenv()
 from models import (
+    GeneratedQuestion,
     QuestionResponse,
     AnswerFeedback,
     FeedbackDetail,
@@ -15,24 +23,61 @@ from models import (
     ExperienceLevel,
     DifficultyLevel
 )
+from question_pool import QuestionPool, PoolKey, make_pool_key
+from question_bank import open_question_bank
+from question_registry import make_question_id
+from near_duplicates import QuestionDeduplicator
+from prefetch import QuestionPrefetcher
+from eval_cache import EvaluationCache, evaluation_key
+from http_client import create_llm_http_client, llm_timeout
+from singleflight import SingleFlight
+from hedging import HedgedModels
+from lazy_init import LazyInit
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from evaluation_jobs import EvaluationJobs
+from metrics import llm_agent_run_duration, llm_retries, llm_fallbacks
+from scheduler import LLMScheduler, LLMOverloadedError, Priority
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenRouter model (free tier)
-def get_model():
-    """Get configured LLM model from OpenRouter"""
+# Single HTTP connection pool shared by every OpenRouter call
+llm_http_client = create_llm_http_client()
+
+# "openrouter", or "fake" for the deterministic offline stand-in (see fake_llm.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openrouter").lower()
+
+# OpenRouter models (free tier), primary first; slow or failed calls are hedged on the others
+LLM_MODELS = [
+    name.strip() for name in os.getenv(
+        "LLM_MODELS", "google/gemma-2-9b-it:free,meta-llama/llama-3-8b-instruct:free").split(",")
+    if name.strip()
+]
+
+def get_models() -> list[tuple[str, "Model"]]:
+    """Get the configured LLM model pool from OpenRouter"""
+    if LLM_BACKEND == "fake":
+        from fake_llm import create_fake_llm
+        logger.warning("LLM_BACKEND=fake: agents answer from the offline stand-in")
+        # One independently seeded stand-in per configured model name
+        return [(name, create_fake_llm(seed_offset=i).model()) for i, name in enumerate(LLM_MODELS)]
+
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY not found in environment")
+
+    from openai import AsyncOpenAI
+    from pydantic_ai.models.openai import OpenAIModel
     
-    # Using a free model from OpenRouter
-    # Options: google/gemma-2-9b-it:free, meta-llama/llama-3-8b-instruct:free
-    model = OpenAIModel(
-        "google/gemma-2-9b-it:free",
-        base_url="https://openrouter.ai/api/v1",
+    openai_client = AsyncOpenAI(
+        base_url=llm_http_client.base_url,
         api_key=api_key,
+        http_client=llm_http_client.client,
+        timeout=llm_timeout(),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
     )
-    return model
+    
+    # Every model shares one client, and with it one connection pool
+    return [(name, OpenAIModel(name, openai_client=openai_client)) for name in LLM_MODELS]
 
 # Agent Dependencies (context passed to agent)
 class InterviewContext:
@@ -49,11 +94,7 @@ class InterviewContext:
         self.experience_level = experience_level
         self.domain = domain
 
-# Question Generator Agent
-question_agent = Agent(
-    model=get_model(),
-    result_type=QuestionResponse,
-    system_prompt="""You are an expert technical interviewer with 15+ years of experience.
+QUESTION_SYSTEM_PROMPT = """You are an expert technical interviewer with 15+ years of experience.
     Your job is to generate thoughtful, relevant interview questions that:
     1. Match the candidate's experience level
     2. Are specific to the role and domain
@@ -66,15 +107,9 @@ question_agent = Agent(
     For HR interviews: Focus on career goals, company fit, motivations
     
     Generate ONE question at a time with clear context and expected topics to cover.
-    """,
-    retries=2,
-)
+    """
 
-# Feedback Generator Agent
-feedback_agent = Agent(
-    model=get_model(),
-    result_type=AnswerFeedback,
-    system_prompt="""You are a constructive interview coach providing detailed feedback.
+FEEDBACK_SYSTEM_PROMPT = """You are a constructive interview coach providing detailed feedback.
     
     Evaluate answers based on:
     1. Clarity - Is the answer well-structured and easy to follow?
@@ -96,9 +131,325 @@ feedback_agent = Agent(
     - Below 60: Significant gaps, needs work
     
     ALWAYS provide constructive feedback, even for poor answers.
-    """,
-    retries=2,
+    """
+
+class LLMAgents(NamedTuple):
+    """The model pool and both agents, built together on first use"""
+    models: HedgedModels
+    question_agent: "Agent"
+    feedback_agent: "Agent"
+
+def _build_agents() -> LLMAgents:
+    from pydantic_ai import Agent
+
+    # Hedged racing across the model pool, with per-model latency statistics
+    models = HedgedModels(
+        get_models(),
+        hedge_quantile=float(os.getenv("LLM_HEDGE_QUANTILE", 0.95)),
+        initial_deadline=float(os.getenv("LLM_HEDGE_INITIAL_DEADLINE_SECONDS", 8)),
+        min_deadline=float(os.getenv("LLM_HEDGE_MIN_DEADLINE_SECONDS", 1)),
+        max_deadline=float(os.getenv("LLM_HEDGE_MAX_DEADLINE_SECONDS", 30)),
+        enabled=os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true",
+    )
+    # Agents default to the primary model; streamed runs use it unhedged
+    llm_model = models.primary.model
+
+    # Question Generator Agent
+    question_agent = Agent(
+        model=llm_model,
+        result_type=GeneratedQuestion,
+        system_prompt=QUESTION_SYSTEM_PROMPT,
+        retries=2,
+    )
+
+    # Feedback Generator Agent
+    feedback_agent = Agent(
+        model=llm_model,
+        result_type=AnswerFeedback,
+        system_prompt=FEEDBACK_SYSTEM_PROMPT,
+        retries=2,
+    )
+    return LLMAgents(models, question_agent, feedback_agent)
+
+# Built on first use, or by the warm-up started in main's lifespan, so the
+# app boots (and answers health checks) without pydantic-ai or a key
+llm_agents: LazyInit[LLMAgents] = LazyInit("LLM agents", _build_agents)
+
+# Build the agents in the background at startup rather than on the first request
+LLM_AGENT_WARMUP = os.getenv("LLM_AGENT_WARMUP", "true").lower() == "true"
+
+async def warm_up_llm():
+    """Build the agents and open provider connections (not with the fake backend), off the startup path"""
+    if LLM_AGENT_WARMUP and check_agent_health():
+        try:
+            await llm_agents.aget()
+        except Exception as e:
+            logger.error(f"Agent warm-up failed: {str(e)}")
+    if LLM_BACKEND == "fake":
+        # The offline stand-in never calls the provider
+        return
+    await llm_http_client.warm_up(int(os.getenv("LLM_WARMUP_CONNECTIONS", 2)))
+
+def model_stats() -> dict:
+    """Hedging and per-model latency; empty until the model pool exists"""
+    return llm_agents.get().models.stats() if llm_agents.ready else {}
+
+# Identical prompts already in flight share one LLM call
+llm_singleflight = SingleFlight()
+
+# Bounded, prioritized admission for every LLM call
+llm_scheduler = LLMScheduler(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 8)),
+    max_queue_depth=int(os.getenv("LLM_MAX_QUEUE_DEPTH", 100)),
+    max_queue_wait=float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", 20)),
+)
+
+def _create_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        window_seconds=float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", 60)),
+        min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", 10)),
+        failure_rate_threshold=float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5)),
+        slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", 20)),
+        slow_rate_threshold=float(os.getenv("LLM_BREAKER_SLOW_RATE", 0.8)),
+        open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30)),
+    )
+
+# Per-agent breakers: while one is open its calls fail fast into the fallbacks
+question_breaker = _create_breaker("question")
+feedback_breaker = _create_breaker("feedback")
+
+def _count_retries(messages: list["ModelMessage"]) -> int:
+    """Result validation retries pydantic-ai sent back to the model during a run"""
+    from pydantic_ai.messages import ModelRequest, RetryPromptPart
+
+    return sum(
+        isinstance(part, RetryPromptPart)
+        for message in messages if isinstance(message, ModelRequest)
+        for part in message.parts
+    )
+
+async def _timed_run(
+    agents: LLMAgents,
+    agent: "Agent",
+    breaker: CircuitBreaker,
+    trial: Optional[int],
+    name: str,
+    prompt: str
+):
+    """One hedged agent.run, recorded in the agent latency histogram, retry counter and breaker"""
+    start = time.perf_counter()
+    try:
+        # Hedges are only sent while the scheduler has spare slots
+        result = await agents.models.run(
+            lambda model: agent.run(prompt, model=model), can_hedge=llm_scheduler.has_spare_capacity)
+    except asyncio.CancelledError:
+        llm_agent_run_duration.observe(time.perf_counter() - start, name, "cancelled")
+        raise
+    except Exception:
+        elapsed = time.perf_counter() - start
+        llm_agent_run_duration.observe(elapsed, name, "error")
+        breaker.record_failure(elapsed, trial)
+        raise
+    elapsed = time.perf_counter() - start
+    llm_agent_run_duration.observe(elapsed, name, "ok")
+    breaker.record_success(elapsed, trial)
+    retries = _count_retries(result.all_messages())
+    if retries:
+        llm_retries.inc(name, amount=retries)
+    return result
+
+async def run_question_agent(prompt: str, priority: Priority) -> QuestionResponse:
+    """Run question_agent through the scheduler, coalescing identical concurrent prompts"""
+    async def call() -> QuestionResponse:
+        agents = await llm_agents.aget()
+        # Checked before queueing, so an open breaker never waits for a slot
+        trial = question_breaker.check()
+        try:
+            result = await llm_scheduler.run(
+                priority,
+                lambda: _timed_run(agents, agents.question_agent, question_breaker, trial, "question", prompt))
+        except (LLMOverloadedError, asyncio.CancelledError):
+            # Admitted but never ran to an outcome
+            question_breaker.record_cancelled(trial)
+            raise
+        # The id is the server's to assign (see register_question)
+        return QuestionResponse(**result.data.model_dump())
+
+    # Only calls of equal priority are coalesced, so a live request never
+    # waits behind a shared background call
+    response = await llm_singleflight.do(("question", priority, prompt), call)
+    # Every waiter gets its own copy; callers set session_id on the result
+    return response.model_copy(deep=True)
+
+async def run_feedback_agent(prompt: str) -> AnswerFeedback:
+    """Run feedback_agent at evaluation priority, coalescing identical concurrent prompts"""
+    async def call() -> AnswerFeedback:
+        agents = await llm_agents.aget()
+        trial = feedback_breaker.check()
+        try:
+            result = await llm_scheduler.run(
+                Priority.EVALUATION,
+                lambda: _timed_run(agents, agents.feedback_agent, feedback_breaker, trial, "feedback", prompt))
+        except (LLMOverloadedError, asyncio.CancelledError):
+            feedback_breaker.record_cancelled(trial)
+            raise
+        return result.data
+
+    feedback = await llm_singleflight.do(("feedback", prompt), call)
+    return feedback.model_copy(deep=True)
+
+def target_difficulty(previous_score: Optional[int]) -> DifficultyLevel:
+    """Map the previous score onto the difficulty the next question should aim for"""
+    if previous_score is not None:
+        if previous_score >= 85:
+            return DifficultyLevel.HARD
+        if previous_score < 60:
+            return DifficultyLevel.EASY
+    return DifficultyLevel.MEDIUM
+
+DIFFICULTY_HINTS = {
+    DifficultyLevel.HARD: "The candidate is doing well. Increase difficulty slightly.",
+    DifficultyLevel.EASY: "The candidate is struggling. Ask a more fundamental question.",
+    DifficultyLevel.MEDIUM: "",
+}
+
+def build_question_prompt(
+    interview_type: InterviewType,
+    role: str,
+    experience_level: ExperienceLevel,
+    domain: Optional[str],
+    difficulty: DifficultyLevel,
+    avoid: Optional[str] = None
+) -> str:
+    """Build the question generation prompt"""
+    domain_text = f" with focus on {domain}" if domain else ""
+    difficulty_hint = DIFFICULTY_HINTS[difficulty]
+    avoid_hint = f"\nThe candidate was already asked this; ask about something different: {avoid}\n" if avoid else ""
+
+    return f"""Generate a {interview_type.value} interview question for a {experience_level.value}-level {role}{domain_text}.
+        
+{difficulty_hint}
+{avoid_hint}
+Return a structured question with:
+- question: The actual question to ask
+- context: Brief hint about what to focus on
+- difficulty: easy/medium/hard
+- expected_topics: List of 3-5 topics that should be covered in a good answer
+- time_limit_seconds: Reasonable time to answer (120-300 seconds)
+
+Make it realistic and interview-appropriate.
+"""
+
+async def _generate_question(
+    interview_type: InterviewType,
+    role: str,
+    experience_level: ExperienceLevel,
+    domain: Optional[str],
+    difficulty: DifficultyLevel,
+    priority: Priority,
+    avoid: Optional[str] = None
+) -> QuestionResponse:
+    """Run the question agent once. Raises on failure."""
+    prompt = build_question_prompt(interview_type, role, experience_level, domain, difficulty, avoid)
+
+    logger.info(f"Generating question for {role} - {interview_type.value}")
+
+    return await run_question_agent(prompt, priority)
+
+async def _generate_pooled_question(key: PoolKey) -> QuestionResponse:
+    """Question pool refill callback"""
+    interview_type, experience_level, difficulty, role, domain = key
+    response = await _generate_question(
+        interview_type, role, experience_level, domain, difficulty, Priority.BACKGROUND)
+    response.session_id = ""
+    return response
+
+# Pre-generated questions served ahead of live generation
+question_pool = QuestionPool(
+    _generate_pooled_question,
+    low_watermark=int(os.getenv("QUESTION_POOL_LOW_WATERMARK", 2)),
+    high_watermark=int(os.getenv("QUESTION_POOL_HIGH_WATERMARK", 5)),
+    idle_ttl_seconds=float(os.getenv("QUESTION_POOL_IDLE_TTL_SECONDS", 900)),
+    max_keys=int(os.getenv("QUESTION_POOL_MAX_KEYS", 256)),
+)
+QUESTION_POOL_ENABLED = os.getenv("QUESTION_POOL_ENABLED", "true").lower() == "true"
+
+# Near-duplicate detection: within a session (rejected) and across sessions (counted)
+question_dedup = QuestionDeduplicator(
+    threshold=float(os.getenv("DEDUP_THRESHOLD", 0.6)),
+    max_questions=int(os.getenv("DEDUP_MAX_QUESTIONS", 20000)),
+    enabled=os.getenv("DEDUP_ENABLED", "true").lower() == "true",
+)
+# Candidates tried per source before moving on
+DEDUP_MAX_ATTEMPTS = int(os.getenv("DEDUP_MAX_ATTEMPTS", 3))
+
+# Offline question bank (see build_question_bank.py): "prefer" serves banked
+# questions before the pool and live generation, "fallback" only when
+# generation fails or the question breaker is open
+question_bank = open_question_bank()
+QUESTION_BANK_MODE = os.getenv("QUESTION_BANK_MODE", "prefer").lower()
+
+def _bank_question(
+    key: PoolKey,
+    session_id: str,
+    seen_questions: list[str],
+    accept: Callable[[QuestionResponse, str], bool],
+    rank: Optional[Callable[[str], float]] = None
+) -> Optional[QuestionResponse]:
+    """A banked question for `key` the session has not seen and `accept` approves, or None"""
+    if question_bank is None:
+        return None
+    exclude = {make_question_id(question) for question in seen_questions}
+    for _ in range(DEDUP_MAX_ATTEMPTS):
+        question = question_bank.pick(key, exclude, rank=rank)
+        if question is None:
+            return None
+        question.session_id = session_id
+        if accept(question, "bank"):
+            return question
+        exclude.add(question.question_id)
+    return None
+
+def _served_without_llm(key: PoolKey) -> bool:
+    """Whether a question for `key` can come from the pool or the preferred bank"""
+    if QUESTION_POOL_ENABLED and question_pool.size(key):
+        return True
+    return question_bank is not None and QUESTION_BANK_MODE == "prefer" and question_bank.size(key) > 0
+
+# Next questions generated speculatively while an answer is being evaluated
+question_prefetcher = QuestionPrefetcher(
+    ttl_seconds=float(os.getenv("PREFETCH_TTL_SECONDS", 300)),
+    max_sessions=int(os.getenv("PREFETCH_MAX_SESSIONS", 1000)),
+)
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+
+# Feedback for previously evaluated (normalized) question/answer pairs
+evaluation_cache = EvaluationCache(
+    max_bytes=int(os.getenv("EVAL_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl_seconds=float(os.getenv("EVAL_CACHE_TTL_SECONDS", 24 * 3600)),
 )
+EVAL_CACHE_ENABLED = os.getenv("EVAL_CACHE_ENABLED", "true").lower() == "true"
+
+# LLM evaluations running behind provisional local scores, kept for polling
+evaluation_jobs = EvaluationJobs(
+    ttl_seconds=float(os.getenv("EVAL_JOB_TTL_SECONDS", 600)),
+    max_jobs=int(os.getenv("EVAL_JOB_MAX", 10000)),
+)
+
+# How long to group streamed tokens before re-parsing partial feedback
+STREAM_DEBOUNCE_SECONDS = float(os.getenv("STREAM_DEBOUNCE_SECONDS", 0.05))
+
+def fallback_question(role: str, session_id: str) -> QuestionResponse:
+    """Static question used when generation fails"""
+    return QuestionResponse(
+        session_id=session_id,
+        question=f"Tell me about your experience with {role} responsibilities and what interests you about this role.",
+        context="Focus on relevant experience and genuine interest",
+        difficulty=DifficultyLevel.EASY,
+        expected_topics=["relevant experience", "technical skills", "motivation", "learning approach"],
+        time_limit_seconds=180
+    )
 
 async def generate_interview_question(
     interview_type: InterviewType,
@@ -106,11 +457,30 @@ async def generate_interview_question(
     experience_level: ExperienceLevel,
     domain: Optional[str],
     session_id: str,
-    previous_score: Optional[int] = None
+    previous_score: Optional[int] = None,
+    priority: Priority = Priority.NEW_SESSION,
+    seen_questions: Iterable[str] = (),
+    difficulty: Optional[DifficultyLevel] = None,
+    rank_bank_question: Optional[Callable[[str], float]] = None
 ) -> QuestionResponse:
     """
     Generate a contextual interview question using Pydantic AI
     
+    Uses the question prefetched for this session while its last answer
+    was evaluated, then a question from the offline bank (in "prefer"
+    mode) the session has not seen, then a pre-generated question from
+    the question pool, and only falls back to live generation when none
+    is available. In "fallback" mode the bank is used instead of the
+    static fallback question when generation fails.
+    Raises LLMOverloadedError when live generation is refused by the
+    scheduler, so the caller can shed load instead of serving a fallback.
+    While the question circuit breaker is open the fallback question is
+    served without calling the LLM.
+    Candidates that are near duplicates of a question the session has
+    already been served, answered or not, are skipped: the next bank or pool question is
+    tried, and live generation is retried up to DEDUP_MAX_ATTEMPTS times
+    with the rejected question named in the prompt.
+    
     Args:
         interview_type: Type of interview (technical/behavioral/hr)
         role: Job role being interviewed for
@@ -118,78 +488,162 @@ async def generate_interview_question(
         domain: Specific technology domain (optional)
         session_id: Current session ID
         previous_score: Score from previous question (to adjust difficulty)
+        priority: Scheduler priority for live generation
+        seen_questions: Questions already served or answered in this session
+        difficulty: Difficulty chosen by the adaptive engine; overrides
+            the previous_score thresholds
+        rank_bank_question: Preference between bank questions, by id
     
     Returns:
         QuestionResponse: Structured question with metadata
     """
-    try:
-        # Build context prompt
-        domain_text = f" with focus on {domain}" if domain else ""
-        difficulty_hint = ""
-        
-        if previous_score is not None:
-            if previous_score >= 85:
-                difficulty_hint = "The candidate is doing well. Increase difficulty slightly."
-            elif previous_score < 60:
-                difficulty_hint = "The candidate is struggling. Ask a more fundamental question."
-        
-        prompt = f"""Generate a {interview_type.value} interview question for a {experience_level.value}-level {role}{domain_text}.
-        
-{difficulty_hint}
+    difficulty = difficulty or target_difficulty(previous_score)
+    key = make_pool_key(interview_type, experience_level, difficulty, role, domain)
+    seen_questions = list(seen_questions)
 
-Return a structured question with:
-- question: The actual question to ask
-- context: Brief hint about what to focus on
-- difficulty: easy/medium/hard
-- expected_topics: List of 3-5 topics that should be covered in a good answer
-- time_limit_seconds: Reasonable time to answer (120-300 seconds)
+    def fresh(question: QuestionResponse, source: str) -> bool:
+        """Whether `question` may be served: not a near duplicate of one the session has seen"""
+        similar = question_dedup.duplicate_in_session(question.question, seen_questions)
+        if similar is not None:
+            logger.info(f"Rejected {source} question as a near duplicate ({similar:.2f}): {question.question[:50]}...")
+            return False
+        question_dedup.record(make_question_id(question.question), question.question)
+        logger.info(f"Question served from {source}: {question.question[:50]}...")
+        return True
 
-Make it realistic and interview-appropriate.
-"""
-        
-        logger.info(f"Generating question for {role} - {interview_type.value}")
-        
-        result = await question_agent.run(prompt)
-        
-        # Add session_id to response
-        response = result.data
-        response.session_id = session_id
-        
-        logger.info(f"Question generated successfully: {response.question[:50]}...")
+    prefetched = await question_prefetcher.claim(session_id, difficulty)
+    if prefetched is not None:
+        prefetched.session_id = session_id
+        if fresh(prefetched, "prefetch"):
+            return prefetched
+
+    if QUESTION_BANK_MODE == "prefer":
+        banked = _bank_question(key, session_id, seen_questions, fresh, rank_bank_question)
+        if banked is not None:
+            return banked
+
+    if QUESTION_POOL_ENABLED:
+        for _ in range(DEDUP_MAX_ATTEMPTS):
+            pooled = question_pool.take(key, session_id)
+            if pooled is None:
+                break
+            if fresh(pooled, "pool"):
+                return pooled
+
+    try:
+        avoid = None
+        for attempt in range(DEDUP_MAX_ATTEMPTS):
+            response = await _generate_question(
+                interview_type, role, experience_level, domain, difficulty, priority, avoid)
+            
+            # Add session_id to response
+            response.session_id = session_id
+            question_pool.reset_failures(key)
+            
+            if fresh(response, "live generation"):
+                return response
+            avoid = response.question
+        # Still a near duplicate: better than the static fallback
+        question_dedup.record(make_question_id(response.question), response.question)
         return response
         
+    except LLMOverloadedError:
+        raise
+    except CircuitOpenError as e:
+        logger.warning(f"Question generation skipped: {str(e)}")
     except Exception as e:
         logger.error(f"Error generating question: {str(e)}")
-        # Fallback question
-        return QuestionResponse(
-            session_id=session_id,
-            question=f"Tell me about your experience with {role} responsibilities and what interests you about this role.",
-            context="Focus on relevant experience and genuine interest",
-            difficulty=DifficultyLevel.EASY,
-            expected_topics=["relevant experience", "technical skills", "motivation", "learning approach"],
-            time_limit_seconds=180
-        )
 
-async def evaluate_answer(
+    if QUESTION_BANK_MODE == "fallback":
+        banked = _bank_question(key, session_id, seen_questions, fresh, rank_bank_question)
+        if banked is not None:
+            return banked
+    llm_fallbacks.inc("question")
+    # Fallback question
+    return fallback_question(role, session_id)
+
+def predict_difficulties(average_score: Optional[float]) -> list[DifficultyLevel]:
+    """
+    The two difficulty branches most likely to follow an answer
+
+    The branch the running average falls into plus its nearest neighbour,
+    so that a score landing on either side of the closest threshold
+    (>=85 or <60) is already covered.
+    """
+    predicted = target_difficulty(None if average_score is None else round(average_score))
+    if predicted == DifficultyLevel.MEDIUM:
+        midpoint = (60 + 85) / 2
+        neighbour = DifficultyLevel.HARD if average_score is None or average_score >= midpoint else DifficultyLevel.EASY
+    else:
+        neighbour = DifficultyLevel.MEDIUM
+    return [predicted, neighbour]
+
+def _branch_factory(
+    interview_type: InterviewType,
+    role: str,
+    experience_level: ExperienceLevel,
+    domain: Optional[str]
+):
+    # A prefetched branch is usually claimed by /next moments later, so it
+    # runs ahead of pool refills; it is speculative, so behind real requests
+    async def generate_branch(difficulty: DifficultyLevel) -> QuestionResponse:
+        return await _generate_question(
+            interview_type, role, experience_level, domain, difficulty, Priority.PREFETCH)
+    return generate_branch
+
+def prefetch_next_question(
+    interview_type: InterviewType,
+    role: str,
+    experience_level: ExperienceLevel,
+    domain: Optional[str],
+    session_id: str,
+    average_score: Optional[float] = None,
+    difficulties: Optional[list[DifficultyLevel]] = None
+):
+    """
+    Start generating the likely next questions for a session in the background
+    
+    Called as soon as an answer arrives, so generation overlaps with
+    evaluation. The branches are `difficulties` when the adaptive engine
+    predicted them, else predicted from the average score. Branches the
+    question pool or bank can already serve are skipped.
+    """
+    if not PREFETCH_ENABLED:
+        return
+    branches = [
+        difficulty for difficulty in difficulties or predict_difficulties(average_score)
+        if not _served_without_llm(make_pool_key(interview_type, experience_level, difficulty, role, domain))
+    ]
+    question_prefetcher.start(
+        session_id, branches, _branch_factory(interview_type, role, experience_level, domain))
+
+def settle_prefetch(
+    interview_type: InterviewType,
+    role: str,
+    experience_level: ExperienceLevel,
+    domain: Optional[str],
+    session_id: str,
+    score: int,
+    difficulty: Optional[DifficultyLevel] = None
+):
+    """Cancel the prefetched branches the actual score (or adaptive `difficulty`) ruled out"""
+    if not PREFETCH_ENABLED:
+        return
+    difficulty = difficulty or target_difficulty(score)
+    if _served_without_llm(make_pool_key(interview_type, experience_level, difficulty, role, domain)):
+        question_prefetcher.discard(session_id)
+        return
+    question_prefetcher.settle(
+        session_id, difficulty, _branch_factory(interview_type, role, experience_level, domain))
+
+def build_feedback_prompt(
     question: str,
     answer: str,
     expected_topics: list[str],
     interview_type: InterviewType
-) -> AnswerFeedback:
-    """
-    Evaluate candidate's answer using Pydantic AI
-    
-    Args:
-        question: The question that was asked
-        answer: Candidate's response
-        expected_topics: Topics that should be covered
-        interview_type: Type of interview for context
-    
-    Returns:
-        AnswerFeedback: Structured feedback with scores and suggestions
-    """
-    try:
-        prompt = f"""Evaluate this interview answer:
+) -> str:
+    """Build the answer evaluation prompt"""
+    return f"""Evaluate this interview answer:
 
 QUESTION: {question}
 
@@ -210,42 +664,266 @@ Provide detailed, structured feedback with:
 
 Be fair but constructive. Recognize good points even in weak answers.
 """
+
+def fallback_feedback(expected_topics: list[str]) -> AnswerFeedback:
+    """Static feedback used when evaluation fails"""
+    return AnswerFeedback(
+        overall_score=50,
+        feedback_detail=FeedbackDetail(
+            clarity=50,
+            technical_accuracy=50,
+            completeness=50,
+            communication=50
+        ),
+        strengths=["You provided an answer", "Shows effort"],
+        improvements=[
+            "Try to structure your answer more clearly",
+            "Include specific examples",
+            "Cover the key topics mentioned in the question"
+        ],
+        missing_topics=expected_topics,
+        suggested_answer="A strong answer would cover all expected topics with specific examples and clear structure.",
+        follow_up_question=None
+    )
+
+async def evaluate_answer(
+    question: str,
+    answer: str,
+    expected_topics: list[str],
+    interview_type: InterviewType,
+    use_cache: bool = True
+) -> AnswerFeedback:
+    """
+    Evaluate candidate's answer using Pydantic AI
+    
+    Identical or trivially different answers to the same question are
+    served from the evaluation cache without calling the LLM. Raises
+    LLMOverloadedError when the scheduler refuses the call. While the
+    feedback circuit breaker is open the fallback feedback is returned
+    without calling the LLM.
+    
+    Args:
+        question: The question that was asked
+        answer: Candidate's response
+        expected_topics: Topics that should be covered
+        interview_type: Type of interview for context
+        use_cache: Set to False to skip the cache lookup (the fresh result is still cached)
+    
+    Returns:
+        AnswerFeedback: Structured feedback with scores and suggestions
+    """
+    cache_key = evaluation_key(question, answer, interview_type)
+    if use_cache and EVAL_CACHE_ENABLED:
+        cached = evaluation_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Evaluation served from cache. Score: {cached.overall_score}")
+            return cached
+
+    try:
+        prompt = build_feedback_prompt(question, answer, expected_topics, interview_type)
         
         logger.info(f"Evaluating answer for question: {question[:50]}...")
         
-        result = await feedback_agent.run(prompt)
-        feedback = result.data
+        feedback = await run_feedback_agent(prompt)
+        if EVAL_CACHE_ENABLED:
+            evaluation_cache.put(cache_key, feedback)
         
         logger.info(f"Evaluation complete. Score: {feedback.overall_score}")
         return feedback
         
+    except LLMOverloadedError:
+        raise
+    except CircuitOpenError as e:
+        logger.warning(f"Evaluation skipped: {str(e)}")
+        llm_fallbacks.inc("feedback")
+        return fallback_feedback(expected_topics)
     except Exception as e:
         logger.error(f"Error evaluating answer: {str(e)}")
+        llm_fallbacks.inc("feedback")
         # Fallback feedback
-        return AnswerFeedback(
-            overall_score=50,
-            feedback_detail=FeedbackDetail(
-                clarity=50,
-                technical_accuracy=50,
-                completeness=50,
-                communication=50
-            ),
-            strengths=["You provided an answer", "Shows effort"],
-            improvements=[
-                "Try to structure your answer more clearly",
-                "Include specific examples",
-                "Cover the key topics mentioned in the question"
-            ],
-            missing_topics=expected_topics,
-            suggested_answer="A strong answer would cover all expected topics with specific examples and clear structure.",
-            follow_up_question=None
-        )
+        return fallback_feedback(expected_topics)
+
+# Answers of one batch evaluated at the same time
+BATCH_EVAL_CONCURRENCY = int(os.getenv("BATCH_EVAL_CONCURRENCY", 4))
+
+async def evaluate_answers(
+    items: list[tuple[str, str, list[str]]],
+    interview_type: InterviewType,
+    use_cache: bool = True
+) -> AsyncIterator[tuple[int, Optional[AnswerFeedback], Optional[LLMOverloadedError]]]:
+    """
+    Evaluate (question, answer, expected_topics) items, at most
+    BATCH_EVAL_CONCURRENCY at a time, yielding (index, feedback, error)
+    as each one finishes
+    
+    `error` is set instead of `feedback` when the scheduler refused the
+    item. Evaluations still running when the caller stops iterating are
+    cancelled.
+    """
+    semaphore = asyncio.Semaphore(BATCH_EVAL_CONCURRENCY)
+
+    async def evaluate_item(index: int, question: str, answer: str, expected_topics: list[str]):
+        async with semaphore:
+            try:
+                return index, await evaluate_answer(question, answer, expected_topics, interview_type, use_cache), None
+            except LLMOverloadedError as e:
+                return index, None, e
+
+    tasks = [asyncio.create_task(evaluate_item(i, *item)) for i, item in enumerate(items)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# Feedback fields grouped into the sections streamed to the client, in order
+FEEDBACK_SECTIONS = (
+    ("scores", ("overall_score", "feedback_detail")),
+    ("strengths", ("strengths",)),
+    ("improvements", ("improvements", "missing_topics")),
+)
+
+def _partial_feedback(message: "ModelResponse") -> dict:
+    """Parse the (possibly incomplete) tool-call JSON of a streamed feedback response"""
+    import pydantic_core
+    from pydantic_ai.messages import ToolCallPart
+
+    for part in message.parts:
+        if isinstance(part, ToolCallPart) and part.has_content():
+            try:
+                data = pydantic_core.from_json(part.args_as_json_str(), allow_partial="trailing-strings")
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+    return {}
+
+def _completed_fields(data: dict, is_last: bool) -> set[str]:
+    """Fields whose value can no longer change
+
+    The model writes keys in order, so every key except the last one seen
+    is complete; on the final message all of them are.
+    """
+    keys = list(data)
+    return set(keys) if is_last else set(keys[:-1])
+
+async def stream_answer_evaluation(
+    question: str,
+    answer: str,
+    expected_topics: list[str],
+    interview_type: InterviewType,
+    use_cache: bool = True
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Evaluate an answer, yielding feedback sections as soon as the model produces them
+    
+    Yields (event, payload) pairs in this order:
+        scores: overall_score and feedback_detail
+        strengths: strengths list
+        improvements: improvements and missing_topics
+        suggested_answer: incremental {"delta": ...} chunks of the model answer
+        complete: the full AnswerFeedback, validated against the schema
+    
+    If the model fails, or the feedback breaker is open, the stream ends
+    with the fallback feedback as the `complete` payload, flagged with
+    "fallback": true. If the scheduler
+    refuses the call the stream ends with an `overloaded` event carrying
+    retry_after instead. Cached evaluations are replayed as the same
+    sequence of events without calling the LLM.
+    """
+    cache_key = evaluation_key(question, answer, interview_type)
+    if use_cache and EVAL_CACHE_ENABLED:
+        cached = evaluation_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Streamed evaluation served from cache. Score: {cached.overall_score}")
+            data = cached.model_dump()
+            for section, fields in FEEDBACK_SECTIONS:
+                yield section, {f: data[f] for f in fields}
+            yield "suggested_answer", {"delta": cached.suggested_answer}
+            yield "complete", {**data, "fallback": False}
+            return
+
+    prompt = build_feedback_prompt(question, answer, expected_topics, interview_type)
+    sent_sections: set[str] = set()
+    sent_answer_chars = 0
+
+    logger.info(f"Streaming evaluation for question: {question[:50]}...")
+
+    start = None
+    first_chunk_seconds = None
+    # Set while the breaker is owed an outcome for this call
+    admitted = False
+    trial = None
+    try:
+        agents = await llm_agents.aget()
+        trial = feedback_breaker.check()
+        admitted = True
+        async with llm_scheduler.slot(Priority.EVALUATION):
+            start = time.perf_counter()
+            async with agents.feedback_agent.run_stream(prompt) as result:
+                message = None
+                async for message, is_last in result.stream_structured(debounce_by=STREAM_DEBOUNCE_SECONDS):
+                    if first_chunk_seconds is None:
+                        first_chunk_seconds = time.perf_counter() - start
+                    data = _partial_feedback(message)
+                    completed = _completed_fields(data, is_last)
+
+                    for section, fields in FEEDBACK_SECTIONS:
+                        if section not in sent_sections and all(f in completed for f in fields):
+                            sent_sections.add(section)
+                            yield section, {f: data[f] for f in fields}
+
+                    suggested = data.get("suggested_answer")
+                    if isinstance(suggested, str) and len(suggested) > sent_answer_chars:
+                        yield "suggested_answer", {"delta": suggested[sent_answer_chars:]}
+                        sent_answer_chars = len(suggested)
+
+                if message is None:
+                    raise ValueError("Empty response stream")
+                feedback = await result.validate_structured_result(message)
+                if EVAL_CACHE_ENABLED:
+                    evaluation_cache.put(cache_key, feedback)
+            # Includes time the client took to read the stream
+            llm_agent_run_duration.observe(time.perf_counter() - start, "feedback_stream", "ok")
+            # ...so the breaker judges the model by its time to first chunk
+            feedback_breaker.record_success(first_chunk_seconds or 0.0, trial)
+            admitted = False
+
+        logger.info(f"Streamed evaluation complete. Score: {feedback.overall_score}")
+        yield "complete", {**feedback.model_dump(), "fallback": False}
+
+    except CircuitOpenError as e:
+        logger.warning(f"Streamed evaluation skipped: {str(e)}")
+        llm_fallbacks.inc("feedback_stream")
+        yield "complete", {**fallback_feedback(expected_topics).model_dump(), "fallback": True}
+    except LLMOverloadedError as e:
+        yield "overloaded", {"detail": str(e), "retry_after": e.retry_after}
+    except Exception as e:
+        logger.error(f"Error streaming evaluation: {str(e)}")
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            llm_agent_run_duration.observe(elapsed, "feedback_stream", "error")
+            feedback_breaker.record_failure(elapsed, trial)
+            admitted = False
+        llm_fallbacks.inc("feedback_stream")
+        yield "complete", {**fallback_feedback(expected_topics).model_dump(), "fallback": True}
+    finally:
+        if admitted:
+            feedback_breaker.record_cancelled(trial)
 
 # Utility function for health check
 def check_agent_health() -> bool:
-    """Check if agents are properly configured"""
+    """Check if agents are configured and neither circuit breaker is refusing calls"""
     try:
+        if question_breaker.is_open() or feedback_breaker.is_open():
+            return False
+        if LLM_BACKEND == "fake":
+            return True
         api_key = os.getenv("OPENROUTER_API_KEY")
         return api_key is not None and len(api_key) > 0
     except Exception:
         return False
+
+def circuit_states() -> dict[str, str]:
+    """Current state of each agent's circuit breaker"""
+    return {"question": question_breaker.state, "feedback": feedback_breaker.state}
@@ -0,0 +1,166 @@
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from session_record import HISTOGRAM_BUCKETS, histogram_bucket
+from session_store import ANALYTICS_OTHER as OTHER, ScoreCount, SessionCount, SessionStore
+
+# Scores are integers 0-100
+SCORE_VALUES = 101
+
+DIMENSIONS = ("interview_type", "experience_level", "role", "difficulty")
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# (interview_type, experience_level, role)
+Cohort = Tuple[str, str, str]
+
+# Stored dimensions besides DIMENSIONS: every session or score, and cohorts
+ALL = "all"
+COHORT = "cohort"
+
+
+class ScoreAggregate:
+    """
+    Summary of a set of scores, kept as a count per score value
+
+    Scores are bounded integers, so the per-value counts give the count,
+    sum, mean, standard deviation, min, max, a histogram by tens and exact
+    quantiles in constant memory, where unbounded values would need a
+    sketch such as t-digest. Counts also merge by addition, which is what
+    lets every worker add to the same stored aggregates.
+    """
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = array("I", [0] * SCORE_VALUES)
+
+    def add(self, score: int, count: int = 1):
+        self.values[min(max(score, 0), SCORE_VALUES - 1)] += count
+
+    @property
+    def count(self) -> int:
+        return sum(self.values)
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Lowest score with at least a fraction `q` of scores at or below it"""
+        count = self.count
+        if not count:
+            return None
+        rank = max(math.ceil(q * count), 1)
+        seen = 0
+        for score, n in enumerate(self.values):
+            seen += n
+            if seen >= rank:
+                return score
+        return SCORE_VALUES - 1
+
+    def snapshot(self) -> dict:
+        scored = [(score, n) for score, n in enumerate(self.values) if n]
+        count = sum(n for _, n in scored)
+        total = sum(score * n for score, n in scored)
+        mean = total / count if count else 0.0
+        # Sample standard deviation
+        m2 = sum(n * (score - mean) ** 2 for score, n in scored)
+        histogram = [0] * HISTOGRAM_BUCKETS
+        for score, n in scored:
+            histogram[histogram_bucket(score)] += n
+        return {
+            "count": count,
+            "sum": total,
+            "mean": round(mean, 2),
+            "stddev": round(math.sqrt(m2 / (count - 1)), 2) if count > 1 else 0.0,
+            "min": scored[0][0] if scored else None,
+            "max": scored[-1][0] if scored else None,
+            **{f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES},
+            "histogram": histogram,
+        }
+
+
+class ScoreAnalytics:
+    """
+    Cross-session score aggregates, kept in the session store
+
+    Each started session is counted overall and by interview type,
+    experience level and role. Each score is counted overall, in one group
+    per dimension (interview type, experience level, role and question
+    difficulty) and in its (interview type, experience level, role)
+    cohort. The counts are written in the same transaction as the session
+    or answers they describe, so with a shared store they cover every
+    worker, and reading them never touches sessions. Roles are free text:
+    the store counts new groups under "other" once a dimension holds
+    ANALYTICS_MAX_GROUPS of them.
+    """
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    def session_counts(self, interview_type: str, experience_level: str, role: str) -> List[SessionCount]:
+        """The counts a started session adds to"""
+        values = (interview_type, experience_level, normalize_role(role))
+        return [(ALL, ""), *zip(DIMENSIONS, values)]
+
+    def score_counts(self, cohort: Cohort, scores: Iterable[Tuple[Optional[str], int]]) -> List[ScoreCount]:
+        """The counts (difficulty, score) results from one session add to"""
+        interview_type, experience_level, role = cohort
+        role = normalize_role(role)
+        counts = []
+        for difficulty, score in scores:
+            score = min(max(score, 0), SCORE_VALUES - 1)
+            values = (interview_type, experience_level, role, difficulty or "unknown")
+            counts.append((ALL, "", score))
+            counts.extend((dimension, value, score) for dimension, value in zip(DIMENSIONS, values))
+            counts.append((COHORT, _cohort_group((interview_type, experience_level, role)), score))
+        return counts
+
+    def snapshot(self) -> dict:
+        """Every aggregate; cost depends on the number of groups, not sessions"""
+        session_rows, score_rows = self.store.analytics()
+        sessions: Dict[str, Dict[str, int]] = {dimension: {} for dimension in (ALL, *DIMENSIONS[:3])}
+        for dimension, group, count in session_rows:
+            if dimension in sessions:
+                sessions[dimension][group] = count
+        scores: Dict[str, Dict[str, ScoreAggregate]] = {dimension: {} for dimension in (ALL, *DIMENSIONS, COHORT)}
+        for dimension, group, score, count in score_rows:
+            if dimension in scores:
+                aggregate = scores[dimension].get(group)
+                if aggregate is None:
+                    aggregate = scores[dimension][group] = ScoreAggregate()
+                aggregate.add(score, count)
+        overall = scores.pop(ALL).get("") or ScoreAggregate()
+        cohorts = scores.pop(COHORT)
+        return {
+            "sessions": {
+                "started": sessions.pop(ALL).get("", 0),
+                **{f"by_{dimension}": dict(sorted(counts.items())) for dimension, counts in sessions.items()},
+            },
+            "scores": {
+                "overall": overall.snapshot(),
+                **{
+                    f"by_{dimension}": {value: aggregate.snapshot() for value, aggregate in sorted(groups.items())}
+                    for dimension, groups in scores.items()
+                },
+            },
+            "cohorts": [
+                {"interview_type": t, "experience_level": level, "role": role, **aggregate.snapshot()}
+                for (t, level, role), aggregate in sorted(
+                    ((_parse_cohort(group), aggregate) for group, aggregate in cohorts.items()),
+                    key=lambda item: item[0])
+            ],
+        }
+
+
+def _cohort_group(cohort: Cohort) -> str:
+    return "\t".join(cohort)
+
+
+def _parse_cohort(group: str) -> Cohort:
+    if group == OTHER:
+        return (OTHER,) * 3
+    interview_type, experience_level, role = group.split("\t")
+    return interview_type, experience_level, role
+
+
+def normalize_role(role: str) -> str:
+    """Group roles case- and whitespace-insensitively, as the question pool does"""
+    return " ".join(role.split()).lower()
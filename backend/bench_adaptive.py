@@ -0,0 +1,187 @@
+"""
+Offline simulator for adaptive difficulty
+Measures how many questions each difficulty policy needs before the
+session's ability estimate is stable, on simulated candidates
+
+Candidates have a true ability and answer questions whose true difficulty
+is their level's plus a per-question offset; scores follow the Rasch model
+with noise. The "threshold" policy is the previous-score rule
+(target_difficulty), the "adaptive" policy picks the most informative
+level and bank question. Both are scored with the same ability estimator.
+Before measuring, `--calibration-sessions` sessions run through the
+adaptive engine so question and level difficulties are calibrated.
+
+Usage: python bench_adaptive.py [--sessions 2000] [--questions 15] [--tolerance 0.5]
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+from typing import Dict, List
+
+from adaptive import LEVELS, AdaptiveDifficulty, expected_score
+from agent import target_difficulty
+from models import DifficultyLevel
+
+# True difficulty of each level: medium anchors the scale at 0, the others
+# are deliberately off the engine's priors
+TRUE_LEVELS = {
+    DifficultyLevel.EASY: -1.3,
+    DifficultyLevel.MEDIUM: 0.0,
+    DifficultyLevel.HARD: 1.4,
+}
+
+# Questions drawn per ranked bank pick, as QuestionBank.pick probes
+PROBES = 8
+
+
+class Bank:
+    """Simulated question bank: per level, question ids with their true difficulty"""
+
+    def __init__(self, rng: random.Random, per_level: int, spread: float):
+        self.questions: Dict[DifficultyLevel, Dict[str, float]] = {
+            level: {
+                f"{level.value}-{i}": TRUE_LEVELS[level] + rng.gauss(0, spread)
+                for i in range(per_level)
+            }
+            for level in LEVELS
+        }
+
+    def pick(self, rng: random.Random, level: DifficultyLevel, seen: set, rank=None) -> str:
+        candidates = [question_id for question_id in self.questions[level] if question_id not in seen]
+        if rank is None:
+            return rng.choice(candidates)
+        return max(rng.sample(candidates, min(PROBES, len(candidates))), key=rank)
+
+
+def simulate_score(rng: random.Random, ability: float, difficulty: float, noise: float) -> int:
+    outcome = expected_score(ability, difficulty) + rng.gauss(0, noise)
+    return round(100 * min(max(outcome, 0.0), 1.0))
+
+
+def best_level(ability: float) -> DifficultyLevel:
+    """The level with the most information at the true ability"""
+    def information(level: DifficultyLevel) -> float:
+        expected = expected_score(ability, TRUE_LEVELS[level])
+        return expected * (1 - expected)
+    return max(LEVELS, key=information)
+
+
+def run_session(
+    rng: random.Random,
+    engine: AdaptiveDifficulty,
+    bank: Bank,
+    policy: str,
+    session_id: str,
+    ability: float,
+    questions: int,
+    noise: float
+) -> dict:
+    """One simulated session: the estimate after each answer and the levels served"""
+    estimate = engine.prior()
+    seen: set = set()
+    previous_score = None
+    errors: List[float] = []
+    stderrs: List[float] = []
+    levels: List[DifficultyLevel] = []
+    for _ in range(questions):
+        if policy == "adaptive":
+            level = engine.next_difficulty(estimate)
+            question_id = bank.pick(rng, level, seen, engine.item_ranker(estimate, level))
+        else:
+            level = target_difficulty(previous_score)
+            question_id = bank.pick(rng, level, seen)
+        seen.add(question_id)
+        score = simulate_score(rng, ability, bank.questions[level][question_id], noise)
+        estimate = engine.observe(session_id, estimate, question_id, level, score)
+        previous_score = score
+        levels.append(level)
+        errors.append(abs(estimate.mean - ability))
+        stderrs.append(estimate.stderr)
+    return {"errors": errors, "stderrs": stderrs, "levels": levels}
+
+
+def questions_to_stable(errors: List[float], tolerance: float) -> int:
+    """Answers after which the estimate stays within `tolerance` of the truth; len + 1 if never"""
+    needed = len(errors) + 1
+    for i in range(len(errors) - 1, -1, -1):
+        if errors[i] > tolerance:
+            break
+        needed = i + 1
+    return needed
+
+
+def summarize(runs: List[dict], abilities: List[float], tolerance: float, stable_stderr: float) -> dict:
+    questions = len(runs[0]["errors"])
+    needed = [questions_to_stable(run["errors"], tolerance) for run in runs]
+    confident = [
+        next((i + 1 for i, stderr in enumerate(run["stderrs"]) if stderr <= stable_stderr), questions + 1)
+        for run in runs
+    ]
+    on_level = sum(
+        level == best_level(ability)
+        for run, ability in zip(runs, abilities)
+        for level in run["levels"]
+    )
+    rmse = lambda n: round(math.sqrt(statistics.fmean(run["errors"][n - 1] ** 2 for run in runs)), 3)
+    return {
+        "questions_to_stable_mean": round(statistics.fmean(needed), 2),
+        "questions_to_stable_p50": statistics.median(needed),
+        "questions_to_stable_p90": sorted(needed)[int(0.9 * (len(needed) - 1))],
+        "never_stable": round(sum(n > questions for n in needed) / len(needed), 3),
+        "questions_to_stderr_mean": round(statistics.fmean(confident), 2),
+        "rmse_after": {n: rmse(n) for n in (3, 5, 10, questions) if n <= questions},
+        "on_best_level": round(on_level / (len(runs) * questions), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--calibration-sessions", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=15, help="Questions per session")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Ability error counted as stable")
+    parser.add_argument("--noise", type=float, default=0.2, help="Stddev of score noise, as a fraction")
+    parser.add_argument("--ability-spread", type=float, default=1.2, help="Stddev of true abilities")
+    parser.add_argument("--question-spread", type=float, default=0.4, help="Stddev of questions around their level")
+    parser.add_argument("--bank-size", type=int, default=200, help="Questions per level")
+    parser.add_argument("--score-weight", type=float, default=4.0)
+    parser.add_argument("--stable-stderr", type=float, default=0.35)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bank = Bank(rng, args.bank_size, args.question_spread)
+    engine = AdaptiveDifficulty(score_weight=args.score_weight, stable_stderr=args.stable_stderr)
+    for i in range(args.calibration_sessions):
+        run_session(rng, engine, bank, "adaptive", f"calibration-{i}",
+                    rng.gauss(0, args.ability_spread), args.questions, args.noise)
+    calibrated = engine.stats()["levels"]
+
+    abilities = [rng.gauss(0, args.ability_spread) for _ in range(args.sessions)]
+    result = {
+        "sessions": args.sessions,
+        "questions_per_session": args.questions,
+        "tolerance": args.tolerance,
+        "level_difficulty": {
+            level.value: {"true": TRUE_LEVELS[level], "calibrated": calibrated[level.value]["difficulty"]}
+            for level in LEVELS
+        },
+    }
+    for policy in ("threshold", "adaptive"):
+        # Same candidates and random stream for both policies
+        policy_rng = random.Random(args.seed + 1)
+        runs = [
+            run_session(policy_rng, engine, bank, policy, f"{policy}-{i}", ability, args.questions, args.noise)
+            for i, ability in enumerate(abilities)
+        ]
+        result[policy] = summarize(runs, abilities, args.tolerance, args.stable_stderr)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
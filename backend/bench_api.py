@@ -0,0 +1,198 @@
+"""
+Load benchmark for the interview API
+Runs concurrent start -> answer -> next sessions and reports per-endpoint
+latency percentiles and throughput as JSON
+
+By default the app runs in-process against the offline LLM stand-in
+(LLM_BACKEND=fake), so no server or OpenRouter key is needed. Pass --url
+to load a running server instead (start it with LLM_BACKEND=fake to
+measure the API's own overhead).
+
+Usage: python bench_api.py [--sessions 200] [--concurrency 20] [--answers 3]
+                           [--latency-ms 800] [--jitter-ms 200] [--error-rate 0]
+                           [--tail-rate 0] [--tail-ms 0]
+                           [--url http://localhost:8000] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+ROLES = ["Software Engineer", "Backend Engineer", "Data Engineer", "Frontend Engineer"]
+INTERVIEW_TYPES = ["technical", "behavioral", "hr"]
+LEVELS = ["entry", "intermediate", "senior"]
+
+ANSWER_SENTENCES = [
+    "I would start by clarifying the requirements and the expected traffic.",
+    "Caching the hot path keeps latency low, with a short TTL to bound staleness.",
+    "Error handling matters here, so I would add retries with backoff and alerts.",
+    "On my last team we settled it by writing down the trade-offs and agreeing on an owner.",
+    "For testing strategy I would combine unit tests with a load test before rollout.",
+    "Scalability comes from keeping the service stateless and sharding the data.",
+    "Monitoring the error rate and p95 latency tells us when to roll back.",
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Latency samples and status codes per endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.latencies[name].append(time.perf_counter() - start)
+        self.statuses[name][status] += 1
+        return response if response is not None and response.status_code == 200 else None
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, samples in self.latencies.items():
+            ordered = sorted(samples)
+            ok = self.statuses[name].get("200", 0)
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": len(samples) - ok,
+                "status_codes": dict(self.statuses[name]),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "mean_ms": round(1000 * sum(samples) / len(samples), 2),
+                "p50_ms": round(1000 * percentile(ordered, 50), 2),
+                "p95_ms": round(1000 * percentile(ordered, 95), 2),
+                "p99_ms": round(1000 * percentile(ordered, 99), 2),
+                "max_ms": round(1000 * ordered[-1], 2),
+            }
+        return endpoints
+
+
+async def run_session(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, answers: int):
+    """One interview: start, then answer/next for each question"""
+    response = await recorder.call(client, "start", "POST", "/api/interview/start", json={
+        "interview_type": rng.choice(INTERVIEW_TYPES),
+        "role": rng.choice(ROLES),
+        "experience_level": rng.choice(LEVELS),
+    })
+    if response is None:
+        return
+    question = response.json()
+
+    for i in range(answers):
+        answer = " ".join(rng.sample(ANSWER_SENTENCES, rng.randint(2, 6)))
+        feedback = await recorder.call(client, "answer", "POST", "/api/interview/answer", json={
+            "session_id": question["session_id"],
+            "question_id": question["question_id"],
+            "answer": answer,
+        })
+        if feedback is None or i == answers - 1:
+            return
+        response = await recorder.call(client, "next", "POST", "/api/interview/next", json={
+            "session_id": question["session_id"],
+            "previous_score": feedback.json()["overall_score"],
+        })
+        if response is None:
+            return
+        question = response.json()
+
+
+async def run_load(client: httpx.AsyncClient, args) -> dict:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def worker(index: int):
+        async with semaphore:
+            await run_session(client, recorder, random.Random(args.seed * 100003 + index), args.answers)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    return {"elapsed_seconds": round(elapsed, 3), "endpoints": recorder.report(elapsed)}
+
+
+async def run_in_process(args) -> dict:
+    # The stand-in must be selected before the app (and its agents) is imported
+    os.environ.update(
+        LLM_BACKEND="fake",
+        LLM_FAKE_LATENCY_MS=str(args.latency_ms),
+        LLM_FAKE_JITTER_MS=str(args.jitter_ms),
+        LLM_FAKE_ERROR_RATE=str(args.error_rate),
+        LLM_FAKE_SEED=str(args.seed),
+        LLM_FAKE_TAIL_RATE=str(args.tail_rate),
+        LLM_FAKE_TAIL_MS=str(args.tail_ms),
+        LLM_WARMUP_CONNECTIONS="0",
+    )
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await run_load(client, args)
+
+
+async def run_remote(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="Sessions in flight at once")
+    parser.add_argument("--answers", type=int, default=3, help="Answered questions per session")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Stand-in LLM latency (in-process only)")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="Stand-in LLM latency jitter (in-process only)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in LLM failure rate (in-process only)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Share of stand-in LLM calls that are slow (in-process only)")
+    parser.add_argument("--tail-ms", type=float, default=0.0, help="Extra latency of a slow stand-in call (in-process only)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Keep the app's per-request logging out of the measurements
+    logging.disable(logging.INFO)
+
+    results = asyncio.run(run_remote(args) if args.url else run_in_process(args))
+    report = {
+        "target": args.url or "in-process (LLM_BACKEND=fake)",
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "answers_per_session": args.answers,
+        **({} if args.url else {
+            "llm_latency_ms": args.latency_ms,
+            "llm_jitter_ms": args.jitter_ms,
+            "llm_error_rate": args.error_rate,
+        }),
+        **results,
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Memory benchmark for session storage
+Compares the per-session footprint of the original free-form session dict
+with the compact SessionRecord
+
+Usage: python bench_sessions.py [--sessions 2000] [--answers 12]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+
+from session_record import SessionRecord
+
+QUESTIONS = [
+    "Explain the difference between REST and GraphQL and when you would pick each.",
+    "Describe a time you disagreed with a teammate and how you resolved it.",
+    "How would you design a rate limiter for a public API?",
+    "What happens when you type a URL into the browser and press enter?",
+    "Walk me through how you would debug a memory leak in a Python service.",
+    "Why do you want to work at this company?",
+]
+
+SENTENCES = [
+    "REST is an architectural style built around resources and HTTP verbs.",
+    "GraphQL exposes a single endpoint and lets clients ask for exactly the fields they need.",
+    "In my last project we cached responses at the edge to cut latency.",
+    "I would start by reproducing the issue and capturing a heap snapshot.",
+    "We agreed on clear ownership and documented the decision in the design doc.",
+    "A token bucket per API key is simple and handles bursts well.",
+    "The trade-off is more complexity on the server for flexibility on the client.",
+]
+
+
+def make_answer(rng: random.Random) -> str:
+    return " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(4, 12)))
+
+
+def legacy_session(session_id: str, answers: list) -> dict:
+    """Session shaped like the original utils.create_session/update_session_score"""
+    session = {
+        "session_id": session_id,
+        "interview_type": "technical",
+        "role": "Software Engineer",
+        "experience_level": "intermediate",
+        "questions_asked": 0,
+        "total_score": 0,
+        "scores": [],
+        "created_at": datetime.now().isoformat(),
+        "history": []
+    }
+    for score, question, answer in answers:
+        question, answer = question.decode(), answer.decode()
+        session["questions_asked"] += 1
+        session["total_score"] += score
+        session["scores"].append(score)
+        session["history"].append({
+            "question": question,
+            "answer": answer,
+            "score": score,
+            "timestamp": datetime.now().isoformat()
+        })
+    return session
+
+
+def compact_session(session_id: str, answers: list) -> SessionRecord:
+    session = SessionRecord(session_id, "technical", "Software Engineer", "intermediate")
+    for score, question, answer in answers:
+        session.add_answer(score, question.decode(), answer.decode())
+    return session
+
+
+def measure(build, workload: list) -> int:
+    """Bytes retained by building every session in the workload"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(f"session-{i}", answers) for i, answers in enumerate(workload)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--answers", type=int, default=12, help="Answered questions per session")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Texts are kept as raw request bytes so both builders decode fresh strings,
+    # the way each request body would arrive
+    workload = [
+        [
+            (rng.randint(30, 100), rng.choice(QUESTIONS).encode(), make_answer(rng).encode())
+            for _ in range(args.answers)
+        ]
+        for _ in range(args.sessions)
+    ]
+
+    legacy = measure(legacy_session, workload)
+    compact = measure(compact_session, workload)
+
+    result = {
+        "sessions": args.sessions,
+        "answers_per_session": args.answers,
+        "legacy_bytes_per_session": round(legacy / args.sessions),
+        "compact_bytes_per_session": round(compact / args.sessions),
+        "reduction": round(1 - compact / legacy, 3) if legacy else None,
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
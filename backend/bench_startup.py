@@ -0,0 +1,130 @@
+"""
+Startup benchmark for the API
+Measures, in fresh interpreters, how long `import main` takes and how long
+a uvicorn server takes to answer its first /health request and to finish
+building the LLM agents in the background
+
+Runs against the offline LLM stand-in by default (LLM_BACKEND=fake), so
+no OpenRouter key is needed.
+
+Usage: python bench_startup.py [--runs 5] [--backend fake] [--port 8765]
+                               [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in ("pydantic_ai", "openai") if name in sys.modules)
+print(elapsed, ",".join(heavy))
+"""
+
+
+def bench_env(backend: str) -> dict:
+    env = dict(os.environ, LLM_BACKEND=backend, LLM_WARMUP_CONNECTIONS="0", LOG_LEVEL="WARNING")
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    return env
+
+
+def measure_import(env: dict) -> tuple[float, list[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=HERE, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    elapsed, heavy = out.split(" ", 1) if " " in out else (out, "")
+    return float(elapsed), [name for name in heavy.split(",") if name]
+
+
+def get_json(url: str) -> dict | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return json.load(response)
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def measure_server(env: dict, port: int, timeout: float) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        first_health = agents_ready = None
+        health = None
+        while time.perf_counter() - start < timeout:
+            if first_health is None:
+                health = get_json(f"{base}/health")
+                if health is not None:
+                    first_health = time.perf_counter() - start
+            if first_health is not None:
+                stats = get_json(f"{base}/api/llm/stats")
+                if stats and stats["agents"]["ready"]:
+                    agents_ready = time.perf_counter() - start
+                    break
+            time.sleep(0.01)
+        return {
+            "first_health_seconds": first_health,
+            "agents_ready_seconds": agents_ready,
+            "agent_ready": health["agent_ready"] if health else None,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(values: list) -> dict:
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"runs": 0}
+    return {
+        "runs": len(values),
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", default="fake", help="LLM_BACKEND for the measured processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for each server")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    env = bench_env(args.backend)
+    imports = [measure_import(env) for _ in range(args.runs)]
+    servers = [measure_server(env, args.port, args.timeout) for _ in range(args.runs)]
+
+    report = {
+        "backend": args.backend,
+        "import_seconds": summarize([elapsed for elapsed, _ in imports]),
+        "heavy_modules_after_import": imports[-1][1],
+        "first_health_seconds": summarize([s["first_health_seconds"] for s in servers]),
+        "agents_ready_seconds": summarize([s["agents_ready_seconds"] for s in servers]),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Builder for the offline question bank
+Generates questions with the question agent for every combination of the
+given interview types, experience levels, difficulties and roles, validates
+them and stores them in a question bank file (see question_bank.py)
+
+Needs OPENROUTER_API_KEY, or LLM_BACKEND=fake for a dry run. Building into
+an existing bank only adds questions it does not hold yet.
+
+Usage: python build_question_bank.py build --output questions.db --roles "Software Engineer" "Data Scientist"
+                                     [--types technical behavioral] [--levels entry senior]
+                                     [--difficulties easy medium hard] [--domain Python]
+                                     [--per-bucket 10] [--concurrency 4] [--dedup-threshold 0.6]
+       python build_question_bank.py stats --bank questions.db
+       python build_question_bank.py validate --bank questions.db
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import sys
+import time
+from typing import Optional
+
+from pydantic import ValidationError
+
+from models import QuestionResponse, InterviewType, ExperienceLevel, DifficultyLevel
+from near_duplicates import MinHashIndex, signature
+from question_bank import QuestionBank
+from question_pool import make_pool_key
+
+logger = logging.getLogger("build_question_bank")
+
+MIN_QUESTION_CHARS = 20
+MIN_TOPICS = 2
+TIME_LIMIT_RANGE = (60, 600)
+
+
+def validate_question(question: QuestionResponse, difficulty: DifficultyLevel) -> Optional[str]:
+    """Why a generated question should not be banked, or None"""
+    if len(question.question.strip()) < MIN_QUESTION_CHARS:
+        return "question too short"
+    if question.difficulty != difficulty:
+        return f"difficulty {question.difficulty.value} instead of {difficulty.value}"
+    if len({t.strip().lower() for t in question.expected_topics if t.strip()}) < MIN_TOPICS:
+        return "too few expected topics"
+    if not TIME_LIMIT_RANGE[0] <= question.time_limit_seconds <= TIME_LIMIT_RANGE[1]:
+        return f"time limit {question.time_limit_seconds}s out of range"
+    return None
+
+
+async def fill_bucket(bank: QuestionBank, key, per_bucket: int, attempts: int, counts: dict, threshold: float):
+    """Generate questions for one bucket until it holds `per_bucket` or attempts run out"""
+    from agent import _generate_question
+    from scheduler import Priority
+
+    interview_type, experience_level, difficulty, role, domain = key
+    # Near-duplicate check against this build's questions for the bucket
+    index = MinHashIndex(threshold)
+    # One call at a time per bucket: identical concurrent prompts would be coalesced
+    for _ in range(attempts):
+        if bank.size(key) >= per_bucket:
+            return
+        try:
+            question = await _generate_question(
+                interview_type, role, experience_level, domain, difficulty, Priority.BACKGROUND)
+        except Exception as e:
+            counts["failed"] += 1
+            logger.warning(f"Generation failed for {key}: {str(e)}")
+            continue
+        problem = validate_question(question, difficulty)
+        sig = signature(question.question)
+        if not problem and index.query(sig) is not None:
+            problem = "near duplicate"
+        if problem:
+            counts["rejected"] += 1
+            logger.info(f"Rejected question for {role}/{difficulty.value}: {problem}")
+        elif bank.add(key, question):
+            counts["added"] += 1
+            index.add(question.question, sig)
+        else:
+            counts["duplicates"] += 1
+
+
+async def build(args) -> dict:
+    bank = QuestionBank(args.output, readonly=False)
+    keys = [
+        make_pool_key(InterviewType(t), ExperienceLevel(level), DifficultyLevel(d), role, args.domain)
+        for t, level, d, role in itertools.product(args.types, args.levels, args.difficulties, args.roles)
+    ]
+    counts = {"added": 0, "duplicates": 0, "rejected": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run(key):
+        async with semaphore:
+            await fill_bucket(bank, key, args.per_bucket, args.per_bucket * args.attempts_factor, counts,
+                              args.dedup_threshold)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(key) for key in keys))
+    short = [
+        {"bucket": [k.value if hasattr(k, "value") else k for k in key], "size": bank.size(key)}
+        for key in keys if bank.size(key) < args.per_bucket
+    ]
+    report = {
+        **counts,
+        "elapsed_seconds": round(time.perf_counter() - start, 2),
+        "buckets": len(keys),
+        "short_buckets": short,
+        "bank": bank.stats(),
+    }
+    bank.close()
+    return report
+
+
+def stats(path: str) -> dict:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    buckets = [
+        {"interview_type": t, "experience_level": level, "difficulty": d, "role": role, "domain": domain or None, "size": size}
+        for t, level, d, role, domain, size in conn.execute(
+            "SELECT interview_type, experience_level, difficulty, role, domain, size FROM buckets "
+            "ORDER BY role, interview_type, experience_level, difficulty")
+    ]
+    topics = conn.execute(
+        "SELECT topic, COUNT(*) FROM question_topics GROUP BY topic ORDER BY COUNT(*) DESC LIMIT 20").fetchall()
+    conn.close()
+    return {
+        "questions": sum(b["size"] for b in buckets),
+        "buckets": buckets,
+        "top_topics": dict(topics),
+    }
+
+
+def validate(path: str) -> dict:
+    """Check every stored payload against the schema and every bucket for dense slots"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    invalid = []
+    checked = 0
+    for question_id, payload in conn.execute("SELECT question_id, payload FROM questions"):
+        checked += 1
+        try:
+            QuestionResponse.model_validate_json(payload)
+        except ValidationError as e:
+            invalid.append({"question_id": question_id, "error": str(e).splitlines()[0]})
+    gaps = [
+        bucket for bucket, size, count, top in conn.execute(
+            "SELECT b.bucket, b.size, COUNT(q.slot), MAX(q.slot) FROM buckets b "
+            "LEFT JOIN questions q ON q.bucket = b.bucket GROUP BY b.bucket")
+        if count != size or (size and top != size - 1)
+    ]
+    conn.close()
+    return {"checked": checked, "invalid": invalid, "buckets_with_gaps": gaps, "ok": not invalid and not gaps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Generate questions into a bank")
+    build_parser.add_argument("--output", required=True, help="Bank file (created if missing)")
+    build_parser.add_argument("--roles", nargs="+", required=True)
+    build_parser.add_argument("--types", nargs="+", default=[t.value for t in InterviewType],
+                              choices=[t.value for t in InterviewType])
+    build_parser.add_argument("--levels", nargs="+", default=[e.value for e in ExperienceLevel],
+                              choices=[e.value for e in ExperienceLevel])
+    build_parser.add_argument("--difficulties", nargs="+", default=[d.value for d in DifficultyLevel],
+                              choices=[d.value for d in DifficultyLevel])
+    build_parser.add_argument("--domain")
+    build_parser.add_argument("--per-bucket", type=int, default=10, help="Questions wanted per combination")
+    build_parser.add_argument("--attempts-factor", type=int, default=3,
+                              help="Generation attempts per wanted question before giving up on a bucket")
+    build_parser.add_argument("--concurrency", type=int, default=4, help="Buckets generated at once")
+    build_parser.add_argument("--dedup-threshold", type=float, default=0.6,
+                              help="Similarity at which a question counts as a near duplicate within its bucket")
+
+    stats_parser = commands.add_parser("stats", help="Bucket sizes and most common topics")
+    stats_parser.add_argument("--bank", required=True)
+
+    validate_parser = commands.add_parser("validate", help="Re-validate every stored question")
+    validate_parser.add_argument("--bank", required=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "build":
+        report = asyncio.run(build(args))
+    elif args.command == "stats":
+        report = stats(args.bank)
+    else:
+        report = validate(args.bank)
+    print(json.dumps(report, indent=2))
+    if args.command == "validate" and not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
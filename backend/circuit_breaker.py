@@ -0,0 +1,173 @@
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while a breaker is open"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a rolling window of call outcomes
+
+    While closed, calls run and their outcomes are kept for `window_seconds`.
+    Once the window holds `min_calls` outcomes and either the failure rate
+    reaches `failure_rate_threshold` or the share of calls slower than
+    `slow_call_seconds` reaches `slow_rate_threshold`, the breaker opens and
+    `check()` refuses calls for `open_seconds`. It then lets up to
+    `half_open_calls` trial calls through: one success closes it again with
+    an empty window, one failure reopens it. `check()` hands each trial a
+    ticket naming its half-open period, and only outcomes reported with
+    the current ticket decide; late outcomes of calls admitted earlier
+    are just recorded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 20,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30,
+        half_open_calls: int = 1
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        # (timestamp, failed, slow), oldest first
+        self._window: Deque[Tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        # Numbers the half-open periods, so trial outcomes can be told apart
+        self._half_open_period = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+            self._half_open_period += 1
+            logger.info(f"Circuit '{self.name}' half-open: allowing trial calls")
+        return self._state
+
+    def is_open(self) -> bool:
+        """True while calls are being refused"""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._trials >= self.half_open_calls)
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a trial call through"""
+        if self.state != OPEN:
+            return 1
+        return max(1, math.ceil(self.open_seconds - (time.monotonic() - self._opened_at)))
+
+    def check(self) -> Optional[int]:
+        """
+        Admit a call or raise CircuitOpenError; admitted calls must report an outcome
+
+        Returns the trial ticket of a half-open trial call, None otherwise;
+        pass it back with the call's outcome.
+        """
+        state = self.state
+        if state == CLOSED:
+            return None
+        if state == HALF_OPEN and self._trials < self.half_open_calls:
+            self._trials += 1
+            return self._half_open_period
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self, seconds: float, trial: Optional[int] = None):
+        if self._is_trial(trial):
+            self._close()
+            return
+        self._record(False, seconds >= self.slow_call_seconds)
+
+    def record_failure(self, seconds: float, trial: Optional[int] = None):
+        if self._is_trial(trial):
+            self._open("trial call failed")
+            return
+        self._record(True, seconds >= self.slow_call_seconds)
+
+    def record_cancelled(self, trial: Optional[int] = None):
+        """An admitted call was cancelled before it had an outcome"""
+        if self._is_trial(trial) and self._trials:
+            self._trials -= 1
+
+    def stats(self) -> dict:
+        self._prune(time.monotonic())
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_rate": round(self._slow / calls, 3) if calls else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+    def _is_trial(self, trial: Optional[int]) -> bool:
+        return trial is not None and self._state == HALF_OPEN and trial == self._half_open_period
+
+    def _record(self, failed: bool, slow: bool):
+        now = time.monotonic()
+        self._prune(now)
+        self._window.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        if self._state != CLOSED:
+            # Late outcomes of calls admitted before the breaker opened
+            return
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        if self._failures / calls >= self.failure_rate_threshold:
+            self._open(f"{self._failures}/{calls} calls failed")
+        elif self._slow / calls >= self.slow_rate_threshold:
+            self._open(f"{self._slow}/{calls} calls slower than {self.slow_call_seconds}s")
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            _, failed, slow = self._window.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _open(self, reason: str):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds}s: {reason}")
+
+    def _close(self):
+        self._state = CLOSED
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+        logger.info(f"Circuit '{self.name}' closed")
@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from models import AnswerFeedback, InterviewType
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Rough per-entry cost of the key, OrderedDict slot and model object itself
+_ENTRY_OVERHEAD_BYTES = 600
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different texts compare equal"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def evaluation_key(question: str, answer: str, interview_type: InterviewType) -> str:
+    """Cache key for an evaluation: hash of normalized question, answer and interview type"""
+    digest = hashlib.blake2b(digest_size=20)
+    for part in (normalize_text(question), normalize_text(answer), interview_type.value):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class EvaluationCache:
+    """
+    Bounded LRU + TTL cache of AnswerFeedback results
+
+    Entries expire `ttl_seconds` after they were stored. When the estimated
+    size of all entries exceeds `max_bytes` the least recently used ones
+    are evicted.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 24 * 3600):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, size_bytes, feedback)
+        self._entries: "OrderedDict[str, Tuple[float, int, AnswerFeedback]]" = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[AnswerFeedback]:
+        """Return a copy of the cached feedback, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, feedback = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return feedback.model_copy(deep=True)
+
+    def put(self, key: str, feedback: AnswerFeedback):
+        """Store feedback, evicting least recently used entries over the memory budget"""
+        size = len(feedback.model_dump_json()) + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, feedback.model_copy(deep=True))
+        self.bytes_used += size
+
+        while self.bytes_used > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def stats(self) -> dict:
+        """Cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.bytes_used -= size
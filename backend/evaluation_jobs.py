@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Optional
+
+from models import AnswerFeedback, ProvisionalEvaluation, ProvisionalScore
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """An LLM evaluation running behind a provisional score"""
+    __slots__ = ("evaluation_id", "session_id", "provisional", "task", "created_at")
+
+    def __init__(self, evaluation_id: str, session_id: str, provisional: ProvisionalScore, task: asyncio.Task):
+        self.evaluation_id = evaluation_id
+        self.session_id = session_id
+        self.provisional = provisional
+        self.task = task
+        self.created_at = time.monotonic()
+
+    def view(self) -> ProvisionalEvaluation:
+        status, feedback, detail = "pending", None, None
+        if self.task.done():
+            if self.task.cancelled():
+                status, detail = "failed", "Evaluation was cancelled"
+            elif self.task.exception() is not None:
+                status, detail = "failed", str(self.task.exception())
+            else:
+                status, feedback = "complete", self.task.result()
+        return ProvisionalEvaluation(
+            evaluation_id=self.evaluation_id,
+            session_id=self.session_id,
+            status=status,
+            provisional=self.provisional,
+            feedback=feedback,
+            detail=detail,
+        )
+
+
+class EvaluationJobs:
+    """
+    Background LLM evaluations that replace provisional scores
+
+    Each job runs as its own task and is kept, finished or not, for
+    `ttl_seconds` so clients can poll for the result. At most `max_jobs`
+    are tracked; the oldest are dropped first.
+    """
+
+    def __init__(self, ttl_seconds: float = 600, max_jobs: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, session_id: str, provisional: ProvisionalScore, evaluation: Awaitable[AnswerFeedback]) -> ProvisionalEvaluation:
+        """Start `evaluation` in the background and return its pending view"""
+        self._expire()
+        evaluation_id = uuid.uuid4().hex
+        job = _Job(evaluation_id, session_id, provisional, asyncio.ensure_future(evaluation))
+        job.task.add_done_callback(self._finished)
+        self._jobs[evaluation_id] = job
+        self.submitted += 1
+
+        while len(self._jobs) > self.max_jobs:
+            _, old = self._jobs.popitem(last=False)
+            if not old.task.done():
+                logger.warning(f"Dropping pending evaluation {old.evaluation_id}: too many tracked jobs")
+                old.task.cancel()
+        return job.view()
+
+    def get(self, evaluation_id: str) -> Optional[ProvisionalEvaluation]:
+        """Current view of a job, or None if unknown or expired"""
+        self._expire()
+        job = self._jobs.get(evaluation_id)
+        return job.view() if job else None
+
+    def stats(self) -> dict:
+        """Job counters"""
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": sum(1 for job in self._jobs.values() if not job.task.done()),
+            "tracked": len(self._jobs),
+        }
+
+    async def close(self):
+        """Cancel evaluations still running"""
+        tasks = [job.task for job in self._jobs.values() if not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._jobs.clear()
+
+    def _finished(self, task: asyncio.Task):
+        if task.cancelled() or task.exception() is not None:
+            self.failed += 1
+            if not task.cancelled():
+                logger.error(f"Background evaluation failed: {str(task.exception())}")
+        else:
+            self.completed += 1
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if job.created_at > cutoff:
+                break
+            self._jobs.popitem(last=False)
+            if not job.task.done():
+                job.task.cancel()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import random
+import re
+from collections import Counter
+from typing import AsyncIterator, Optional
+
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+TOPICS = [
+    "time complexity", "caching", "error handling", "testing strategy", "scalability",
+    "data modeling", "concurrency", "trade-offs", "monitoring", "security",
+    "communication", "ownership", "prioritization", "stakeholder management", "learning from failure",
+]
+
+SUBJECTS = [
+    "design a URL shortener", "debug a slow database query", "handle a disagreement with a teammate",
+    "roll out a risky migration", "review a large pull request", "design a rate limiter",
+    "onboard onto an unfamiliar codebase", "recover from a production outage",
+]
+
+
+class FakeLLMError(RuntimeError):
+    """Simulated provider failure"""
+
+
+class FakeLLM:
+    """
+    Deterministic offline stand-in for the OpenRouter model
+
+    Answers both agents with schema-valid tool calls after a simulated
+    latency (`latency_ms` +/- `jitter_ms`, plus `tail_ms` on `tail_rate`
+    of the calls) and fails `error_rate` of the calls. Every outcome is derived from the seed, the prompt and how many
+    times that prompt has been seen, so a run is reproducible no matter
+    how concurrent calls interleave.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        jitter_ms: float = 200,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        tail_rate: float = 0.0,
+        tail_ms: float = 0.0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self._seen: Counter = Counter()
+        self.calls = 0
+        self.errors = 0
+
+    def model(self) -> FunctionModel:
+        """A pydantic-ai model backed by this stand-in, for Agent(model=...) or agent.override()"""
+        return FunctionModel(self._respond, stream_function=self._stream)
+
+    def _rng(self, prompt: str) -> random.Random:
+        self._seen[prompt] += 1
+        self.calls += 1
+        return random.Random(f"{self.seed}:{self._seen[prompt]}:{prompt}")
+
+    def _delay(self, rng: random.Random) -> float:
+        tail = self.tail_ms if rng.random() < self.tail_rate else 0.0
+        return max(0.0, self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms) + tail) / 1000
+
+    def _maybe_fail(self, rng: random.Random):
+        if rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError("Simulated LLM provider error")
+
+    def _result_args(self, prompt: str, info: AgentInfo, rng: random.Random) -> str:
+        schema = json.dumps(info.result_tools[0].parameters_json_schema)
+        if "overall_score" in schema:
+            return json.dumps(_feedback(prompt, rng))
+        return json.dumps(_question(prompt, rng))
+
+    async def _respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = _last_prompt(messages)
+        rng = self._rng(prompt)
+        await asyncio.sleep(self._delay(rng))
+        self._maybe_fail(rng)
+        return ModelResponse(parts=[ToolCallPart.from_raw_args(info.result_tools[0].name, self._result_args(prompt, info, rng))])
+
+    async def _stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[dict[int, DeltaToolCall]]:
+        prompt = _last_prompt(messages)
+        rng = self._rng(prompt)
+        delay = self._delay(rng)
+        # A third of the latency before the first token, the rest spread over the chunks
+        await asyncio.sleep(delay / 3)
+        self._maybe_fail(rng)
+        args = self._result_args(prompt, info, rng)
+        chunks = [args[i:i + 24] for i in range(0, len(args), 24)]
+        for i, chunk in enumerate(chunks):
+            yield {0: DeltaToolCall(name=info.result_tools[0].name if i == 0 else None, json_args=chunk)}
+            await asyncio.sleep(2 * delay / 3 / len(chunks))
+
+
+def _last_prompt(messages: list[ModelMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart):
+                    return part.content
+    return ""
+
+
+def _question(prompt: str, rng: random.Random) -> dict:
+    if "Increase difficulty" in prompt:
+        difficulty = "hard"
+    elif "more fundamental" in prompt:
+        difficulty = "easy"
+    else:
+        difficulty = "medium"
+    return {
+        "session_id": "",
+        "question": f"How would you {rng.choice(SUBJECTS)}? (variant {rng.randrange(10000)})",
+        "context": "Walk through your reasoning step by step",
+        "difficulty": difficulty,
+        "expected_topics": rng.sample(TOPICS, rng.randint(3, 5)),
+        "time_limit_seconds": rng.choice([120, 180, 240, 300]),
+    }
+
+
+def _section(prompt: str, name: str, end: str) -> str:
+    match = re.search(rf"{name}: (.*?)\n\n{end}", prompt, re.S)
+    return match.group(1) if match else ""
+
+
+def _feedback(prompt: str, rng: random.Random) -> dict:
+    answer = _section(prompt, "ANSWER", "EXPECTED TOPICS").lower()
+    topics = [t.strip() for t in _section(prompt, "EXPECTED TOPICS", "INTERVIEW TYPE").split(",") if t.strip()]
+    covered = [t for t in topics if t.lower() in answer]
+    words = len(answer.split())
+
+    completeness = round(100 * len(covered) / len(topics)) if topics else min(100, 30 + words // 2)
+    clarity = min(100, 40 + words // 3 + rng.randint(0, 10))
+    accuracy = min(100, 45 + rng.randint(0, 40))
+    communication = min(100, 50 + rng.randint(0, 35))
+    overall = round(0.25 * clarity + 0.35 * accuracy + 0.25 * completeness + 0.15 * communication)
+    return {
+        "overall_score": overall,
+        "feedback_detail": {
+            "clarity": clarity,
+            "technical_accuracy": accuracy,
+            "completeness": completeness,
+            "communication": communication,
+        },
+        "strengths": ["Clear structure", "Relevant example"][:rng.randint(1, 2)],
+        "improvements": ["Go deeper on trade-offs", "Quantify the impact"][:rng.randint(1, 2)],
+        "missing_topics": [t for t in topics if t not in covered],
+        "suggested_answer": "A strong answer would " + " and ".join(topics or ["give a concrete example"]) + ".",
+        "follow_up_question": None,
+    }
+
+
+def create_fake_llm(seed: Optional[int] = None, seed_offset: int = 0) -> FakeLLM:
+    """Build the stand-in from LLM_FAKE_* environment settings"""
+    return FakeLLM(
+        latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", 800)),
+        jitter_ms=float(os.getenv("LLM_FAKE_JITTER_MS", 200)),
+        error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", 0)),
+        seed=(int(os.getenv("LLM_FAKE_SEED", 0)) if seed is None else seed) + seed_offset,
+        tail_rate=float(os.getenv("LLM_FAKE_TAIL_RATE", 0)),
+        tail_ms=float(os.getenv("LLM_FAKE_TAIL_MS", 0)),
+    )
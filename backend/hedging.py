@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from pydantic_ai.models import Model
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ModelLatency:
+    """Rolling latency window and call counters for one model"""
+
+    def __init__(self, name: str, model: "Model", window: int = 200):
+        self.name = name
+        self.model = model
+        self._samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.wins = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile of the window, or None while it is empty"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    @property
+    def samples(self) -> int:
+        return len(self._samples)
+
+    def stats(self) -> dict:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "calls": self.calls,
+            "wins": self.wins,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "samples": self.samples,
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+def _consume_result(task: asyncio.Task):
+    # Losers may fail after we stopped waiting for them
+    if not task.cancelled():
+        task.exception()
+
+
+class HedgedModels:
+    """
+    Race a pool of models, hedging slow calls
+
+    Every call goes to the primary (first) model. If it has not finished
+    by the primary's hedge deadline, or fails, the same call is issued to
+    the alternate with the lowest median latency (the primary itself if it
+    is the only model). The first valid result wins and the other call is
+    cancelled.
+
+    The deadline is the `hedge_quantile` latency of the primary's recent
+    successful calls, clamped to [min_deadline, max_deadline], and
+    `initial_deadline` until `min_samples` calls have been seen. Calls
+    cancelled after losing are not recorded, so a heavy tail lowers the
+    deadline rather than feeding on itself.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Tuple[str, "Model"]],
+        hedge_quantile: float = 0.95,
+        initial_deadline: float = 8.0,
+        min_deadline: float = 1.0,
+        max_deadline: float = 30.0,
+        min_samples: int = 20,
+        window: int = 200,
+        enabled: bool = True
+    ):
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models: List[ModelLatency] = [ModelLatency(name, model, window) for name, model in models]
+        self.hedge_quantile = hedge_quantile
+        self.initial_deadline = initial_deadline
+        self.min_deadline = min_deadline
+        self.max_deadline = max_deadline
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.hedged = 0
+        self.hedges_won = 0
+
+    @property
+    def primary(self) -> ModelLatency:
+        return self.models[0]
+
+    def hedge_deadline(self, entry: ModelLatency) -> float:
+        """Seconds to wait for `entry` before hedging"""
+        if entry.samples < self.min_samples:
+            return self.initial_deadline
+        return min(self.max_deadline, max(self.min_deadline, entry.quantile(self.hedge_quantile)))
+
+    def _alternate(self, exclude: ModelLatency) -> ModelLatency:
+        others = [entry for entry in self.models if entry is not exclude] or [exclude]
+        # Models without samples sort first so every model gets measured
+        return min(others, key=lambda entry: entry.quantile(0.5) or 0.0)
+
+    async def run(self, call: Callable[["Model"], Awaitable[T]], can_hedge: Callable[[], bool] = lambda: True) -> T:
+        """
+        Run `call(model)` on the primary, hedging it if it is slow or fails
+
+        `can_hedge` is checked before issuing the second call, so callers
+        can suppress hedges while the LLM backend is saturated.
+        """
+        attempts: Dict[asyncio.Task, Tuple[ModelLatency, float, bool]] = {}
+
+        def launch(entry: ModelLatency, is_hedge: bool):
+            entry.calls += 1
+            task = asyncio.ensure_future(call(entry.model))
+            task.add_done_callback(_consume_result)
+            attempts[task] = (entry, time.perf_counter(), is_hedge)
+
+        primary = self.primary
+        launch(primary, False)
+        hedged = not self.enabled
+        deadline = time.perf_counter() + self.hedge_deadline(primary)
+        error: Optional[BaseException] = None
+
+        def hedge(reason: str):
+            nonlocal hedged
+            hedged = True
+            if not can_hedge():
+                return
+            entry = self._alternate(primary)
+            logger.info(f"Hedging {primary.name} call on {entry.name}: {reason}")
+            self.hedged += 1
+            launch(entry, True)
+
+        try:
+            while attempts:
+                timeout = None if hedged else max(0.0, deadline - time.perf_counter())
+                done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge("deadline passed")
+                    continue
+                for task in done:
+                    entry, started, is_hedge = attempts.pop(task)
+                    if task.exception() is None:
+                        entry.record(time.perf_counter() - started)
+                        entry.wins += 1
+                        self.hedges_won += is_hedge
+                        return task.result()
+                    entry.errors += 1
+                    error = task.exception()
+                    logger.warning(f"LLM call on {entry.name} failed: {str(error)}")
+                if not hedged:
+                    hedge("primary failed")
+            raise error
+        finally:
+            for task, (entry, _, _) in attempts.items():
+                task.cancel()
+                entry.cancelled += 1
+
+    def stats(self) -> dict:
+        """Hedge counters, the current deadline and per-model latency"""
+        return {
+            "enabled": self.enabled,
+            "hedged": self.hedged,
+            "hedges_won": self.hedges_won,
+            "deadline_seconds": round(self.hedge_deadline(self.primary), 3),
+            "models": {entry.name: entry.stats() for entry in self.models},
+        }
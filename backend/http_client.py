@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def llm_timeout() -> httpx.Timeout:
+    """Per-call timeouts for LLM requests"""
+    return httpx.Timeout(
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", 5)),
+        read=float(os.getenv("LLM_READ_TIMEOUT_SECONDS", 45)),
+        write=float(os.getenv("LLM_WRITE_TIMEOUT_SECONDS", 10)),
+        pool=float(os.getenv("LLM_POOL_TIMEOUT_SECONDS", 10)),
+    )
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body wrapper that reports when the response is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Connection-pooling transport that counts requests from send until the body is closed"""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.in_flight -= 1
+            self.errors += 1
+            raise
+        response.stream = _TrackedStream(response.stream, self._release)
+        return response
+
+    def _release(self):
+        self.in_flight -= 1
+
+    def connection_stats(self) -> dict:
+        """Open/idle connection counts from the underlying httpcore pool"""
+        pool = getattr(self._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        return {
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+        }
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class LLMHttpClient:
+    """
+    The single httpx client shared by every OpenRouter call
+
+    Caps total connections to the provider, keeps them alive between
+    calls and uses HTTP/2 when the `h2` package is installed.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OPENROUTER_BASE_URL,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60,
+        http2: bool = True
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            logger.warning("HTTP/2 requested for LLM calls but 'h2' is not installed; using HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.transport = InstrumentedTransport(httpx.AsyncHTTPTransport(limits=limits, http2=self.http2))
+        self.client = httpx.AsyncClient(transport=self.transport, timeout=llm_timeout())
+
+    async def warm_up(self, connections: int = 2, timeout: float = 5) -> int:
+        """Pre-establish connections to the provider; returns how many requests succeeded"""
+        if connections <= 0:
+            return 0
+        # HTTP/2 multiplexes every call over one connection
+        count = 1 if self.http2 else min(connections, self.max_connections)
+
+        async def ping() -> bool:
+            try:
+                await self.client.head(f"{self.base_url}/models", timeout=timeout)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"LLM connection warm-up failed: {str(e)}")
+                return False
+
+        results = await asyncio.gather(*(ping() for _ in range(count)))
+        warmed = sum(results)
+        logger.info(f"Warmed up {warmed}/{count} LLM connections")
+        return warmed
+
+    def stats(self) -> dict:
+        """Pool utilization"""
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "in_flight": self.transport.in_flight,
+            "peak_in_flight": self.transport.peak_in_flight,
+            "utilization": round(self.transport.in_flight / self.max_connections, 4),
+            "requests": self.transport.requests,
+            "transport_errors": self.transport.errors,
+            **self.transport.connection_stats(),
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def create_llm_http_client(base_url: Optional[str] = None) -> LLMHttpClient:
+    """Build the shared client from LLM_* environment settings"""
+    return LLMHttpClient(
+        base_url=base_url or OPENROUTER_BASE_URL,
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 10)),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 60)),
+        http2=os.getenv("LLM_HTTP2", "true").lower() == "true",
+    )
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from session_store import SessionStore, SessionStoreBusyError
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class IdempotencyConflictError(Exception):
+    """An Idempotency-Key was reused for a different request"""
+
+
+class IdempotencyPendingError(Exception):
+    """The request holding an Idempotency-Key is still running in another worker"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def request_fingerprint(body: str) -> str:
+    """Digest of a serialized request body"""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Responses of non-idempotent requests by client-chosen Idempotency-Key
+
+    Keys and responses are kept in the session store, so with a shared
+    store every worker recognizes a retry. The first request with a key
+    claims it and runs; a repeat after it succeeded gets the stored
+    response, for `ttl_seconds`. A repeat while it is still running awaits
+    the same call when it reaches the same worker, and otherwise polls the
+    store for up to `max_wait_seconds` before giving up with
+    IdempotencyPendingError. Failed calls release the key, so the client
+    can retry them. A claim lasts `lease_seconds`, after which the key is
+    free again in case the worker holding it died. Keys are scoped per
+    endpoint and bound to the request body: reusing a key for a different
+    body is a conflict. The call runs detached from the request that
+    started it, so a client that gives up and retries attaches to it
+    instead of starting another.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        ttl_seconds: float = 3600,
+        lease_seconds: float = 300,
+        max_wait_seconds: float = 30,
+        poll_interval_seconds: float = 0.05
+    ):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        # Claims made by this process carry its owner id
+        self.owner = uuid.uuid4().hex
+        self._running: Dict[Tuple[str, str], Tuple[str, asyncio.Task]] = {}
+        self.executed = 0
+        self.attached = 0
+        self.replayed = 0
+        self.waited = 0
+        self.wait_timeouts = 0
+        self.conflicts = 0
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        model: Type[M],
+        fn: Callable[[], Awaitable[M]]
+    ) -> Tuple[M, bool]:
+        """Result of `fn()` for this key, and whether it came from an earlier request"""
+        entry_key = (scope, key)
+        deadline = time.monotonic() + self.max_wait_seconds
+        delay = self.poll_interval_seconds
+        while True:
+            running = self._running.get(entry_key)
+            if running is not None:
+                if running[0] != fingerprint:
+                    self._conflict()
+                self.attached += 1
+                logger.info(f"Attaching to in-flight {scope} request with Idempotency-Key {key}")
+                return await asyncio.shield(running[1]), True
+
+            record = self.store.claim_idempotency_key(
+                scope, key, fingerprint, self.owner, time.time() + self.lease_seconds)
+            if record is None:
+                break
+            if record.fingerprint != fingerprint:
+                self._conflict()
+            if record.response is not None:
+                self.replayed += 1
+                logger.info(f"Replaying stored {scope} response for Idempotency-Key {key}")
+                return model.model_validate_json(record.response), True
+
+            # Claimed by another worker that has not finished yet
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.wait_timeouts += 1
+                raise IdempotencyPendingError(
+                    "A request with this Idempotency-Key is still running", retry_after=1)
+            if delay == self.poll_interval_seconds:
+                self.waited += 1
+                logger.info(f"Waiting for {scope} request with Idempotency-Key {key} in another worker")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(2 * delay, 1.0)
+
+        task = asyncio.ensure_future(self._execute(scope, key, fn))
+        self._running[entry_key] = (fingerprint, task)
+        task.add_done_callback(lambda _: self._running.pop(entry_key, None))
+        self.executed += 1
+        return await asyncio.shield(task), False
+
+    async def _execute(self, scope: str, key: str, fn: Callable[[], Awaitable[M]]) -> M:
+        try:
+            result = await fn()
+        except BaseException:
+            await self._settle(self.store.release_idempotency_key, scope, key, self.owner)
+            raise
+        completed = await self._settle(
+            self.store.complete_idempotency_key,
+            scope, key, self.owner, result.model_dump_json(), time.time() + self.ttl_seconds)
+        if completed is False:
+            logger.warning(f"Idempotency-Key {key} for {scope} was claimed again before its response was stored")
+        return result
+
+    async def _settle(self, write: Callable, *args):
+        try:
+            return write(*args)
+        except SessionStoreBusyError:
+            pass
+        # Off the event loop the store waits longer for its lock
+        try:
+            return await asyncio.to_thread(write, *args)
+        except SessionStoreBusyError as e:
+            logger.warning(f"Could not settle Idempotency-Key {args[1]}, its claim will lapse: {str(e)}")
+
+    def _conflict(self):
+        self.conflicts += 1
+        raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+
+    def stats(self) -> dict:
+        return {
+            "keys": self.store.idempotency_keys(),
+            "in_flight": len(self._running),
+            "executed": self.executed,
+            "attached": self.attached,
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "wait_timeouts": self.wait_timeouts,
+            "conflicts": self.conflicts,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyInit(Generic[T]):
+    """
+    A value built once, on first use, from any thread
+
+    `get()` builds the value under a lock (double-checked, so reads after
+    the first are lock-free); `aget()` builds it in a worker thread so
+    heavy imports never block the event loop. A failed build is not
+    cached: the next caller tries again.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._ready = False
+        self.build_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        """The value, building it first if needed (blocking)"""
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                start = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.build_seconds = time.perf_counter() - start
+                self.last_error = None
+                self._ready = True
+                logger.info(f"{self.name} initialized in {self.build_seconds:.2f}s")
+        return self._value
+
+    async def aget(self) -> T:
+        """The value, building it in a worker thread if needed"""
+        if self._ready:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self._ready,
+            "build_seconds": round(self.build_seconds, 3) if self.build_seconds is not None else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,163 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from models import FeedbackDetail, ProvisionalScore
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+", re.M)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i in is it its of on or our so that the their them
+then there these they this to was we were what when where which who why will with you your
+""".split())
+
+# Longest first, so "ations" wins over "s"
+SUFFIXES = ("ations", "ation", "ability", "ments", "ment", "ings", "ing", "ency", "ies", "ied",
+            "able", "ity", "ent", "ed", "es", "ly", "s")
+
+DISCOURSE_MARKERS = (
+    "first", "second", "third", "then", "next", "finally", "because", "therefore", "however",
+    "for example", "for instance", "such as", "in summary", "overall", "trade-off", "tradeoff",
+    "on the other hand", "as a result", "in my experience",
+)
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.5
+AVERAGE_ANSWER_TERMS = 120
+
+# A topic counts as covered at this share of its weighted terms
+COVERAGE_THRESHOLD = 0.5
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping so 'caching', 'caches' and 'cache' share a term"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 4 else word
+
+
+def terms(text: str) -> List[str]:
+    """Stemmed content terms of a text, in order"""
+    return [stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+@lru_cache(maxsize=4096)
+def topic_index(topics: Tuple[str, ...]) -> Tuple[Dict[str, List[Tuple[int, float]]], Tuple[Tuple[str, ...], ...]]:
+    """
+    Precomputed postings for a question's expected topics
+
+    Maps each stemmed term to (topic position, weight) pairs. A term's
+    weight is its IDF across the question's topics, normalized so each
+    topic's weights sum to 1; terms shared by many topics say less about
+    any one of them. Also returns each topic's term sequence for phrase
+    matching.
+    """
+    topic_terms = [tuple(dict.fromkeys(terms(topic))) for topic in topics]
+    df = Counter(term for unique in topic_terms for term in unique)
+    n = len(topics)
+
+    postings: Dict[str, List[Tuple[int, float]]] = {}
+    for i, unique in enumerate(topic_terms):
+        idf = {term: math.log(1 + n / df[term]) for term in unique}
+        total = sum(idf.values())
+        for term, weight in idf.items():
+            postings.setdefault(term, []).append((i, weight / total))
+    return postings, tuple(tuple(terms(topic)) for topic in topics)
+
+
+def _contains_phrase(answer_terms: List[str], phrase: Tuple[str, ...]) -> bool:
+    if len(phrase) < 2:
+        return False
+    width = len(phrase)
+    return any(tuple(answer_terms[i:i + width]) == phrase for i in range(len(answer_terms) - width + 1))
+
+
+def topic_coverage(answer_terms: List[str], topics: List[str]) -> List[float]:
+    """Per-topic coverage in [0, 1] from one pass over the answer's terms"""
+    if not topics:
+        return []
+    postings, phrases = topic_index(tuple(topics))
+    tf = Counter(term for term in answer_terms if term in postings)
+    length_norm = 1 - BM25_B + BM25_B * len(answer_terms) / AVERAGE_ANSWER_TERMS
+
+    coverage = [0.0] * len(topics)
+    for term, count in tf.items():
+        saturated = count * (BM25_K1 + 1) / (count + BM25_K1 * length_norm) / (BM25_K1 + 1)
+        for i, weight in postings[term]:
+            coverage[i] += weight * min(1.0, 2 * saturated)
+    for i, phrase in enumerate(phrases):
+        if _contains_phrase(answer_terms, phrase):
+            coverage[i] = 1.0
+    return [min(1.0, c) for c in coverage]
+
+
+def _length_score(words: int) -> float:
+    if words < 15:
+        return 20.0
+    if words < 80:
+        return 20 + 80 * (words - 15) / 65
+    if words <= 400:
+        return 100.0
+    return max(70.0, 100 - (words - 400) / 20)
+
+
+def _sentence_score(words: int, sentences: int) -> float:
+    average = words / max(1, sentences)
+    if 8 <= average <= 25:
+        return 100.0
+    return max(30.0, 100 - 4 * (abs(average - 16) - 9))
+
+
+def score_answer(answer: str, expected_topics: List[str]) -> ProvisionalScore:
+    """
+    Score an answer locally in well under a millisecond
+
+    Completeness comes from BM25-weighted coverage of the expected topics;
+    clarity and communication from length, sentence shape, discourse
+    markers and vocabulary variety. Technical accuracy cannot be judged
+    locally, so it is estimated from coverage and specificity and capped
+    at 85.
+    """
+    text = answer.lower()
+    tokens = _TOKEN.findall(text)
+    words = len(tokens)
+    sentences = len(_SENTENCE_END.findall(answer.strip() + " ")) or 1
+    answer_terms = [stem(t) for t in tokens if t not in STOPWORDS]
+
+    coverage = topic_coverage(answer_terms, expected_topics)
+    covered = [t for t, c in zip(expected_topics, coverage) if c >= COVERAGE_THRESHOLD]
+    missing = [t for t, c in zip(expected_topics, coverage) if c < COVERAGE_THRESHOLD]
+
+    length = _length_score(words)
+    shape = _sentence_score(words, sentences)
+    markers = sum(1 for marker in DISCOURSE_MARKERS if marker in text)
+    structure = min(100.0, 30 + 20 * markers + (20 if _LIST_ITEM.search(answer) else 0))
+    variety = min(100.0, 100 * len(set(tokens)) / words / 0.6) if words else 0.0
+    specificity = min(100.0, 40 + 20 * sum(1 for t in tokens if t.isdigit()) + 15 * markers)
+    topic_score = 100 * sum(coverage) / len(coverage) if coverage else length
+
+    detail = FeedbackDetail(
+        clarity=round(0.4 * length + 0.35 * structure + 0.25 * shape),
+        technical_accuracy=round(0.6 * topic_score + 0.25 * specificity),
+        completeness=round(0.75 * topic_score + 0.25 * length),
+        communication=round(0.4 * shape + 0.3 * variety + 0.3 * length),
+    )
+    overall = round(
+        0.25 * detail.clarity
+        + 0.35 * detail.technical_accuracy
+        + 0.25 * detail.completeness
+        + 0.15 * detail.communication
+    )
+    return ProvisionalScore(
+        overall_score=overall,
+        feedback_detail=detail,
+        covered_topics=covered,
+        missing_topics=missing,
+    )
@@ -1,31 +1,99 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple, Type, Union
 from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
 
 from models import (
     StartInterviewRequest,
+    AnswerItem,
     SubmitAnswerRequest,
+    BatchAnswerRequest,
     QuestionResponse,
     AnswerFeedback,
     HealthResponse,
     ErrorResponse,
-    GetNextQuestionRequest
+    GetNextQuestionRequest,
+    ProvisionalEvaluation,
+    InterviewType,
+    ExperienceLevel,
+    ChannelStartMessage,
+    ChannelResumeMessage,
+    ChannelAnswerMessage,
+    ChannelNextMessage,
+    ChannelStatsMessage,
+    ChannelPingMessage,
+    channel_message_adapter
 )
 from agent import (
     generate_interview_question,
     evaluate_answer,
-    check_agent_health
+    evaluate_answers,
+    stream_answer_evaluation,
+    check_agent_health,
+    circuit_states,
+    prefetch_next_question,
+    settle_prefetch,
+    question_pool,
+    question_prefetcher,
+    question_dedup,
+    evaluation_cache,
+    llm_http_client,
+    llm_singleflight,
+    llm_scheduler,
+    llm_agents,
+    model_stats,
+    warm_up_llm,
+    question_breaker,
+    feedback_breaker,
+    evaluation_jobs,
+    question_bank
+)
+from idempotency import IdempotencyConflictError, IdempotencyPendingError, IdempotencyStore, request_fingerprint
+from local_scorer import score_answer
+import metrics
+from scheduler import LLMOverloadedError, Priority
+from session_record import SessionRecord
+from session_store import SessionFilter, SessionStoreBusyError
+from ws_channel import (
+    ChannelClosed,
+    ChannelSender,
+    ConnectionLimiter,
+    PinnedSession,
+    SlowClientError,
+    channel_disconnects,
+    channel_messages
 )
 from utils import (
     create_session,
     get_session,
     update_session_score,
+    update_session_scores,
     get_session_stats,
-    cleanup_old_sessions
+    session_stats,
+    cleanup_old_sessions,
+    format_sse,
+    run_session_sweeper,
+    register_question,
+    get_registered_question,
+    seen_questions,
+    next_difficulty,
+    bank_question_rank,
+    likely_difficulties,
+    difficulty_after,
+    get_session_history,
+    export_history,
+    gzip_stream,
+    session_store,
+    question_registry,
+    score_analytics,
+    adaptive_difficulty
 )
 
 # Load environment variables
@@ -44,10 +112,148 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Interview Prep Simulator API")
     logger.info(f"Agent health: {check_agent_health()}")
+    # Agents and provider connections are readied in the background so
+    # health checks are answered as soon as the server is listening
+    warm_up = asyncio.create_task(warm_up_llm())
+    sweeper = asyncio.create_task(
+        run_session_sweeper(float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", 60)))
+    )
     yield
     # Shutdown
     logger.info("👋 Shutting down API")
+    warm_up.cancel()
+    sweeper.cancel()
+    await evaluation_jobs.close()
+    await question_prefetcher.close()
+    await question_pool.close()
     cleanup_old_sessions()
+    session_store.close()
+    if question_bank:
+        question_bank.close()
+    await llm_http_client.aclose()
+
+def session_profile(session: SessionRecord) -> dict:
+    """Interview settings stored on a session, as agent arguments"""
+    return {
+        "interview_type": InterviewType(session.interview_type),
+        "role": session.role,
+        "experience_level": ExperienceLevel(session.experience_level),
+        "domain": session.domain,
+    }
+
+def session_average(session: SessionRecord) -> Optional[float]:
+    """Running average score of a session, or None before the first answer"""
+    return session.average_score if session.questions_asked else None
+
+def resolve_question(request: AnswerItem):
+    """
+    Fill in the question text, and expected topics if none were sent, from a question_id
+
+    An id that expired or was registered by another worker falls back to
+    the question text sent with it; without one it is a 404.
+    """
+    if not request.question_id:
+        return
+    registered = get_registered_question(request.question_id)
+    if registered is None:
+        if request.question:
+            logger.info(f"Question {request.question_id} not registered; using the text sent with it")
+            return
+        raise HTTPException(
+            status_code=404,
+            detail="Question not found. It may have expired; send the question text instead."
+        )
+    request.question = registered.question
+    if not request.expected_topics:
+        request.expected_topics = registered.expected_topics
+
+async def evaluate_and_record(
+    request: Union[SubmitAnswerRequest, ChannelAnswerMessage],
+    session: SessionRecord
+) -> AnswerFeedback:
+    """Evaluate an answer with the LLM and fold the score into the session"""
+    profile = session_profile(session)
+    feedback = await evaluate_answer(
+        question=request.question,
+        answer=request.answer,
+        expected_topics=request.expected_topics,
+        interview_type=profile["interview_type"],
+        use_cache=not request.bypass_cache
+    )
+    
+    settle_prefetch(
+        **profile,
+        session_id=session.session_id,
+        score=feedback.overall_score,
+        difficulty=difficulty_after(session, request.question, feedback.overall_score)
+    )
+    
+    # Update session stats
+    update_session_score(
+        session=session,
+        score=feedback.overall_score,
+        question=request.question,
+        answer=request.answer
+    )
+    return feedback
+
+async def stream_and_record(
+    request: Union[SubmitAnswerRequest, ChannelAnswerMessage],
+    session: SessionRecord
+) -> AsyncIterator[Tuple[str, dict]]:
+    """Instant local score, then the streamed LLM feedback; the final score is folded into the session"""
+    profile = session_profile(session)
+    yield "provisional", score_answer(request.answer, request.expected_topics).model_dump()
+    async for event, payload in stream_answer_evaluation(
+        question=request.question,
+        answer=request.answer,
+        expected_topics=request.expected_topics,
+        interview_type=profile["interview_type"],
+        use_cache=not request.bypass_cache
+    ):
+        if event == "complete":
+            settle_prefetch(
+                **profile,
+                session_id=session.session_id,
+                score=payload["overall_score"],
+                difficulty=difficulty_after(session, request.question, payload["overall_score"])
+            )
+            update_session_score(
+                session=session,
+                score=payload["overall_score"],
+                question=request.question,
+                answer=request.answer
+            )
+        yield event, payload
+
+# Responses by Idempotency-Key for /start, /answer and /next, shared through the session store
+idempotency_store = IdempotencyStore(
+    session_store,
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 3600)),
+    lease_seconds=float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", 300)),
+    max_wait_seconds=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+)
+IDEMPOTENCY_KEY_HEADER = Header(None, alias="Idempotency-Key", max_length=255)
+
+async def run_idempotent(
+    scope: str,
+    idempotency_key: Optional[str],
+    request: BaseModel,
+    response: Response,
+    model: Type[BaseModel],
+    fn: Callable[[], Awaitable[BaseModel]]
+):
+    """Run `fn` once per Idempotency-Key, replaying its result to repeats; without a key just run it"""
+    if not idempotency_key:
+        return await fn()
+    try:
+        result, replayed = await idempotency_store.run(
+            scope, idempotency_key, request_fingerprint(request.model_dump_json()), model, fn)
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -68,8 +274,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Idempotent-Replayed"],
 )
 
+# Per-route latency histograms for /metrics
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+# Gauges read at scrape time
+metrics.Gauge("sessions_live", "Sessions currently stored", session_store.live_sessions)
+metrics.Gauge("llm_calls_active", "LLM calls holding a scheduler slot", lambda: llm_scheduler.stats()["active"])
+metrics.Gauge("llm_calls_queued", "LLM calls waiting for a scheduler slot", lambda: llm_scheduler.stats()["waiting"])
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -82,6 +297,45 @@ async def global_exception_handler(request: Request, exc: Exception):
         ).model_dump()
     )
 
+# LLM admission control refused the work; tell the client when to come back
+@app.exception_handler(LLMOverloadedError)
+async def overloaded_exception_handler(request: Request, exc: LLMOverloadedError):
+    logger.warning(f"Shedding {request.url.path}: {str(exc)}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=ErrorResponse(
+            error="Service overloaded",
+            detail=f"{str(exc)}. Retry in {exc.retry_after}s."
+        ).model_dump(mode="json"),
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Another worker held the session store's write lock for too long
+@app.exception_handler(SessionStoreBusyError)
+async def store_busy_exception_handler(request: Request, exc: SessionStoreBusyError):
+    logger.warning(f"Session store busy for {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content=ErrorResponse(
+            error="Service busy",
+            detail=f"{str(exc)}. Retry in {exc.retry_after}s."
+        ).model_dump(mode="json"),
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# A retry arrived while another worker is still running the original request
+@app.exception_handler(IdempotencyPendingError)
+async def idempotency_pending_exception_handler(request: Request, exc: IdempotencyPendingError):
+    logger.warning(f"Idempotent request still running for {request.url.path}")
+    return JSONResponse(
+        status_code=409,
+        content=ErrorResponse(
+            error="Request in progress",
+            detail=f"{str(exc)}. Retry in {exc.retry_after}s."
+        ).model_dump(mode="json"),
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Health check endpoint
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -101,51 +355,68 @@ async def health_check():
         status="healthy" if agent_ready else "degraded",
         service="Interview Prep Simulator API",
         version="1.0.0",
-        agent_ready=agent_ready
+        agent_ready=agent_ready,
+        llm_circuits=circuit_states()
     )
 
 # Start interview session
 @app.post("/api/interview/start", response_model=QuestionResponse)
-async def start_interview(request: StartInterviewRequest):
+async def start_interview(
+    request: StartInterviewRequest,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER
+):
     """
     Start a new interview session and get the first question
     
     - Validates interview type, role, and experience level
     - Creates session ID for tracking
     - Generates contextually relevant first question using AI
+    - Send an `Idempotency-Key` header to make retries safe: a repeat
+      returns the original session instead of creating another
     """
-    try:
-        logger.info(f"Starting {request.interview_type} interview for {request.role}")
-        
-        # Create session
-        session_id = create_session(
-            interview_type=request.interview_type.value,
-            role=request.role,
-            experience_level=request.experience_level.value
-        )
-        
-        # Generate first question
-        question = await generate_interview_question(
-            interview_type=request.interview_type,
-            role=request.role,
-            experience_level=request.experience_level,
-            domain=request.domain,
-            session_id=session_id
-        )
-        
-        logger.info(f"Session {session_id} started successfully")
-        return question
-        
-    except Exception as e:
-        logger.error(f"Error starting interview: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to start interview: {str(e)}"
-        )
+    async def start():
+        try:
+            logger.info(f"Starting {request.interview_type} interview for {request.role}")
+
+            # Create session
+            session_id = create_session(
+                interview_type=request.interview_type.value,
+                role=request.role,
+                experience_level=request.experience_level.value,
+                domain=request.domain
+            )
+
+            # Generate first question
+            question = await generate_interview_question(
+                interview_type=request.interview_type,
+                role=request.role,
+                experience_level=request.experience_level,
+                domain=request.domain,
+                session_id=session_id
+            )
+
+            logger.info(f"Session {session_id} started successfully")
+            return register_question(question)
+
+        except (LLMOverloadedError, SessionStoreBusyError):
+            raise
+        except Exception as e:
+            logger.error(f"Error starting interview: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to start interview: {str(e)}"
+            )
+    
+    return await run_idempotent("start", idempotency_key, request, response, QuestionResponse, start)
 
 # Submit answer and get feedback
 @app.post("/api/interview/answer", response_model=AnswerFeedback)
-async def submit_answer(request: SubmitAnswerRequest):
+async def submit_answer(
+    request: SubmitAnswerRequest,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER
+):
     """
     Submit answer for evaluation
     
@@ -153,11 +424,63 @@ async def submit_answer(request: SubmitAnswerRequest):
     - Uses AI to evaluate answer quality
     - Returns detailed feedback with scores
     - Updates session statistics
+    - Send an `Idempotency-Key` header to make retries safe: a repeat
+      returns the original feedback without evaluating or recording again
+    """
+    async def evaluate():
+        try:
+            logger.info(f"Processing answer for session {request.session_id}")
+
+            # Verify session exists
+            session = get_session(request.session_id)
+            if not session:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Session not found. Please start a new interview."
+                )
+
+            resolve_question(request)
+            profile = session_profile(session)
+
+            # Start generating the next question while this answer is evaluated
+            prefetch_next_question(
+                **profile,
+                session_id=request.session_id,
+                average_score=session_average(session),
+                difficulties=likely_difficulties(session, request.question)
+            )
+
+            # Evaluate answer using AI
+            feedback = await evaluate_and_record(request, session)
+
+            logger.info(f"Answer evaluated. Score: {feedback.overall_score}")
+            return feedback
+
+        except (HTTPException, LLMOverloadedError, SessionStoreBusyError):
+            raise
+        except Exception as e:
+            logger.error(f"Error evaluating answer: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to evaluate answer: {str(e)}"
+            )
+    
+    return await run_idempotent("answer", idempotency_key, request, response, AnswerFeedback, evaluate)
+
+# Submit answer, get a provisional score now and the LLM feedback later
+@app.post("/api/interview/answer/provisional", response_model=ProvisionalEvaluation)
+async def submit_answer_provisional(request: SubmitAnswerRequest):
+    """
+    Submit answer and get an instant local score
+    
+    - Scores topic coverage, structure and length locally in milliseconds
+    - Starts the LLM evaluation in the background
+    - Poll `/api/interview/evaluations/{evaluation_id}` for the final feedback;
+      session statistics are updated when it completes
     """
     try:
-        logger.info(f"Processing answer for session {request.session_id}")
+        logger.info(f"Provisional scoring for session {request.session_id}")
         
-        # Verify session exists
         session = get_session(request.session_id)
         if not session:
             raise HTTPException(
@@ -165,74 +488,204 @@ async def submit_answer(request: SubmitAnswerRequest):
                 detail="Session not found. Please start a new interview."
             )
         
-        # Evaluate answer using AI
-        feedback = await evaluate_answer(
-            question=request.question,
-            answer=request.answer,
-            expected_topics=[],  # Could extract from session history
-            interview_type=session["interview_type"]
-        )
+        resolve_question(request)
+        llm_scheduler.check_admission(Priority.EVALUATION)
         
-        # Update session stats
-        update_session_score(
+        profile = session_profile(session)
+        prefetch_next_question(
+            **profile,
             session_id=request.session_id,
-            score=feedback.overall_score,
-            question=request.question,
-            answer=request.answer
+            average_score=session_average(session),
+            difficulties=likely_difficulties(session, request.question)
         )
         
-        logger.info(f"Answer evaluated. Score: {feedback.overall_score}")
-        return feedback
+        provisional = score_answer(request.answer, request.expected_topics)
+        evaluation = evaluation_jobs.submit(
+            request.session_id, provisional, evaluate_and_record(request, session))
+        
+        logger.info(f"Provisional score: {provisional.overall_score}")
+        return evaluation
         
-    except HTTPException:
+    except (HTTPException, LLMOverloadedError, SessionStoreBusyError):
         raise
     except Exception as e:
-        logger.error(f"Error evaluating answer: {str(e)}", exc_info=True)
+        logger.error(f"Error scoring answer: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to evaluate answer: {str(e)}"
+            detail=f"Failed to score answer: {str(e)}"
         )
 
+# Poll a background evaluation
+@app.get("/api/interview/evaluations/{evaluation_id}", response_model=ProvisionalEvaluation)
+async def get_evaluation(evaluation_id: str):
+    """Provisional score plus the LLM feedback once it is ready"""
+    evaluation = evaluation_jobs.get(evaluation_id)
+    if not evaluation:
+        raise HTTPException(
+            status_code=404,
+            detail="Evaluation not found or expired"
+        )
+    return evaluation
+
+# Submit answer and stream feedback as Server-Sent Events
+@app.post("/api/interview/answer/stream")
+async def submit_answer_stream(request: SubmitAnswerRequest):
+    """
+    Submit answer for evaluation and stream the feedback
+    
+    - Emits a `provisional` event with the instant local score first
+    - Emits `scores`, `strengths` and `improvements` events as soon as the
+      model has produced each section
+    - Streams the model answer as incremental `suggested_answer` events
+    - Ends with a `complete` event carrying the validated AnswerFeedback
+    - Updates session statistics once the feedback is complete
+    - Answers 429 up front when the LLM queue is full, or ends with an
+      `overloaded` event if capacity runs out after the stream started
+    """
+    logger.info(f"Streaming answer feedback for session {request.session_id}")
+    
+    session = get_session(request.session_id)
+    if not session:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found. Please start a new interview."
+        )
+    
+    resolve_question(request)
+    llm_scheduler.check_admission(Priority.EVALUATION)
+    
+    profile = session_profile(session)
+    prefetch_next_question(
+        **profile,
+        session_id=request.session_id,
+        average_score=session_average(session),
+        difficulties=likely_difficulties(session, request.question)
+    )
+    
+    async def event_stream():
+        async for event, payload in stream_and_record(request, session):
+            yield format_sse(event, payload)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Evaluate a whole transcript, streaming results as Server-Sent Events
+@app.post("/api/interview/answer/batch")
+async def submit_answer_batch(request: BatchAnswerRequest):
+    """
+    Evaluate every answer of a mock interview in one request
+    
+    - Evaluates up to BATCH_EVAL_CONCURRENCY answers at a time
+    - Emits an `item` event with the index and AnswerFeedback of each
+      answer as soon as it is evaluated, in completion order
+    - Emits an `error` event for items refused by LLM admission control
+    - Records all scores in one session write, in interview order, and
+      ends with a `complete` event summarizing the batch; if the client
+      disconnects first, the answers evaluated so far are still recorded
+    """
+    logger.info(f"Batch evaluating {len(request.items)} answers for session {request.session_id}")
+    
+    session = get_session(request.session_id)
+    if not session:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found. Please start a new interview."
+        )
+    
+    for item in request.items:
+        resolve_question(item)
+    llm_scheduler.check_admission(Priority.EVALUATION)
+    
+    interview_type = session_profile(session)["interview_type"]
+    
+    async def event_stream():
+        results = {}
+        failed = 0
+        try:
+            async for index, feedback, error in evaluate_answers(
+                [(item.question, item.answer, item.expected_topics) for item in request.items],
+                interview_type=interview_type,
+                use_cache=not request.bypass_cache
+            ):
+                if error is not None:
+                    failed += 1
+                    yield format_sse("error", {"index": index, "detail": str(error), "retry_after": error.retry_after})
+                    continue
+                results[index] = feedback
+                yield format_sse("item", {"index": index, **feedback.model_dump()})
+        finally:
+            # Also when the client disconnected mid-batch: finished evaluations are kept
+            if results:
+                update_session_scores(session, [
+                    (results[i].overall_score, request.items[i].question, request.items[i].answer)
+                    for i in sorted(results)
+                ])
+        scores = [feedback.overall_score for feedback in results.values()]
+        yield format_sse("complete", {
+            "evaluated": len(results),
+            "failed": failed,
+            "average_score": round(sum(scores) / len(scores), 2) if scores else None,
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Get next question
 @app.post("/api/interview/next", response_model=QuestionResponse)
-async def get_next_question(request: GetNextQuestionRequest):
+async def get_next_question(
+    request: GetNextQuestionRequest,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER
+):
     """
     Get next interview question
     
     - Adjusts difficulty based on previous performance
     - Maintains conversation flow
+    - Send an `Idempotency-Key` header to make retries safe: a repeat
+      returns the same question
     """
-    try:
-        logger.info(f"Getting next question for session {request.session_id}")
-        
-        # Verify session
-        session = get_session(request.session_id)
-        if not session:
+    async def next_question():
+        try:
+            logger.info(f"Getting next question for session {request.session_id}")
+
+            # Verify session
+            session = get_session(request.session_id)
+            if not session:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Session not found"
+                )
+
+            # Generate next question
+            question = await generate_interview_question(
+                **session_profile(session),
+                session_id=request.session_id,
+                previous_score=request.previous_score,
+                priority=Priority.NEXT_QUESTION,
+                seen_questions=seen_questions(session),
+                difficulty=next_difficulty(session),
+                rank_bank_question=bank_question_rank(session)
+            )
+
+            return register_question(question, session)
+
+        except (HTTPException, LLMOverloadedError, SessionStoreBusyError):
+            raise
+        except Exception as e:
+            logger.error(f"Error getting next question: {str(e)}", exc_info=True)
             raise HTTPException(
-                status_code=404,
-                detail="Session not found"
+                status_code=500,
+                detail=f"Failed to get next question: {str(e)}"
             )
-        
-        # Generate next question
-        question = await generate_interview_question(
-            interview_type=session["interview_type"],
-            role=session["role"],
-            experience_level=session["experience_level"],
-            domain=None,
-            session_id=request.session_id,
-            previous_score=request.previous_score
-        )
-        
-        return question
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting next question: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to get next question: {str(e)}"
-        )
+    
+    return await run_idempotent("next", idempotency_key, request, response, QuestionResponse, next_question)
 
 # Get session statistics
 @app.get("/api/interview/stats/{session_id}")
@@ -246,7 +699,7 @@ async def get_stats(session_id: str):
                 detail="Session not found"
             )
         return stats
-    except HTTPException:
+    except (HTTPException, SessionStoreBusyError):
         raise
     except Exception as e:
         logger.error(f"Error getting stats: {str(e)}", exc_info=True)
@@ -255,6 +708,293 @@ async def get_stats(session_id: str):
             detail=f"Failed to get statistics: {str(e)}"
         )
 
+# Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Latency histograms and counters in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Session store statistics
+@app.get("/api/sessions/stats")
+async def get_sessions_stats():
+    """Live session count, expiry/eviction counters and question registry usage"""
+    return {
+        **session_store.stats(),
+        "question_registry": question_registry.stats(),
+        "idempotency": idempotency_store.stats(),
+    }
+
+# Paginated session history
+@app.get("/api/interview/history/{session_id}")
+async def get_history(
+    session_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Retained question/answer history of a session, oldest first
+    
+    - Returns at most `limit` entries and a `next_cursor` for the next page
+      (null on the last page)
+    """
+    try:
+        history = get_session_history(session_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if history is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found"
+        )
+    return history
+
+# Streaming history export
+@app.get("/api/interview/export")
+async def export_sessions(
+    session_id: Optional[str] = None,
+    interview_type: Optional[InterviewType] = None,
+    experience_level: Optional[ExperienceLevel] = None,
+    role: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """
+    Export retained history as newline-delimited JSON, one answer per line
+    
+    - Covers one session (`session_id`) or all sessions matching the filters
+    - Streams page by page, so memory stays constant
+    - `gzip=true` compresses the stream (Content-Encoding: gzip)
+    """
+    if session_id is not None and get_session(session_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found"
+        )
+    session_filter = SessionFilter(
+        interview_type=interview_type.value if interview_type else None,
+        experience_level=experience_level.value if experience_level else None,
+        role=role.strip() if role else None,
+        created_after=created_after.timestamp() if created_after else None,
+        created_before=created_before.timestamp() if created_before else None,
+    )
+    lines = export_history(session_filter, session_id)
+    headers = {"Content-Disposition": 'attachment; filename="interview-history.ndjson"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(lines), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+
+# Interview channel limits, per worker process
+channel_limiter = ConnectionLimiter(int(os.getenv("WS_MAX_CONNECTIONS", 1000)))
+CHANNEL_MAX_PENDING = int(os.getenv("WS_MAX_PENDING_MESSAGES", 32))
+CHANNEL_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", 10))
+CHANNEL_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", 900))
+CHANNEL_MAX_MESSAGE_BYTES = int(os.getenv("WS_MAX_MESSAGE_BYTES", 64 * 1024))
+
+metrics.Gauge("ws_connections_active", "Open interview channel connections", lambda: channel_limiter.active)
+
+async def channel_question(channel: ChannelSender, session: SessionRecord, previous_score: Optional[int] = None):
+    """Generate the session's next question and push it"""
+    question = await generate_interview_question(
+        **session_profile(session),
+        session_id=session.session_id,
+        previous_score=previous_score,
+        priority=Priority.NEXT_QUESTION,
+        seen_questions=seen_questions(session),
+        difficulty=next_difficulty(session),
+        rank_bank_question=bank_question_rank(session)
+    )
+    await channel.send("question", register_question(question, session).model_dump(mode="json"))
+
+async def channel_answer(channel: ChannelSender, session: SessionRecord, message: ChannelAnswerMessage):
+    """Evaluate an answer, pushing the feedback and then the next question"""
+    resolve_question(message)
+    llm_scheduler.check_admission(Priority.EVALUATION)
+    prefetch_next_question(
+        **session_profile(session),
+        session_id=session.session_id,
+        average_score=session_average(session),
+        difficulties=likely_difficulties(session, message.question)
+    )
+    
+    score = None
+    if message.stream:
+        async for event, payload in stream_and_record(message, session):
+            if event == "complete":
+                score = payload["overall_score"]
+            await channel.send(event, payload)
+    else:
+        await channel.send("provisional", score_answer(message.answer, message.expected_topics).model_dump())
+        feedback = await evaluate_and_record(message, session)
+        score = feedback.overall_score
+        await channel.send("complete", feedback.model_dump())
+    
+    if score is not None and message.next_question:
+        await channel_question(channel, session, previous_score=score)
+
+# Run a whole interview over one WebSocket
+@app.websocket("/ws/interview")
+async def interview_channel(websocket: WebSocket):
+    """
+    Interview channel: one connection for a whole session
+    
+    - Client messages are JSON objects with a `type`: `start`, `resume`,
+      `answer`, `next`, `stats` or `ping` (see the Channel*Message models)
+    - The server pushes `question`, `provisional`, the feedback events of
+      `/api/interview/answer/stream`, `stats` and `pong`, plus `error` or
+      `overloaded` when a message could not be handled
+    - The session is pinned to the connection by `start` or `resume`
+    - Messages are UTF-8 text frames of at most WS_MAX_MESSAGE_BYTES
+      encoded bytes; a binary frame closes the connection with 1003
+    - Messages are handled one at a time, so a client cannot pile up work;
+      outgoing messages are bounded per connection and a client that stops
+      reading is disconnected
+    """
+    if not channel_limiter.try_acquire():
+        await websocket.close(code=1013, reason="Too many connections")
+        return
+    await websocket.accept()
+    channel = ChannelSender(websocket, CHANNEL_MAX_PENDING, CHANNEL_SEND_TIMEOUT)
+    channel.start()
+    pinned: Optional[PinnedSession] = None
+    close_code, reason = 1000, "client"
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(websocket.receive(), CHANNEL_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                close_code, reason = 1001, "idle"
+                break
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            if frame.get("text") is None:
+                # The protocol is JSON text; binary frames are unsupported data
+                close_code, reason = 1003, "binary"
+                break
+            raw = frame["text"].encode()
+            if len(raw) > CHANNEL_MAX_MESSAGE_BYTES:
+                close_code, reason = 1009, "too_large"
+                break
+            
+            try:
+                message = channel_message_adapter.validate_json(raw)
+            except ValidationError as e:
+                channel_messages.inc("received", "invalid")
+                await channel.send("error", {
+                    "detail": "; ".join(
+                        ".".join(map(str, error["loc"])) + ": " + error["msg"] if error["loc"] else error["msg"]
+                        for error in e.errors()
+                    ),
+                })
+                continue
+            channel_messages.inc("received", message.type)
+            
+            try:
+                if isinstance(message, ChannelPingMessage):
+                    await channel.send("pong", {})
+                    continue
+                
+                if isinstance(message, ChannelStartMessage):
+                    session_id = create_session(
+                        interview_type=message.interview_type.value,
+                        role=message.role,
+                        experience_level=message.experience_level.value,
+                        domain=message.domain
+                    )
+                    pinned = PinnedSession(get_session(session_id))
+                    logger.info(f"Session {session_id} started over the interview channel")
+                    await channel_question(channel, pinned.session)
+                    continue
+                
+                if isinstance(message, ChannelResumeMessage):
+                    session = get_session(message.session_id)
+                    if not session:
+                        pinned = None
+                        raise HTTPException(status_code=404, detail="Session not found. Please start a new interview.")
+                    pinned = PinnedSession(session)
+                    await channel.send("stats", session_stats(session))
+                    continue
+                
+                session = pinned.get() if pinned else None
+                if not session:
+                    raise HTTPException(status_code=404, detail="No active session. Send a start or resume message first.")
+                
+                if isinstance(message, ChannelAnswerMessage):
+                    await channel_answer(channel, session, message)
+                elif isinstance(message, ChannelNextMessage):
+                    await channel_question(channel, session, previous_score=message.previous_score)
+                elif isinstance(message, ChannelStatsMessage):
+                    await channel.send("stats", session_stats(session))
+            
+            except ChannelClosed:
+                raise
+            except HTTPException as e:
+                await channel.send("error", {"detail": e.detail})
+            except (LLMOverloadedError, SessionStoreBusyError) as e:
+                logger.warning(f"Shedding interview channel {message.type}: {str(e)}")
+                await channel.send("overloaded", {"detail": str(e), "retry_after": e.retry_after})
+            except Exception as e:
+                logger.error(f"Error handling interview channel {message.type}: {str(e)}", exc_info=True)
+                await channel.send("error", {"detail": f"Failed to handle {message.type}: {str(e)}"})
+    
+    except WebSocketDisconnect:
+        reason = "client"
+    except SlowClientError as e:
+        logger.warning(f"Disconnecting slow interview channel client: {str(e)}")
+        close_code, reason = 1008, "slow_client"
+    except ChannelClosed:
+        reason = "client"
+    finally:
+        channel_limiter.release()
+        channel_disconnects.inc(reason)
+        await channel.aclose()
+        if reason != "client":
+            try:
+                await websocket.close(code=close_code)
+            except RuntimeError:
+                pass
+
+# Cross-session analytics
+@app.get("/api/analytics")
+async def get_analytics():
+    """Score aggregates by interview type, experience level, role, difficulty and cohort"""
+    return {
+        **score_analytics.snapshot(),
+        "adaptive": adaptive_difficulty.stats() if adaptive_difficulty else None,
+    }
+
+# Question pool statistics
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    """Question pool hit/miss counters and fill levels"""
+    return {
+        **question_pool.stats(),
+        "prefetch": question_prefetcher.stats(),
+        "bank": question_bank.stats() if question_bank else None,
+        "dedup": question_dedup.stats(),
+    }
+
+# Evaluation cache statistics
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Evaluation cache size and hit/miss counters"""
+    return evaluation_cache.stats()
+
+# LLM connection pool statistics
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    """Shared OpenRouter HTTP client utilization"""
+    return {
+        "http": llm_http_client.stats(),
+        "singleflight": llm_singleflight.stats(),
+        "scheduler": llm_scheduler.stats(),
+        "agents": llm_agents.stats(),
+        "models": model_stats(),
+        "breakers": {"question": question_breaker.stats(), "feedback": feedback_breaker.stats()},
+        "evaluation_jobs": evaluation_jobs.stats(),
+    }
+
 # Run server
 if __name__ == "__main__":
     import uvicorn
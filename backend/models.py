@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
+from typing import Annotated, Dict, Optional, List, Literal, Union
 from datetime import datetime
 from enum import Enum
 
@@ -20,6 +20,15 @@ class DifficultyLevel(str, Enum):
     MEDIUM = "medium"
     HARD = "hard"
 
+# Longest answer accepted for evaluation
+MAX_ANSWER_CHARS = 8000
+
+# Longest question text accepted with an answer
+MAX_QUESTION_CHARS = 2000
+
+# Most answers accepted in one batch evaluation
+MAX_BATCH_ITEMS = 25
+
 # Request Models
 class StartInterviewRequest(BaseModel):
     interview_type: InterviewType = Field(..., description="Type of interview")
@@ -32,10 +41,12 @@ class StartInterviewRequest(BaseModel):
     def validate_role(cls, v: str) -> str:
         return v.strip().title()
 
-class SubmitAnswerRequest(BaseModel):
-    session_id: str = Field(..., description="Interview session ID")
-    question: str = Field(..., description="The question being answered")
-    answer: str = Field(..., min_length=10, description="User's answer")
+class AnswerItem(BaseModel):
+    """One answered question"""
+    question_id: Optional[str] = Field(None, max_length=32, description="Id of the question being answered, as returned with it")
+    question: Optional[str] = Field(None, max_length=MAX_QUESTION_CHARS, description="The question being answered (when no question_id is given)")
+    answer: str = Field(..., min_length=10, max_length=MAX_ANSWER_CHARS, description="User's answer")
+    expected_topics: List[str] = Field(default_factory=list, max_length=20, description="Topics the question expects, as returned with it")
     
     @field_validator('answer')
     @classmethod
@@ -44,12 +55,63 @@ class SubmitAnswerRequest(BaseModel):
             raise ValueError("Answer must be at least 10 characters")
         return v.strip()
 
+    @model_validator(mode='after')
+    def require_question(self) -> 'AnswerItem':
+        if not self.question_id and not self.question:
+            raise ValueError("Either question_id or question is required")
+        return self
+
+class SubmitAnswerRequest(AnswerItem):
+    session_id: str = Field(..., description="Interview session ID")
+    bypass_cache: bool = Field(default=False, description="Re-evaluate even if a cached evaluation exists")
+
+class BatchAnswerRequest(BaseModel):
+    session_id: str = Field(..., description="Interview session ID")
+    items: List[AnswerItem] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS, description="Answered questions, in interview order")
+    bypass_cache: bool = Field(default=False, description="Re-evaluate even if cached evaluations exist")
+
 class GetNextQuestionRequest(BaseModel):
     session_id: str
     previous_score: Optional[int] = None
 
+# WebSocket channel messages (client to server), told apart by `type`
+class ChannelStartMessage(StartInterviewRequest):
+    """Start a session on this connection; the first question is pushed"""
+    type: Literal["start"]
+
+class ChannelResumeMessage(BaseModel):
+    """Attach an existing session to this connection"""
+    type: Literal["resume"]
+    session_id: str
+
+class ChannelAnswerMessage(AnswerItem):
+    """Answer the current question; feedback and then the next question are pushed"""
+    type: Literal["answer"]
+    stream: bool = Field(default=True, description="Push feedback sections as they are produced, not only the final feedback")
+    next_question: bool = Field(default=True, description="Push the next question once the feedback is complete")
+    bypass_cache: bool = Field(default=False, description="Re-evaluate even if a cached evaluation exists")
+
+class ChannelNextMessage(BaseModel):
+    """Ask for the next question"""
+    type: Literal["next"]
+    previous_score: Optional[int] = None
+
+class ChannelStatsMessage(BaseModel):
+    """Ask for the session statistics"""
+    type: Literal["stats"]
+
+class ChannelPingMessage(BaseModel):
+    type: Literal["ping"]
+
+ChannelMessage = Annotated[
+    Union[ChannelStartMessage, ChannelResumeMessage, ChannelAnswerMessage,
+          ChannelNextMessage, ChannelStatsMessage, ChannelPingMessage],
+    Field(discriminator="type")
+]
+channel_message_adapter = TypeAdapter(ChannelMessage)
+
 # Response Models (Agent Output)
-class QuestionResponse(BaseModel):
+class GeneratedQuestion(BaseModel):
     """Structured question generated by the agent"""
     session_id: str
     question: str = Field(..., description="The interview question")
@@ -58,6 +120,10 @@ class QuestionResponse(BaseModel):
     expected_topics: List[str] = Field(default_factory=list, description="Topics that should be covered")
     time_limit_seconds: int = Field(default=180, description="Suggested time to answer")
 
+class QuestionResponse(GeneratedQuestion):
+    """A question as served, with the id answers refer to it by"""
+    question_id: Optional[str] = Field(None, description="Assigned by the server when the question is served")
+
 class FeedbackDetail(BaseModel):
     """Detailed breakdown of feedback"""
     clarity: int = Field(..., ge=0, le=100, description="How clear and structured the answer was")
@@ -75,6 +141,22 @@ class AnswerFeedback(BaseModel):
     suggested_answer: str = Field(..., description="Example of a strong answer")
     follow_up_question: Optional[str] = Field(None, description="Natural follow-up question")
 
+class ProvisionalScore(BaseModel):
+    """Instant local score, shown until the LLM evaluation arrives"""
+    overall_score: int = Field(..., ge=0, le=100)
+    feedback_detail: FeedbackDetail
+    covered_topics: List[str] = Field(default_factory=list)
+    missing_topics: List[str] = Field(default_factory=list)
+
+class ProvisionalEvaluation(BaseModel):
+    """A provisional score plus the status of the LLM evaluation replacing it"""
+    evaluation_id: str
+    session_id: str
+    status: Literal["pending", "complete", "failed"]
+    provisional: ProvisionalScore
+    feedback: Optional[AnswerFeedback] = None
+    detail: Optional[str] = None
+
 class InterviewSession(BaseModel):
     """Session tracking"""
     session_id: str
@@ -97,4 +179,6 @@ class HealthResponse(BaseModel):
     service: str
     version: str
     agent_ready: bool
+    # Circuit breaker state per agent: closed, open or half_open
+    llm_circuits: Optional[Dict[str, str]] = None
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import random
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from local_scorer import terms
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures must agree between processes and restarts
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str) -> Set[int]:
+    """32-bit hashes of the stemmed content words and word pairs of a text"""
+    words = terms(text)
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little")
+        for gram in grams
+    }
+
+
+@lru_cache(maxsize=50000)
+def signature(text: str) -> Signature:
+    """MinHash signature of a text; equal positions estimate Jaccard similarity of shingles"""
+    hashes = shingles(text)
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(min((a * h + b) % _PRIME & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(left, right)) / NUM_PERM
+
+
+def _bands(sig: Signature) -> Iterable[Tuple[int, int]]:
+    for band in range(BANDS):
+        yield band, hash(sig[band * ROWS:(band + 1) * ROWS])
+
+
+class MinHashIndex:
+    """
+    Incremental LSH index over MinHash signatures
+
+    Signatures are split into BANDS bands of ROWS values; two texts become
+    candidates when any band matches exactly, which happens with high
+    probability above a Jaccard similarity of about (1/BANDS)^(1/ROWS)
+    (0.5). Candidates are confirmed against `threshold`. Holds at most
+    `max_items`, dropping the oldest first.
+    """
+
+    def __init__(self, threshold: float = 0.6, max_items: int = 20000):
+        self.threshold = threshold
+        self.max_items = max_items
+        self._items: "OrderedDict[str, Signature]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def query(self, sig: Signature) -> Optional[Tuple[str, float]]:
+        """The most similar indexed key at or above the threshold, with its similarity"""
+        candidates = set()
+        for band in _bands(sig):
+            candidates.update(self._buckets.get(band, ()))
+        best = None
+        for key in candidates:
+            score = similarity(sig, self._items[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def add(self, key: str, sig: Signature):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return
+        self._items[key] = sig
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(key)
+        while len(self._items) > self.max_items:
+            old_key, old_sig = self._items.popitem(last=False)
+            for band in _bands(old_sig):
+                bucket = self._buckets.get(band)
+                if bucket is not None:
+                    bucket.discard(old_key)
+                    if not bucket:
+                        del self._buckets[band]
+
+
+class QuestionDeduplicator:
+    """
+    Near-duplicate checks for questions about to be served
+
+    Within a session a question is a duplicate when it is at least
+    `threshold` similar to any question in the session's history; those
+    are rejected so the caller can pick another. Across sessions every
+    served question goes into a global LSH index, which only counts near
+    matches (the pool and bank deliberately reuse questions). Signatures
+    are cached per text, so checking a session's history is a handful of
+    tuple comparisons.
+    """
+
+    def __init__(self, threshold: float = 0.6, max_questions: int = 20000, enabled: bool = True):
+        self.threshold = threshold
+        self.enabled = enabled
+        self.index = MinHashIndex(threshold, max_questions)
+        self.checked = 0
+        self.session_duplicates = 0
+        self.recorded = 0
+        self.global_near_matches = 0
+
+    def duplicate_in_session(self, question: str, seen_questions: Iterable[str]) -> Optional[float]:
+        """Similarity to the closest earlier question of the session, if it is a near duplicate"""
+        if not self.enabled:
+            return None
+        self.checked += 1
+        sig = signature(question)
+        best = max((similarity(sig, signature(seen)) for seen in seen_questions), default=0.0)
+        if best >= self.threshold:
+            self.session_duplicates += 1
+            return best
+        return None
+
+    def record(self, question_id: str, question: str):
+        """Add a served question to the global index"""
+        if not self.enabled:
+            return
+        self.recorded += 1
+        sig = signature(question)
+        match = self.index.query(sig)
+        if match is not None and match[0] != question_id:
+            self.global_near_matches += 1
+        self.index.add(question_id, sig)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "checked": self.checked,
+            "session_duplicates": self.session_duplicates,
+            "session_duplicate_rate": round(self.session_duplicates / self.checked, 4) if self.checked else 0.0,
+            "recorded": self.recorded,
+            "global_near_matches": self.global_near_matches,
+            "global_near_match_rate": round(self.global_near_matches / self.recorded, 4) if self.recorded else 0.0,
+            "indexed": len(self.index),
+        }
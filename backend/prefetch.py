@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from models import QuestionResponse, DifficultyLevel
+
+logger = logging.getLogger(__name__)
+
+BranchFactory = Callable[[DifficultyLevel], Awaitable[QuestionResponse]]
+
+
+class _SessionBranches:
+    """In-flight next-question generations for one session, one per difficulty"""
+    __slots__ = ("tasks", "started_at")
+
+    def __init__(self):
+        self.tasks: Dict[DifficultyLevel, asyncio.Task] = {}
+        self.started_at = time.monotonic()
+
+
+class QuestionPrefetcher:
+    """
+    Speculatively generates a session's next question while its answer is evaluated
+
+    Each candidate difficulty branch runs as its own task. Once the real
+    score is known the unused branches are cancelled, and `/next` claims
+    the branch it needs instead of starting a generation from scratch.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_sessions: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionBranches]" = OrderedDict()
+        self.started = 0
+        self.claimed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def start(self, session_id: str, difficulties: Iterable[DifficultyLevel], factory: BranchFactory):
+        """Start generating the given branches, replacing any previous prefetch"""
+        self._expire()
+        self.discard(session_id)
+
+        branches = _SessionBranches()
+        for difficulty in difficulties:
+            branches.tasks[difficulty] = asyncio.create_task(factory(difficulty))
+            self.started += 1
+        if not branches.tasks:
+            return
+
+        self._sessions[session_id] = branches
+        while len(self._sessions) > self.max_sessions:
+            old_session_id = next(iter(self._sessions))
+            self.discard(old_session_id)
+
+    def settle(self, session_id: str, difficulty: DifficultyLevel, factory: BranchFactory):
+        """Keep only the branch the actual score selected, starting it if it was not predicted"""
+        branches = self._sessions.get(session_id)
+        if branches is None:
+            return
+        for other, task in list(branches.tasks.items()):
+            if other != difficulty:
+                self._cancel(task)
+                del branches.tasks[other]
+        if difficulty not in branches.tasks:
+            branches.tasks[difficulty] = asyncio.create_task(factory(difficulty))
+            self.started += 1
+
+    async def claim(self, session_id: str, difficulty: DifficultyLevel) -> Optional[QuestionResponse]:
+        """Await the prefetched question for `difficulty`, if any, and drop the rest
+
+        Returns None when nothing usable was prefetched.
+        """
+        branches = self._sessions.pop(session_id, None)
+        if branches is None:
+            return None
+
+        task = branches.tasks.pop(difficulty, None)
+        for other in branches.tasks.values():
+            self._cancel(other)
+        if task is None:
+            return None
+
+        try:
+            question = await task
+        except asyncio.CancelledError:
+            # Re-raise if our caller is being cancelled; a branch discarded
+            # by a concurrent request just counts as a miss
+            if asyncio.current_task().cancelling():
+                raise
+            return None
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Prefetched question failed for session {session_id}: {str(e)}")
+            return None
+
+        self.claimed += 1
+        return question
+
+    def discard(self, session_id: str):
+        """Cancel every prefetched branch for a session"""
+        branches = self._sessions.pop(session_id, None)
+        if branches:
+            for task in branches.tasks.values():
+                self._cancel(task)
+
+    def stats(self) -> dict:
+        """Prefetch counters"""
+        return {
+            "started": self.started,
+            "claimed": self.claimed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "sessions": len(self._sessions),
+        }
+
+    async def close(self):
+        """Cancel all outstanding prefetches"""
+        tasks = [t for b in self._sessions.values() for t in b.tasks.values() if not t.done()]
+        for session_id in list(self._sessions):
+            self.discard(session_id)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _cancel(self, task: asyncio.Task):
+        if not task.done():
+            task.cancel()
+            self.cancelled += 1
+        elif not task.cancelled() and task.exception() is not None:
+            # Retrieve the exception so asyncio doesn't log it as never retrieved
+            self.failed += 1
+
+    def _expire(self):
+        # Sessions are kept in start order, so abandoned prefetches sit at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            session_id, branches = next(iter(self._sessions.items()))
+            if branches.started_at >= cutoff:
+                break
+            self.discard(session_id)
@@ -0,0 +1,225 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+from models import QuestionResponse, InterviewType, ExperienceLevel, DifficultyLevel
+from question_pool import PoolKey
+from question_registry import make_question_id
+
+logger = logging.getLogger(__name__)
+
+# Random slots probed before falling back to a sequential scan
+RANDOM_PROBES = 8
+
+
+class QuestionBank:
+    """
+    Offline question bank in an indexed SQLite file
+
+    Questions are grouped into buckets by (interview type, experience
+    level, difficulty, role, domain), with role and domain normalized as
+    in the question pool. Within a bucket each question has a dense slot
+    number, so a random question is one random slot and one primary-key
+    lookup. The bucket directory is loaded at open, so selecting never
+    scans. A topic index maps expected topics to questions.
+
+    The serving side opens the file read-only, with reads going through
+    a memory map (`mmap_bytes`). The builder CLI (build_question_bank.py)
+    writes it. Questions are stored once per question id, so rebuilding
+    only adds new ones.
+    """
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS buckets (
+            bucket INTEGER PRIMARY KEY,
+            interview_type TEXT NOT NULL,
+            experience_level TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            role TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            size INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (interview_type, experience_level, difficulty, role, domain)
+        )""",
+        """CREATE TABLE IF NOT EXISTS questions (
+            bucket INTEGER NOT NULL REFERENCES buckets (bucket),
+            slot INTEGER NOT NULL,
+            question_id TEXT NOT NULL UNIQUE,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (bucket, slot)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS question_topics (
+            topic TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            PRIMARY KEY (topic, question_id)
+        ) WITHOUT ROWID""",
+    )
+
+    _SELECT_SLOT = "SELECT question_id, payload FROM questions WHERE bucket = ? AND slot = ?"
+    _SCAN_FROM = "SELECT question_id, payload FROM questions WHERE bucket = ? AND slot >= ? ORDER BY slot"
+
+    def __init__(self, path: str, readonly: bool = True, mmap_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.readonly = readonly
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if not readonly:
+            with self._connection() as conn:
+                for statement in self._SCHEMA:
+                    conn.execute(statement)
+        # PoolKey -> (bucket id, size)
+        self._buckets: Dict[PoolKey, Tuple[int, int]] = self._load_buckets()
+        self.served = 0
+        self.exhausted = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.readonly:
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_bytes)}")
+            self._local.conn = conn
+        return conn
+
+    def _load_buckets(self) -> Dict[PoolKey, Tuple[int, int]]:
+        rows = self._connection().execute(
+            "SELECT bucket, interview_type, experience_level, difficulty, role, domain, size FROM buckets"
+        ).fetchall()
+        return {
+            (InterviewType(t), ExperienceLevel(level), DifficultyLevel(d), role, domain or None): (bucket, size)
+            for bucket, t, level, d, role, domain, size in rows
+        }
+
+    def size(self, key: PoolKey) -> int:
+        """Questions in the bucket for `key`"""
+        entry = self._buckets.get(key)
+        return entry[1] if entry else 0
+
+    def pick(
+        self,
+        key: PoolKey,
+        exclude: Collection[str] = (),
+        rng: Optional[random.Random] = None,
+        rank: Optional[Callable[[str], float]] = None
+    ) -> Optional[QuestionResponse]:
+        """
+        A random question from the bucket for `key` whose id is not in `exclude`
+
+        Probes a few random slots, then scans on from a random slot
+        (wrapping around), so selection stays O(1) until a session has
+        seen most of the bucket. With `rank`, every probe is made and the
+        probed question with the highest rank by id is returned. Returns
+        None if the bucket is missing or exhausted.
+        """
+        entry = self._buckets.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        bucket, size = entry
+        rng = rng or random
+        conn = self._connection()
+
+        best = None
+        for _ in range(min(RANDOM_PROBES, size)):
+            row = conn.execute(self._SELECT_SLOT, (bucket, rng.randrange(size))).fetchone()
+            if row is not None and row[0] not in exclude:
+                if rank is None:
+                    return self._served(row)
+                ranked = (rank(row[0]), row)
+                if best is None or ranked[0] > best[0]:
+                    best = ranked
+        if best is not None:
+            return self._served(best[1])
+
+        start = rng.randrange(size)
+        for low in (start, 0):
+            for question_id, payload in conn.execute(self._SCAN_FROM, (bucket, low)):
+                if question_id not in exclude:
+                    return self._served((question_id, payload))
+        self.exhausted += 1
+        return None
+
+    def _served(self, row: Tuple[str, str]) -> QuestionResponse:
+        self.served += 1
+        question = QuestionResponse.model_validate_json(row[1])
+        question.question_id = row[0]
+        return question
+
+    def question_ids_for_topic(self, topic: str, limit: int = 100) -> List[str]:
+        """Ids of questions expecting `topic` (matched case-insensitively)"""
+        rows = self._connection().execute(
+            "SELECT question_id FROM question_topics WHERE topic = ? LIMIT ?", (topic.strip().lower(), limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def add(self, key: PoolKey, question: QuestionResponse) -> bool:
+        """Store a question under `key`; False if the same question is already banked"""
+        if self.readonly:
+            raise RuntimeError("Question bank was opened read-only")
+        question_id = make_question_id(question.question)
+        payload = question.model_copy(update={"session_id": ""}).model_dump_json(exclude={"question_id"})
+        interview_type, experience_level, difficulty, role, domain = key
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if conn.execute("SELECT 1 FROM questions WHERE question_id = ?", (question_id,)).fetchone():
+                    return False
+                conn.execute(
+                    "INSERT OR IGNORE INTO buckets (interview_type, experience_level, difficulty, role, domain) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (interview_type.value, experience_level.value, difficulty.value, role, domain or ""),
+                )
+                bucket, size = conn.execute(
+                    "SELECT bucket, size FROM buckets WHERE interview_type = ? AND experience_level = ? "
+                    "AND difficulty = ? AND role = ? AND domain = ?",
+                    (interview_type.value, experience_level.value, difficulty.value, role, domain or ""),
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO questions (bucket, slot, question_id, payload) VALUES (?, ?, ?, ?)",
+                    (bucket, size, question_id, payload),
+                )
+                conn.execute("UPDATE buckets SET size = ? WHERE bucket = ?", (size + 1, bucket))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO question_topics (topic, question_id) VALUES (?, ?)",
+                    [(topic.strip().lower(), question_id) for topic in question.expected_topics],
+                )
+            self._buckets[key] = (bucket, size + 1)
+        return True
+
+    def stats(self) -> dict:
+        """Bank size and selection counters"""
+        return {
+            "path": self.path,
+            "buckets": len(self._buckets),
+            "questions": sum(size for _, size in self._buckets.values()),
+            "served": self.served,
+            "exhausted": self.exhausted,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_question_bank() -> Optional[QuestionBank]:
+    """The bank at QUESTION_BANK_PATH, or None when unset or missing"""
+    path = os.getenv("QUESTION_BANK_PATH", "")
+    if not path:
+        return None
+    if not os.path.exists(path):
+        logger.warning(f"Question bank {path} not found; serving generated questions only")
+        return None
+    bank = QuestionBank(path, mmap_bytes=int(os.getenv("QUESTION_BANK_MMAP_BYTES", 64 * 1024 * 1024)))
+    stats = bank.stats()
+    logger.info(f"Question bank loaded: {stats['questions']} questions in {stats['buckets']} buckets")
+    return bank
+
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+from models import (
+    QuestionResponse,
+    InterviewType,
+    ExperienceLevel,
+    DifficultyLevel
+)
+
+logger = logging.getLogger(__name__)
+
+# (interview_type, experience_level, difficulty, role, domain)
+PoolKey = Tuple[InterviewType, ExperienceLevel, DifficultyLevel, str, Optional[str]]
+
+QuestionGenerator = Callable[[PoolKey], Awaitable[QuestionResponse]]
+
+
+def make_pool_key(
+    interview_type: InterviewType,
+    experience_level: ExperienceLevel,
+    difficulty: DifficultyLevel,
+    role: str,
+    domain: Optional[str] = None
+) -> PoolKey:
+    """Build a normalized pool key"""
+    domain_key = domain.strip().lower() if domain and domain.strip() else None
+    return (interview_type, experience_level, difficulty, role.strip().lower(), domain_key)
+
+
+class _PoolSlot:
+    """Pre-generated questions and refill state for a single key"""
+    __slots__ = ("questions", "last_access", "refill_task", "failures")
+
+    def __init__(self):
+        self.questions: Deque[QuestionResponse] = deque()
+        self.last_access = time.monotonic()
+        self.refill_task: Optional[asyncio.Task] = None
+        self.failures = 0
+
+
+class QuestionPool:
+    """
+    Background-filled pool of generated questions, keyed by interview setup
+
+    A key becomes "hot" the first time it is requested. Every hot key is
+    refilled in the background up to `high_watermark` whenever it drops
+    below `low_watermark`. Keys that have not been requested for
+    `idle_ttl_seconds` are evicted together with their pending refill.
+    """
+
+    def __init__(
+        self,
+        generator: QuestionGenerator,
+        low_watermark: int = 2,
+        high_watermark: int = 5,
+        idle_ttl_seconds: float = 900,
+        max_keys: int = 256,
+        max_failures: int = 3
+    ):
+        if low_watermark < 0 or high_watermark < max(low_watermark, 1):
+            raise ValueError("Pool watermarks must satisfy 0 <= low <= high and high >= 1")
+        self._generator = generator
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_keys = max_keys
+        self.max_failures = max_failures
+        self._slots: "OrderedDict[PoolKey, _PoolSlot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.evicted_keys = 0
+        self.refill_errors = 0
+
+    def take(self, key: PoolKey, session_id: str) -> Optional[QuestionResponse]:
+        """Pop a ready question for `key`, or return None on a miss
+
+        Either way the key is marked hot and a refill is scheduled if needed.
+        """
+        self._evict_cold()
+        slot = self._touch(key)
+
+        question = None
+        if slot.questions:
+            self.hits += 1
+            question = slot.questions.popleft().model_copy(update={"session_id": session_id})
+        else:
+            self.misses += 1
+
+        self._maybe_refill(key, slot)
+        return question
+
+    def warm(self, key: PoolKey):
+        """Mark a key hot and start filling it without taking a question"""
+        self._evict_cold()
+        self._maybe_refill(key, self._touch(key))
+
+    def size(self, key: PoolKey) -> int:
+        """Number of ready questions for a key"""
+        slot = self._slots.get(key)
+        return len(slot.questions) if slot else 0
+
+    def reset_failures(self, key: PoolKey):
+        """Allow refills again after a live generation for `key` succeeded"""
+        slot = self._slots.get(key)
+        if slot:
+            slot.failures = 0
+
+    def stats(self) -> dict:
+        """Pool counters"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "generated": self.generated,
+            "refill_errors": self.refill_errors,
+            "evicted_keys": self.evicted_keys,
+            "keys": len(self._slots),
+            "ready_questions": sum(len(s.questions) for s in self._slots.values()),
+            "refilling": sum(1 for s in self._slots.values() if s.refill_task and not s.refill_task.done()),
+        }
+
+    async def close(self):
+        """Cancel all refill tasks and drop pooled questions"""
+        tasks = [s.refill_task for s in self._slots.values() if s.refill_task and not s.refill_task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._slots.clear()
+
+    def _touch(self, key: PoolKey) -> _PoolSlot:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = _PoolSlot()
+            self._slots[key] = slot
+            while len(self._slots) > self.max_keys:
+                old_key, _ = next(iter(self._slots.items()))
+                self._evict(old_key)
+        else:
+            self._slots.move_to_end(key)
+        slot.last_access = time.monotonic()
+        return slot
+
+    def _evict_cold(self):
+        # Slots are kept in access order, so cold keys sit at the front
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        while self._slots:
+            key, slot = next(iter(self._slots.items()))
+            if slot.last_access >= cutoff:
+                break
+            self._evict(key)
+
+    def _evict(self, key: PoolKey):
+        slot = self._slots.pop(key)
+        if slot.refill_task and not slot.refill_task.done():
+            slot.refill_task.cancel()
+        self.evicted_keys += 1
+        logger.info(f"Evicted cold question pool key: {key[0].value}/{key[1].value}/{key[2].value}/{key[3]}")
+
+    def _maybe_refill(self, key: PoolKey, slot: _PoolSlot):
+        if len(slot.questions) >= self.low_watermark and slot.questions:
+            return
+        if slot.refill_task and not slot.refill_task.done():
+            return
+        if slot.failures >= self.max_failures:
+            # Stop hammering the provider for this key until it succeeds live again
+            return
+        slot.refill_task = asyncio.create_task(self._refill(key, slot))
+
+    async def _refill(self, key: PoolKey, slot: _PoolSlot):
+        while len(slot.questions) < self.high_watermark and self._slots.get(key) is slot:
+            try:
+                question = await self._generator(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.refill_errors += 1
+                slot.failures += 1
+                logger.warning(f"Question pool refill failed ({slot.failures}/{self.max_failures}): {str(e)}")
+                if slot.failures >= self.max_failures:
+                    return
+                await asyncio.sleep(min(2 ** slot.failures, 30))
+                continue
+            slot.failures = 0
+            slot.questions.append(question)
+            self.generated += 1
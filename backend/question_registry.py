@@ -0,0 +1,72 @@
+import base64
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from eval_cache import normalize_text
+from models import QuestionResponse
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+
+def make_question_id(question: str) -> str:
+    """Compact content-addressed id: 12 URL-safe characters hashed from the normalized text"""
+    digest = hashlib.blake2b(normalize_text(question).encode("utf-8"), digest_size=9).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+class QuestionRegistry:
+    """
+    Server-side record of every question handed to a client
+
+    Questions are stored once per id in the session store, so the same
+    question served to many sessions is kept once, and answers can refer
+    to it by id. Ids are derived from the normalized text, so they also
+    line up with evaluation cache keys. Registered questions never change,
+    which lets a small in-process LRU serve repeat lookups.
+    """
+
+    def __init__(self, store: SessionStore, cache_size: int = 2048):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, QuestionResponse]" = OrderedDict()
+        self.registered = 0
+        self.lookups = 0
+        self.misses = 0
+
+    def register(self, question: QuestionResponse) -> str:
+        """Register a question (without its session id) and return its id"""
+        question_id = make_question_id(question.question)
+        payload = question.model_copy(update={"session_id": ""}).model_dump_json(exclude={"question_id"})
+        self.store.put_question(question_id, payload)
+        self.registered += 1
+        return question_id
+
+    def get(self, question_id: str) -> Optional[QuestionResponse]:
+        """The registered question, with an empty session id, or None"""
+        self.lookups += 1
+        question = self._cache.get(question_id)
+        if question is None:
+            payload = self.store.get_question(question_id)
+            if payload is None:
+                self.misses += 1
+                return None
+            question = QuestionResponse.model_validate_json(payload)
+            question.question_id = question_id
+            self._cache[question_id] = question
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(question_id)
+        return question.model_copy()
+
+    def stats(self) -> dict:
+        """Registration and lookup counters"""
+        return {
+            "registered": self.registered,
+            "stored": self.store.registered_questions(),
+            "lookups": self.lookups,
+            "misses": self.misses,
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """LLM work priority; lower values are served first"""
+    EVALUATION = 0      # answers in in-progress sessions
+    NEXT_QUESTION = 1   # follow-up questions
+    NEW_SESSION = 2     # first question of a new session
+    PREFETCH = 3        # speculative next questions, ahead of pool refills
+    BACKGROUND = 4      # question pool refills
+
+
+class LLMOverloadedError(Exception):
+    """Raised when LLM work is refused by admission control"""
+
+    def __init__(self, message: str, retry_after: int, status_code: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class LLMScheduler:
+    """
+    Bounded, priority-ordered admission for LLM calls
+
+    At most `max_concurrency` calls run at once. Further callers wait in a
+    priority queue of at most `max_queue_depth` entries (prefetches and
+    background work may only fill `background_queue_depth` of it). A full
+    queue is refused immediately (429), and a caller that waits longer
+    than `max_queue_wait` gives up (503). Both carry a Retry-After
+    estimate derived from the recent service time.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue_depth: int = 100,
+        max_queue_wait: float = 20,
+        background_queue_depth: Optional[int] = None
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.background_queue_depth = (
+            max_queue_depth // 2 if background_queue_depth is None else background_queue_depth
+        )
+        self._active = 0
+        self._waiting = 0
+        self._queue: List[list] = []
+        self._seq = itertools.count()
+        # Exponentially weighted mean of how long a call holds its slot
+        self._service_seconds = 5.0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority):
+        """Hold one concurrency slot for the duration of the block"""
+        await self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_seconds = 0.9 * self._service_seconds + 0.1 * (time.monotonic() - started)
+            self._release()
+
+    async def run(self, priority: Priority, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` once a slot is available"""
+        async with self.slot(priority):
+            return await fn()
+
+    def check_admission(self, priority: Priority):
+        """Raise LLMOverloadedError now if a call at `priority` would be refused"""
+        if self._active < self.max_concurrency and not self._waiting:
+            return
+        if self._waiting >= self._queue_limit(priority):
+            self.rejected_full += 1
+            logger.warning(f"LLM queue full ({self._waiting} waiting); rejecting {priority.name} work")
+            raise LLMOverloadedError("LLM queue is full", self.retry_after(), 429)
+
+    def has_spare_capacity(self) -> bool:
+        """True while a new call would start without queueing"""
+        return self._active < self.max_concurrency and not self._waiting
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = (self._waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._service_seconds))
+
+    def stats(self) -> dict:
+        """Queue and admission counters"""
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_service_seconds": round(self._service_seconds, 3),
+        }
+
+    def _queue_limit(self, priority: Priority) -> int:
+        return self.background_queue_depth if priority >= Priority.PREFETCH else self.max_queue_depth
+
+    async def _acquire(self, priority: Priority):
+        self.check_admission(priority)
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, [int(priority), next(self._seq), future])
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(future, timeout=self.max_queue_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                future.cancel()
+                self._waiting -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                logger.warning(f"{priority.name} work gave up after {self.max_queue_wait}s in the LLM queue")
+                raise LLMOverloadedError("Timed out waiting for LLM capacity", self.retry_after(), 503) from None
+            raise
+        self.admitted += 1
+
+    def _release(self):
+        # Hand the slot straight to the highest-priority live waiter
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self._waiting -= 1
+                future.set_result(None)
+                return
+        self._active -= 1
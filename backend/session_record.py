@@ -0,0 +1,126 @@
+import sys
+import time
+import zlib
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional, Tuple, Union
+
+# Answers at least this long are stored zlib-compressed
+COMPRESS_MIN_CHARS = 200
+
+# Scores are bucketed by tens; 100 falls into the last bucket
+HISTOGRAM_BUCKETS = 10
+
+# (question, answer, score, timestamp); answer is str or zlib-compressed UTF-8
+HistoryEntry = Tuple[str, Union[str, bytes], int, float]
+
+
+def pack_answer(answer: str) -> Union[str, bytes]:
+    """Compress long answers; short ones cost more compressed than plain"""
+    if len(answer) < COMPRESS_MIN_CHARS:
+        return answer
+    packed = zlib.compress(answer.encode("utf-8"), 6)
+    return packed if len(packed) < len(answer) else answer
+
+
+def unpack_answer(packed: Union[str, bytes]) -> str:
+    """Inverse of pack_answer"""
+    if isinstance(packed, bytes):
+        return zlib.decompress(packed).decode("utf-8")
+    return packed
+
+
+def histogram_bucket(score: int) -> int:
+    """Histogram bucket index for a 0-100 score"""
+    return min(score // 10, HISTOGRAM_BUCKETS - 1)
+
+
+class SessionRecord:
+    """
+    Compact interview session
+
+    Keeps running count/sum/min/max and a score histogram so stats never
+    walk the history. Every score is kept as one byte. Q&A history is a ring
+    buffer of the most recent `history_size` answers, holding interned
+    question strings, compressed answers and float timestamps. The ids of
+    the most recent `history_size` questions served, answered or not, are
+    kept alongside.
+    """
+    __slots__ = (
+        "session_id",
+        "interview_type",
+        "role",
+        "experience_level",
+        "domain",
+        "created_ts",
+        "questions_asked",
+        "total_score",
+        "min_score",
+        "max_score",
+        "histogram",
+        "scores",
+        "history",
+        "served",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        interview_type: str,
+        role: str,
+        experience_level: str,
+        domain: Optional[str] = None,
+        created_ts: Optional[float] = None,
+        history_size: int = 50
+    ):
+        self.session_id = session_id
+        self.interview_type = sys.intern(interview_type)
+        self.role = sys.intern(role)
+        self.experience_level = sys.intern(experience_level)
+        self.domain = sys.intern(domain) if domain else None
+        self.created_ts = time.time() if created_ts is None else created_ts
+        self.questions_asked = 0
+        self.total_score = 0
+        self.min_score: Optional[int] = None
+        self.max_score: Optional[int] = None
+        self.histogram = array("I", bytes(4 * HISTOGRAM_BUCKETS))
+        self.scores = array("B")
+        self.history: Deque[HistoryEntry] = deque(maxlen=history_size)
+        self.served: Deque[str] = deque(maxlen=history_size)
+
+    def add_answer(self, score: int, question: str, answer: str, timestamp: Optional[float] = None):
+        """Fold an answered question into the aggregates and history"""
+        self.questions_asked += 1
+        self.total_score += score
+        self.min_score = score if self.min_score is None else min(self.min_score, score)
+        self.max_score = score if self.max_score is None else max(self.max_score, score)
+        self.histogram[histogram_bucket(score)] += 1
+        self.scores.append(score)
+        self.history.append((
+            sys.intern(question),
+            pack_answer(answer),
+            score,
+            time.time() if timestamp is None else timestamp
+        ))
+
+    @property
+    def average_score(self) -> float:
+        return self.total_score / self.questions_asked if self.questions_asked else 0.0
+
+    @property
+    def created_at(self) -> str:
+        return datetime.fromtimestamp(self.created_ts).isoformat()
+
+    def stats(self) -> dict:
+        """Session statistics, computed from the running aggregates"""
+        return {
+            "session_id": self.session_id,
+            "questions_asked": self.questions_asked,
+            "average_score": round(self.average_score, 2),
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "score_histogram": list(self.histogram),
+            "scores": list(self.scores),
+            "created_at": self.created_at,
+        }
@@ -0,0 +1,1015 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from session_record import SessionRecord, pack_answer
+
+logger = logging.getLogger(__name__)
+
+# (score, question, answer, timestamp) for one answered question
+AnswerRecord = Tuple[int, str, str, float]
+
+# (seq, question, answer, score, timestamp) for one retained history entry;
+# seq numbers a session's answers from 0 and answer may be compressed (see unpack_answer)
+HistoryRow = Tuple[int, str, Union[str, bytes], int, float]
+
+# Analytics counters (see analytics.ScoreAnalytics): a started session adds
+# one to each (dimension, group), a scored answer to each (dimension, group, score)
+SessionCount = Tuple[str, str]
+ScoreCount = Tuple[str, str, int]
+
+# Group that counts a dimension's new values once it has max_analytics_groups
+ANALYTICS_OTHER = "other"
+
+
+class IdempotencyRecord(NamedTuple):
+    """A live Idempotency-Key: the request body it is bound to and, once stored, the response"""
+    fingerprint: str
+    response: Optional[str]
+
+
+class SessionStoreBusyError(Exception):
+    """A write could not take the store's lock in time; the client should retry"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SessionFilter(NamedTuple):
+    """Criteria for listing sessions; None matches anything"""
+    interview_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    role: Optional[str] = None
+    created_after: Optional[float] = None
+    created_before: Optional[float] = None
+
+    def matches(self, session: SessionRecord) -> bool:
+        return (
+            (self.interview_type is None or session.interview_type == self.interview_type)
+            and (self.experience_level is None or session.experience_level == self.experience_level)
+            and (self.role is None or session.role.casefold() == self.role.casefold())
+            and (self.created_after is None or session.created_ts >= self.created_after)
+            and (self.created_before is None or session.created_ts < self.created_before)
+        )
+
+
+class SessionStore(ABC):
+    """
+    Storage backend for interview sessions
+
+    Sessions expire `idle_ttl_seconds` after they were last accessed
+    (sliding TTL) and at the latest `max_age_seconds` after creation.
+    When more than `max_sessions` are live, the least recently used are
+    evicted. Expired sessions are removed by `expire()`, which the
+    background sweeper calls periodically. Each session retains the last
+    `history_size` answers.
+
+    The store also keeps the question registry: serialized questions by
+    question id, retained for `max_age_seconds` after they were last
+    registered and capped at `max_questions`.
+
+    It keeps the analytics counters, at most `max_analytics_groups` groups
+    per dimension, written with the session or answers they count.
+
+    And it keeps Idempotency-Keys: a key is claimed by one owner (a worker
+    process) until a deadline, then holds the serialized response until
+    its TTL. At most `max_idempotency_keys` are kept, oldest first out.
+
+    `live_records` tells whether `get` hands out the stored record itself,
+    which `record_answers` updates, or a copy read from storage.
+    `blocking` tells whether calls do I/O that can wait, so that callers
+    may run them off the event loop; stores without it are not thread-safe
+    and must only be called from the loop.
+    """
+
+    live_records = False
+    blocking = False
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float,
+        max_age_seconds: float,
+        max_sessions: int,
+        history_size: int,
+        max_questions: int = 50000,
+        max_idempotency_keys: int = 10000,
+        max_analytics_groups: int = 200
+    ):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_sessions = max_sessions
+        self.history_size = history_size
+        self.max_questions = max_questions
+        self.max_idempotency_keys = max_idempotency_keys
+        self.max_analytics_groups = max_analytics_groups
+        self.expired = 0
+        self.evicted = 0
+        # Writes refused because the lock stayed taken (SQLite only)
+        self.busy = 0
+
+    @abstractmethod
+    def create(self, session: SessionRecord, counts: Sequence[SessionCount] = ()):
+        """Persist a new session, adding it to the analytics `counts`"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        """Return the session, or None
+
+        Counts as an access for the sliding TTL and LRU order.
+        """
+
+    @abstractmethod
+    def record_answers(
+        self,
+        session_id: str,
+        answers: List[AnswerRecord],
+        counts: Sequence[ScoreCount] = ()
+    ) -> bool:
+        """Append answered questions and update the running totals and analytics `counts` in one write
+
+        Returns False if the session does not exist.
+        """
+
+    @abstractmethod
+    def record_served(self, session_id: str, question_id: str) -> bool:
+        """Note a question served to the session, answered or not
+
+        Returns False if the session does not exist.
+        """
+
+    @abstractmethod
+    def history_page(self, session_id: str, start_seq: int, limit: int) -> Optional[List[HistoryRow]]:
+        """Up to `limit` retained history entries from `start_seq` on, oldest first
+
+        Returns None if the session does not exist. Not an access: reading
+        history does not extend the session's TTL.
+        """
+
+    @abstractmethod
+    def sessions_page(self, session_filter: SessionFilter, after_id: str, limit: int) -> List[SessionRecord]:
+        """Up to `limit` live sessions matching the filter with ids above `after_id`, in id order
+
+        Records may come without history (see history_page). Not an access.
+        """
+
+    @abstractmethod
+    def expire(self) -> List[str]:
+        """Remove expired sessions and LRU overflow, returning the removed ids
+
+        Also drops registered questions past their retention.
+        """
+
+    @abstractmethod
+    def live_sessions(self) -> int:
+        """Number of sessions currently stored"""
+
+    @abstractmethod
+    def put_question(self, question_id: str, payload: str):
+        """Register a serialized question; re-registering only renews its retention"""
+
+    @abstractmethod
+    def get_question(self, question_id: str) -> Optional[str]:
+        """Return a registered question's payload, or None"""
+
+    @abstractmethod
+    def registered_questions(self) -> int:
+        """Number of questions currently registered"""
+
+    @abstractmethod
+    def claim_idempotency_key(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        owner: str,
+        expires_ts: float
+    ) -> Optional[IdempotencyRecord]:
+        """Claim a key for `owner` until `expires_ts`; returns None if claimed, else the live record
+
+        A key whose record has expired, be it a stored response past its
+        TTL or a claim its owner never settled, is claimed afresh.
+        """
+
+    @abstractmethod
+    def complete_idempotency_key(self, scope: str, key: str, owner: str, response: str, expires_ts: float) -> bool:
+        """Store the response of a key claimed by `owner`, kept until `expires_ts`
+
+        Returns False if the claim has been lost (expired and claimed again).
+        """
+
+    @abstractmethod
+    def release_idempotency_key(self, scope: str, key: str, owner: str):
+        """Drop a key claimed by `owner` without a response, so it can be claimed again"""
+
+    @abstractmethod
+    def idempotency_keys(self) -> int:
+        """Number of Idempotency-Keys currently stored"""
+
+    @abstractmethod
+    def analytics(self) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int, int]]]:
+        """Every analytics counter: (dimension, group, sessions) and (dimension, group, score, count) rows"""
+
+    def record_answer(
+        self,
+        session_id: str,
+        score: int,
+        question: str,
+        answer: str,
+        timestamp: float,
+        counts: Sequence[ScoreCount] = ()
+    ) -> bool:
+        """Append a single answered question"""
+        return self.record_answers(session_id, [(score, question, answer, timestamp)], counts)
+
+    def stats(self) -> dict:
+        """Session counters"""
+        return {
+            "backend": type(self).__name__,
+            "live_sessions": self.live_sessions(),
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "busy": self.busy,
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "max_age_seconds": self.max_age_seconds,
+            "registered_questions": self.registered_questions(),
+            "idempotency_keys": self.idempotency_keys(),
+        }
+
+    def close(self):
+        """Release any resources held by the store"""
+
+    def _deadline(self, created_ts: float, last_access_ts: float) -> float:
+        return min(created_ts + self.max_age_seconds, last_access_ts + self.idle_ttl_seconds)
+
+
+class _IdempotencyEntry:
+    """One Idempotency-Key in the in-memory store"""
+    __slots__ = ("fingerprint", "owner", "response", "expires_ts")
+
+    def __init__(self, fingerprint: str, owner: str, expires_ts: float):
+        self.fingerprint = fingerprint
+        self.owner = owner
+        self.response: Optional[str] = None
+        self.expires_ts = expires_ts
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local dict store. Only valid with a single worker.
+
+    Sessions are kept in LRU order, and a min-heap of deadlines drives
+    expiry. Accesses only update the session's last-access time. A heap
+    entry found to be stale when popped is pushed back with the session's
+    current deadline, so a sweep only touches sessions that are due.
+    A sorted list of session ids, kept up to date on insert and removal,
+    lets an export page start with a bisect instead of a full scan.
+    Questions and Idempotency-Keys are kept in registration order.
+    """
+
+    live_records = True
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float,
+        max_age_seconds: float,
+        max_sessions: int,
+        history_size: int,
+        max_questions: int = 50000,
+        max_idempotency_keys: int = 10000,
+        max_analytics_groups: int = 200
+    ):
+        super().__init__(
+            idle_ttl_seconds, max_age_seconds, max_sessions, history_size,
+            max_questions, max_idempotency_keys, max_analytics_groups)
+        self.sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self._ids: List[str] = []
+        # question_id -> (payload, registered_ts)
+        self.questions: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.idempotency: "OrderedDict[Tuple[str, str], _IdempotencyEntry]" = OrderedDict()
+        # dimension -> group -> sessions, and dimension -> group -> score -> count
+        self.session_counts: Dict[str, Dict[str, int]] = {}
+        self.score_counts: Dict[str, Dict[str, Dict[int, int]]] = {}
+
+    def create(self, session: SessionRecord, counts: Sequence[SessionCount] = ()):
+        session_id = session.session_id
+        now = time.time()
+        if session_id not in self.sessions:
+            bisect.insort(self._ids, session_id)
+        self.sessions[session_id] = session
+        self._last_access[session_id] = now
+        heapq.heappush(self._deadlines, (self._deadline(session.created_ts, now), session_id))
+        for dimension, group in counts:
+            groups = self.session_counts.setdefault(dimension, {})
+            group = self._analytics_group(groups, group)
+            groups[group] = groups.get(group, 0) + 1
+
+        while len(self.sessions) > self.max_sessions:
+            self._remove(next(iter(self.sessions)))
+            self.evicted += 1
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.time()
+        if self._due(session_id, now):
+            # Due but not swept yet
+            self._remove(session_id)
+            self.expired += 1
+            return None
+        self._last_access[session_id] = now
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def record_answers(
+        self,
+        session_id: str,
+        answers: List[AnswerRecord],
+        counts: Sequence[ScoreCount] = ()
+    ) -> bool:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        for score, question, answer, timestamp in answers:
+            session.add_answer(score, question, answer, timestamp)
+        for dimension, group, score in counts:
+            groups = self.score_counts.setdefault(dimension, {})
+            scores = groups.setdefault(self._analytics_group(groups, group), {})
+            scores[score] = scores.get(score, 0) + 1
+        return True
+
+    def record_served(self, session_id: str, question_id: str) -> bool:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        session.served.append(question_id)
+        return True
+
+    def history_page(self, session_id: str, start_seq: int, limit: int) -> Optional[List[HistoryRow]]:
+        session = self.sessions.get(session_id)
+        if session is None or self._due(session_id, time.time()):
+            return None
+        first_seq = session.questions_asked - len(session.history)
+        start_seq = max(start_seq, first_seq)
+        entries = islice(session.history, start_seq - first_seq, start_seq - first_seq + limit)
+        return [(start_seq + i, *entry) for i, entry in enumerate(entries)]
+
+    def sessions_page(self, session_filter: SessionFilter, after_id: str, limit: int) -> List[SessionRecord]:
+        # Keyset seek: O(log N) to find the start, then ids in order until `limit` match
+        now = time.time()
+        page = []
+        for session_id in islice(self._ids, bisect.bisect_right(self._ids, after_id), None):
+            session = self.sessions[session_id]
+            if session_filter.matches(session) and not self._due(session_id, now):
+                page.append(session)
+                if len(page) == limit:
+                    break
+        return page
+
+    def _due(self, session_id: str, now: float) -> bool:
+        return self._deadline(self.sessions[session_id].created_ts, self._last_access[session_id]) <= now
+
+    def expire(self) -> List[str]:
+        now = time.time()
+        removed = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, session_id = heapq.heappop(self._deadlines)
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue  # already removed
+            deadline = self._deadline(session.created_ts, self._last_access[session_id])
+            if deadline > now:
+                heapq.heappush(self._deadlines, (deadline, session_id))
+                continue
+            self._remove(session_id)
+            self.expired += 1
+            removed.append(session_id)
+
+        # Heap entries of LRU-evicted sessions linger until their deadline; compact if they dominate
+        if len(self._deadlines) > 2 * len(self.sessions) + 64:
+            self._deadlines = [(d, s) for d, s in self._deadlines if s in self.sessions]
+            heapq.heapify(self._deadlines)
+
+        cutoff = now - self.max_age_seconds
+        while self.questions and next(iter(self.questions.values()))[1] <= cutoff:
+            self.questions.popitem(last=False)
+        # Claims settle roughly in claim order; stop at the first live key
+        while self.idempotency and next(iter(self.idempotency.values())).expires_ts <= now:
+            self.idempotency.popitem(last=False)
+        return removed
+
+    def live_sessions(self) -> int:
+        return len(self.sessions)
+
+    def put_question(self, question_id: str, payload: str):
+        entry = self.questions.get(question_id)
+        self.questions[question_id] = (entry[0] if entry else payload, time.time())
+        self.questions.move_to_end(question_id)
+        while len(self.questions) > self.max_questions:
+            self.questions.popitem(last=False)
+
+    def get_question(self, question_id: str) -> Optional[str]:
+        entry = self.questions.get(question_id)
+        return entry[0] if entry else None
+
+    def registered_questions(self) -> int:
+        return len(self.questions)
+
+    def claim_idempotency_key(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        owner: str,
+        expires_ts: float
+    ) -> Optional[IdempotencyRecord]:
+        entry = self.idempotency.get((scope, key))
+        if entry is not None and entry.expires_ts > time.time():
+            return IdempotencyRecord(entry.fingerprint, entry.response)
+        self.idempotency[(scope, key)] = _IdempotencyEntry(fingerprint, owner, expires_ts)
+        self.idempotency.move_to_end((scope, key))
+        while len(self.idempotency) > self.max_idempotency_keys:
+            self.idempotency.popitem(last=False)
+        return None
+
+    def complete_idempotency_key(self, scope: str, key: str, owner: str, response: str, expires_ts: float) -> bool:
+        entry = self.idempotency.get((scope, key))
+        if entry is None or entry.owner != owner or entry.response is not None:
+            return False
+        entry.response = response
+        entry.expires_ts = expires_ts
+        return True
+
+    def release_idempotency_key(self, scope: str, key: str, owner: str):
+        entry = self.idempotency.get((scope, key))
+        if entry is not None and entry.owner == owner and entry.response is None:
+            del self.idempotency[(scope, key)]
+
+    def idempotency_keys(self) -> int:
+        return len(self.idempotency)
+
+    def analytics(self) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int, int]]]:
+        return (
+            [(dimension, group, n) for dimension, groups in self.session_counts.items() for group, n in groups.items()],
+            [
+                (dimension, group, score, n)
+                for dimension, groups in self.score_counts.items()
+                for group, scores in groups.items()
+                for score, n in scores.items()
+            ],
+        )
+
+    def _analytics_group(self, groups: dict, group: str) -> str:
+        if group not in groups and len(groups) >= self.max_analytics_groups:
+            return ANALYTICS_OTHER
+        return group
+
+    def _remove(self, session_id: str):
+        del self.sessions[session_id]
+        del self._last_access[session_id]
+        del self._ids[bisect.bisect_left(self._ids, session_id)]
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite store in WAL mode, shareable between uvicorn worker processes
+
+    Each thread gets its own connection. Statements are fixed strings so
+    sqlite3's statement cache reuses the compiled versions, and every
+    write is a single IMMEDIATE transaction. Expiry deletes a range of the
+    `expires_ts` index; last-access updates are throttled to one write per
+    `touch_interval_seconds` per session. The session cap is enforced by
+    the sweeper rather than on every insert, and so is question retention.
+
+    Calls are synchronous. Made from the event loop, a write waits at
+    most `busy_timeout_ms` for another worker's lock and then raises
+    SessionStoreBusyError, so contention costs one request a retry
+    instead of stalling every request and stream in the worker. Calls
+    from other threads, such as the sweeper, wait up to
+    `background_busy_timeout_ms`.
+
+    Running aggregates live on the session row, with the score histogram
+    and the one-byte-per-score list stored as blobs. History and served
+    question rows beyond `history_size` are trimmed on every write.
+    Analytics counters are upserted in the same transaction as the session
+    or answers they count.
+
+    Idempotency-Keys are rows keyed by (scope, key), so every worker sees
+    the same keys: an upsert that only overwrites an expired row claims a
+    key atomically.
+    """
+
+    blocking = True
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            interview_type TEXT NOT NULL,
+            role TEXT NOT NULL,
+            experience_level TEXT NOT NULL,
+            domain TEXT,
+            questions_asked INTEGER NOT NULL DEFAULT 0,
+            total_score INTEGER NOT NULL DEFAULT 0,
+            min_score INTEGER,
+            max_score INTEGER,
+            histogram BLOB NOT NULL,
+            scores BLOB NOT NULL,
+            created_ts REAL NOT NULL,
+            last_access_ts REAL NOT NULL,
+            expires_ts REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires_ts ON sessions (expires_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_last_access_ts ON sessions (last_access_ts)",
+        """CREATE TABLE IF NOT EXISTS history (
+            session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer BLOB NOT NULL,
+            score INTEGER NOT NULL,
+            timestamp REAL NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS served_questions (
+            session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            question_id TEXT NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS questions (
+            question_id TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            registered_ts REAL NOT NULL
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_questions_registered_ts ON questions (registered_ts)",
+        """CREATE TABLE IF NOT EXISTS idempotency_keys (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            response TEXT,
+            created_ts REAL NOT NULL,
+            expires_ts REAL NOT NULL,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_ts ON idempotency_keys (expires_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_ts ON idempotency_keys (created_ts)",
+        """CREATE TABLE IF NOT EXISTS analytics_sessions (
+            dimension TEXT NOT NULL,
+            grp TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, grp)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS analytics_scores (
+            dimension TEXT NOT NULL,
+            grp TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, grp, score)
+        ) WITHOUT ROWID""",
+    )
+
+    _INSERT_SESSION = (
+        "INSERT INTO sessions (session_id, interview_type, role, experience_level, domain, "
+        "questions_asked, total_score, min_score, max_score, histogram, scores, "
+        "created_ts, last_access_ts, expires_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    _SELECT_SESSION = (
+        "SELECT session_id, interview_type, role, experience_level, domain, "
+        "questions_asked, total_score, min_score, max_score, histogram, scores, "
+        "created_ts, last_access_ts "
+        "FROM sessions WHERE session_id = ? AND expires_ts > ?"
+    )
+    _SELECT_HISTORY = (
+        "SELECT question, answer, score, timestamp FROM "
+        "(SELECT * FROM history WHERE session_id = ? ORDER BY seq DESC LIMIT ?) ORDER BY seq"
+    )
+    _SELECT_SERVED = (
+        "SELECT question_id FROM "
+        "(SELECT * FROM served_questions WHERE session_id = ? ORDER BY seq DESC LIMIT ?) ORDER BY seq"
+    )
+    _INSERT_SERVED = (
+        "INSERT INTO served_questions (session_id, seq, question_id) "
+        "SELECT :session_id, COALESCE(MAX(seq) + 1, 0), :question_id "
+        "FROM served_questions WHERE session_id = :session_id RETURNING seq"
+    )
+    _TRIM_SERVED = "DELETE FROM served_questions WHERE session_id = ? AND seq <= ?"
+    _SELECT_HISTORY_PAGE = (
+        "SELECT seq, question, answer, score, timestamp FROM history "
+        "WHERE session_id = ? AND seq >= ? ORDER BY seq LIMIT ?"
+    )
+    _SESSION_EXISTS = "SELECT 1 FROM sessions WHERE session_id = ? AND expires_ts > ?"
+    _SELECT_SESSIONS_PAGE = (
+        "SELECT session_id, interview_type, role, experience_level, domain, "
+        "questions_asked, total_score, min_score, max_score, histogram, scores, "
+        "created_ts, last_access_ts "
+        "FROM sessions WHERE session_id > :after AND expires_ts > :now "
+        "AND (:interview_type IS NULL OR interview_type = :interview_type) "
+        "AND (:experience_level IS NULL OR experience_level = :experience_level) "
+        "AND (:role IS NULL OR role = :role COLLATE NOCASE) "
+        "AND (:created_after IS NULL OR created_ts >= :created_after) "
+        "AND (:created_before IS NULL OR created_ts < :created_before) "
+        "ORDER BY session_id LIMIT :limit"
+    )
+    _TOUCH_SESSION = "UPDATE sessions SET last_access_ts = ?, expires_ts = ? WHERE session_id = ?"
+    _UPDATE_AGGREGATES = (
+        "UPDATE sessions SET questions_asked = ?, total_score = ?, min_score = ?, max_score = ?, "
+        "histogram = ?, scores = ? WHERE session_id = ?"
+    )
+    _INSERT_HISTORY = "INSERT INTO history (session_id, seq, question, answer, score, timestamp) VALUES (?, ?, ?, ?, ?, ?)"
+    _TRIM_HISTORY = "DELETE FROM history WHERE session_id = ? AND seq < ?"
+    _DELETE_EXPIRED = "DELETE FROM sessions WHERE expires_ts <= ? RETURNING session_id"
+    _COUNT_SESSIONS = "SELECT count(*) FROM sessions"
+    _DELETE_LRU = (
+        "DELETE FROM sessions WHERE session_id IN "
+        "(SELECT session_id FROM sessions ORDER BY last_access_ts LIMIT ?) RETURNING session_id"
+    )
+    _UPSERT_QUESTION = (
+        "INSERT INTO questions (question_id, payload, registered_ts) VALUES (?, ?, ?) "
+        "ON CONFLICT (question_id) DO UPDATE SET registered_ts = excluded.registered_ts"
+    )
+    _SELECT_QUESTION = "SELECT payload FROM questions WHERE question_id = ?"
+    _DELETE_OLD_QUESTIONS = "DELETE FROM questions WHERE registered_ts <= ?"
+    _COUNT_QUESTIONS = "SELECT count(*) FROM questions"
+    _DELETE_OLDEST_QUESTIONS = (
+        "DELETE FROM questions WHERE question_id IN "
+        "(SELECT question_id FROM questions ORDER BY registered_ts LIMIT ?)"
+    )
+    # Inserts a new key or takes over an expired one; RETURNING yields a row only if claimed
+    _CLAIM_IDEMPOTENCY_KEY = (
+        "INSERT INTO idempotency_keys (scope, key, fingerprint, owner, response, created_ts, expires_ts) "
+        "VALUES (:scope, :key, :fingerprint, :owner, NULL, :now, :expires_ts) "
+        "ON CONFLICT (scope, key) DO UPDATE SET fingerprint = excluded.fingerprint, owner = excluded.owner, "
+        "response = NULL, created_ts = excluded.created_ts, expires_ts = excluded.expires_ts "
+        "WHERE idempotency_keys.expires_ts <= :now RETURNING owner"
+    )
+    _SELECT_IDEMPOTENCY_KEY = "SELECT fingerprint, response FROM idempotency_keys WHERE scope = ? AND key = ?"
+    _COMPLETE_IDEMPOTENCY_KEY = (
+        "UPDATE idempotency_keys SET response = ?, expires_ts = ? "
+        "WHERE scope = ? AND key = ? AND owner = ? AND response IS NULL"
+    )
+    _RELEASE_IDEMPOTENCY_KEY = (
+        "DELETE FROM idempotency_keys WHERE scope = ? AND key = ? AND owner = ? AND response IS NULL"
+    )
+    _SESSION_GROUP_EXISTS = "SELECT 1 FROM analytics_sessions WHERE dimension = ? AND grp = ?"
+    _COUNT_SESSION_GROUPS = "SELECT count(*) FROM analytics_sessions WHERE dimension = ?"
+    _COUNT_SESSION = (
+        "INSERT INTO analytics_sessions (dimension, grp, count) VALUES (?, ?, 1) "
+        "ON CONFLICT (dimension, grp) DO UPDATE SET count = count + 1"
+    )
+    _SCORE_GROUP_EXISTS = "SELECT 1 FROM analytics_scores WHERE dimension = ? AND grp = ? LIMIT 1"
+    _COUNT_SCORE_GROUPS = "SELECT count(DISTINCT grp) FROM analytics_scores WHERE dimension = ?"
+    _COUNT_SCORE = (
+        "INSERT INTO analytics_scores (dimension, grp, score, count) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT (dimension, grp, score) DO UPDATE SET count = count + 1"
+    )
+    _SELECT_SESSION_COUNTS = "SELECT dimension, grp, count FROM analytics_sessions"
+    _SELECT_SCORE_COUNTS = "SELECT dimension, grp, score, count FROM analytics_scores"
+    _DELETE_EXPIRED_IDEMPOTENCY_KEYS = "DELETE FROM idempotency_keys WHERE expires_ts <= ?"
+    _COUNT_IDEMPOTENCY_KEYS = "SELECT count(*) FROM idempotency_keys"
+    _DELETE_OLDEST_IDEMPOTENCY_KEYS = (
+        "DELETE FROM idempotency_keys WHERE (scope, key) IN "
+        "(SELECT scope, key FROM idempotency_keys ORDER BY created_ts LIMIT ?)"
+    )
+
+    def __init__(
+        self,
+        path: str,
+        idle_ttl_seconds: float,
+        max_age_seconds: float,
+        max_sessions: int,
+        history_size: int,
+        max_questions: int = 50000,
+        max_idempotency_keys: int = 10000,
+        max_analytics_groups: int = 200,
+        touch_interval_seconds: float = 30,
+        busy_timeout_ms: int = 100,
+        background_busy_timeout_ms: int = 5000
+    ):
+        super().__init__(
+            idle_ttl_seconds, max_age_seconds, max_sessions, history_size,
+            max_questions, max_idempotency_keys, max_analytics_groups)
+        self.path = path
+        self.touch_interval_seconds = touch_interval_seconds
+        self.busy_timeout_ms = busy_timeout_ms
+        self.background_busy_timeout_ms = background_busy_timeout_ms
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+        conn = self._connection()
+        with self._write(conn):
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+        logger.info(f"SQLite session store ready at {path}")
+
+    def create(self, session: SessionRecord, counts: Sequence[SessionCount] = ()):
+        conn = self._connection()
+        with self._write(conn):
+            conn.execute(self._INSERT_SESSION, (
+                session.session_id,
+                session.interview_type,
+                session.role,
+                session.experience_level,
+                session.domain,
+                session.questions_asked,
+                session.total_score,
+                session.min_score,
+                session.max_score,
+                session.histogram.tobytes(),
+                session.scores.tobytes(),
+                session.created_ts,
+                session.created_ts,
+                self._deadline(session.created_ts, session.created_ts),
+            ))
+            for dimension, group in counts:
+                group = self._analytics_group(
+                    conn, self._SESSION_GROUP_EXISTS, self._COUNT_SESSION_GROUPS, dimension, group)
+                conn.execute(self._COUNT_SESSION, (dimension, group))
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        conn = self._connection()
+        now = time.time()
+        # One read transaction so aggregates and history come from the same snapshot
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute(self._SELECT_SESSION, (session_id, now)).fetchone()
+            history_rows = conn.execute(
+                self._SELECT_HISTORY, (session_id, self.history_size)).fetchall() if row else []
+            served_rows = conn.execute(
+                self._SELECT_SERVED, (session_id, self.history_size)).fetchall() if row else []
+        finally:
+            conn.execute("COMMIT")
+        if row is None:
+            return None
+
+        session = self._record_from_row(row)
+        for question, answer, score, timestamp in history_rows:
+            session.history.append((question, answer, score, timestamp))
+        session.served.extend(question_id for question_id, in served_rows)
+
+        if now - row[12] >= self.touch_interval_seconds:
+            try:
+                with self._write(conn):
+                    conn.execute(self._TOUCH_SESSION, (now, self._deadline(session.created_ts, now), session_id))
+            except SessionStoreBusyError:
+                pass  # Renewing the TTL can wait for the next read
+        return session
+
+    def record_answers(
+        self,
+        session_id: str,
+        answers: List[AnswerRecord],
+        counts: Sequence[ScoreCount] = ()
+    ) -> bool:
+        conn = self._connection()
+        with self._write(conn):
+            row = conn.execute(self._SELECT_SESSION, (session_id, time.time())).fetchone()
+            if row is None:
+                return False
+            if not answers:
+                return True
+
+            # Fold the answers into the aggregates, then write them back in one UPDATE
+            session = self._record_from_row(row)
+            first_seq = session.questions_asked
+            for score, question, answer, timestamp in answers:
+                session.add_answer(score, question, answer, timestamp)
+            conn.execute(self._UPDATE_AGGREGATES, (
+                session.questions_asked,
+                session.total_score,
+                session.min_score,
+                session.max_score,
+                session.histogram.tobytes(),
+                session.scores.tobytes(),
+                session_id,
+            ))
+            conn.executemany(self._INSERT_HISTORY, [
+                (session_id, first_seq + i, question, pack_answer(answer), score, timestamp)
+                for i, (score, question, answer, timestamp) in enumerate(answers)
+            ])
+            conn.execute(self._TRIM_HISTORY, (session_id, session.questions_asked - self.history_size))
+            for dimension, group, score in counts:
+                group = self._analytics_group(
+                    conn, self._SCORE_GROUP_EXISTS, self._COUNT_SCORE_GROUPS, dimension, group)
+                conn.execute(self._COUNT_SCORE, (dimension, group, score))
+        return True
+
+    def record_served(self, session_id: str, question_id: str) -> bool:
+        conn = self._connection()
+        with self._write(conn):
+            if conn.execute(self._SESSION_EXISTS, (session_id, time.time())).fetchone() is None:
+                return False
+            seq = conn.execute(self._INSERT_SERVED, {"session_id": session_id, "question_id": question_id}).fetchone()[0]
+            conn.execute(self._TRIM_SERVED, (session_id, seq - self.history_size))
+        return True
+
+    def history_page(self, session_id: str, start_seq: int, limit: int) -> Optional[List[HistoryRow]]:
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            if conn.execute(self._SESSION_EXISTS, (session_id, time.time())).fetchone() is None:
+                return None
+            return conn.execute(self._SELECT_HISTORY_PAGE, (session_id, start_seq, limit)).fetchall()
+        finally:
+            conn.execute("COMMIT")
+
+    def sessions_page(self, session_filter: SessionFilter, after_id: str, limit: int) -> List[SessionRecord]:
+        rows = self._connection().execute(self._SELECT_SESSIONS_PAGE, {
+            **session_filter._asdict(), "after": after_id, "now": time.time(), "limit": limit,
+        }).fetchall()
+        return [self._record_from_row(row) for row in rows]
+
+    def expire(self) -> List[str]:
+        conn = self._connection()
+        now = time.time()
+        with self._write(conn):
+            removed = [row[0] for row in conn.execute(self._DELETE_EXPIRED, (now,)).fetchall()]
+            overflow = conn.execute(self._COUNT_SESSIONS).fetchone()[0] - self.max_sessions
+            evicted = []
+            if overflow > 0:
+                evicted = [row[0] for row in conn.execute(self._DELETE_LRU, (overflow,)).fetchall()]
+
+            conn.execute(self._DELETE_OLD_QUESTIONS, (now - self.max_age_seconds,))
+            overflow = conn.execute(self._COUNT_QUESTIONS).fetchone()[0] - self.max_questions
+            if overflow > 0:
+                conn.execute(self._DELETE_OLDEST_QUESTIONS, (overflow,))
+
+            conn.execute(self._DELETE_EXPIRED_IDEMPOTENCY_KEYS, (now,))
+            overflow = conn.execute(self._COUNT_IDEMPOTENCY_KEYS).fetchone()[0] - self.max_idempotency_keys
+            if overflow > 0:
+                conn.execute(self._DELETE_OLDEST_IDEMPOTENCY_KEYS, (overflow,))
+        self.expired += len(removed)
+        self.evicted += len(evicted)
+        return removed + evicted
+
+    def live_sessions(self) -> int:
+        return self._connection().execute(self._COUNT_SESSIONS).fetchone()[0]
+
+    def put_question(self, question_id: str, payload: str):
+        conn = self._connection()
+        with self._write(conn):
+            conn.execute(self._UPSERT_QUESTION, (question_id, payload, time.time()))
+
+    def get_question(self, question_id: str) -> Optional[str]:
+        row = self._connection().execute(self._SELECT_QUESTION, (question_id,)).fetchone()
+        return row[0] if row else None
+
+    def registered_questions(self) -> int:
+        return self._connection().execute(self._COUNT_QUESTIONS).fetchone()[0]
+
+    def claim_idempotency_key(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        owner: str,
+        expires_ts: float
+    ) -> Optional[IdempotencyRecord]:
+        conn = self._connection()
+        with self._write(conn):
+            claimed = conn.execute(self._CLAIM_IDEMPOTENCY_KEY, {
+                "scope": scope, "key": key, "fingerprint": fingerprint, "owner": owner,
+                "now": time.time(), "expires_ts": expires_ts,
+            }).fetchone()
+            if claimed is not None:
+                return None
+            return IdempotencyRecord(*conn.execute(self._SELECT_IDEMPOTENCY_KEY, (scope, key)).fetchone())
+
+    def complete_idempotency_key(self, scope: str, key: str, owner: str, response: str, expires_ts: float) -> bool:
+        conn = self._connection()
+        with self._write(conn):
+            return conn.execute(self._COMPLETE_IDEMPOTENCY_KEY, (response, expires_ts, scope, key, owner)).rowcount > 0
+
+    def release_idempotency_key(self, scope: str, key: str, owner: str):
+        conn = self._connection()
+        with self._write(conn):
+            conn.execute(self._RELEASE_IDEMPOTENCY_KEY, (scope, key, owner))
+
+    def idempotency_keys(self) -> int:
+        return self._connection().execute(self._COUNT_IDEMPOTENCY_KEYS).fetchone()[0]
+
+    def analytics(self) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int, int]]]:
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            return (
+                conn.execute(self._SELECT_SESSION_COUNTS).fetchall(),
+                conn.execute(self._SELECT_SCORE_COUNTS).fetchall(),
+            )
+        finally:
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+
+    def _analytics_group(self, conn: sqlite3.Connection, exists: str, count_groups: str, dimension: str, group: str) -> str:
+        if conn.execute(exists, (dimension, group)).fetchone() is None:
+            if conn.execute(count_groups, (dimension,)).fetchone()[0] >= self.max_analytics_groups:
+                return ANALYTICS_OTHER
+        return group
+
+    def _record_from_row(self, row: tuple) -> SessionRecord:
+        session = SessionRecord(
+            session_id=row[0],
+            interview_type=row[1],
+            role=row[2],
+            experience_level=row[3],
+            domain=row[4],
+            created_ts=row[11],
+            history_size=self.history_size
+        )
+        session.questions_asked = row[5]
+        session.total_score = row[6]
+        session.min_score = row[7]
+        session.max_score = row[8]
+        session.histogram = array("I", row[9])
+        session.scores = array("B", row[10])
+        return session
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._connections:
+            # Used only by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=64, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            with self._connections_lock:
+                self._connections.add(conn)
+            self._local.conn = conn
+            self._local.busy_timeout_ms = None
+        # The event loop must not block for long; the loop thread can change
+        # between calls (e.g. the schema is created before the loop starts)
+        busy_timeout_ms = self.busy_timeout_ms if _on_event_loop() else self.background_busy_timeout_ms
+        if self._local.busy_timeout_ms != busy_timeout_ms:
+            conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+            self._local.busy_timeout_ms = busy_timeout_ms
+        return conn
+
+    @contextmanager
+    def _write(self, conn: sqlite3.Connection):
+        # IMMEDIATE takes the write lock up front, so concurrent writers in
+        # other workers queue on busy_timeout instead of failing to upgrade
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            self.busy += 1
+            raise SessionStoreBusyError("Session store is busy") from e
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected by SESSION_STORE (memory or sqlite)"""
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+    options = {
+        "idle_ttl_seconds": float(os.getenv("SESSION_IDLE_TTL_SECONDS", 2 * 3600)),
+        "max_age_seconds": float(os.getenv("SESSION_MAX_AGE_HOURS", 24)) * 3600,
+        "max_sessions": int(os.getenv("SESSION_MAX_COUNT", 10000)),
+        "history_size": int(os.getenv("SESSION_HISTORY_SIZE", 50)),
+        "max_questions": int(os.getenv("QUESTION_REGISTRY_MAX", 50000)),
+        "max_idempotency_keys": int(os.getenv("IDEMPOTENCY_MAX_KEYS", 10000)),
+        "max_analytics_groups": int(os.getenv("ANALYTICS_MAX_GROUPS", 200)),
+    }
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            os.getenv("SESSION_DB_PATH", "sessions.db"),
+            busy_timeout_ms=int(os.getenv("SESSION_DB_BUSY_TIMEOUT_MS", 100)),
+            background_busy_timeout_ms=int(os.getenv("SESSION_DB_SWEEP_BUSY_TIMEOUT_MS", 5000)),
+            **options
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+    return InMemorySessionStore(**options)
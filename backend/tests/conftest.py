@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import InMemorySessionStore, SQLiteSessionStore  # noqa: E402
+
+STORE_OPTIONS = {
+    "idle_ttl_seconds": 3600,
+    "max_age_seconds": 24 * 3600,
+    "max_sessions": 100,
+    "history_size": 5,
+    "max_questions": 100,
+    "max_idempotency_keys": 100,
+    "max_analytics_groups": 3,
+}
+
+
+def make_store(backend: str, path: str, **options):
+    options = {**STORE_OPTIONS, **options}
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, **options)
+    return InMemorySessionStore(**options)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_factory(request, tmp_path):
+    """Builds stores of the parametrized backend; SQLite stores built by one test share a file"""
+    stores = []
+
+    def factory(**options):
+        store = make_store(request.param, str(tmp_path / "sessions.db"), **options)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.close()
+
+
+@pytest.fixture
+def store(store_factory):
+    return store_factory()
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from idempotency import IdempotencyConflictError, IdempotencyPendingError, IdempotencyStore
+from session_store import SQLiteSessionStore
+
+
+class Result(BaseModel):
+    value: int
+
+
+class Counter:
+    """An endpoint body that counts its executions"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> Result:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Result(value=self.calls)
+
+
+def test_repeat_replays_stored_response(store):
+    idempotency = IdempotencyStore(store)
+    body = Counter()
+
+    async def scenario():
+        first = await idempotency.run("start", "key", "fp", Result, body)
+        again = await idempotency.run("start", "key", "fp", Result, body)
+        other_scope = await idempotency.run("next", "key", "fp", Result, body)
+        return first, again, other_scope
+
+    first, again, other_scope = asyncio.run(scenario())
+    assert first == (Result(value=1), False)
+    assert again == (Result(value=1), True)
+    assert other_scope == (Result(value=2), False)
+    assert body.calls == 2
+    assert store.idempotency_keys() == 2
+
+
+def test_concurrent_repeat_attaches_to_running_call(store):
+    idempotency = IdempotencyStore(store)
+    body = Counter(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(idempotency.run("answer", "key", "fp", Result, body) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert body.calls == 1
+    assert [replayed for _, replayed in results] == [False, True, True]
+    assert idempotency.stats()["attached"] == 2
+
+
+def test_reusing_key_for_another_body_conflicts(store):
+    idempotency = IdempotencyStore(store)
+
+    async def scenario():
+        await idempotency.run("answer", "key", "fp", Result, Counter())
+        await idempotency.run("answer", "key", "other", Result, Counter())
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(scenario())
+
+
+def test_failed_call_releases_key(store):
+    idempotency = IdempotencyStore(store)
+    body = Counter()
+
+    async def fail() -> Result:
+        raise RuntimeError("LLM down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await idempotency.run("answer", "key", "fp", Result, fail)
+        return await idempotency.run("answer", "key", "fp", Result, body)
+
+    assert asyncio.run(scenario()) == (Result(value=1), False)
+
+
+def test_expired_claim_is_taken_over(store):
+    # A worker claimed the key and died before settling it
+    store.claim_idempotency_key("next", "key", "fp", "dead-worker", time.time() - 1)
+    idempotency = IdempotencyStore(store)
+    body = Counter()
+
+    assert asyncio.run(idempotency.run("next", "key", "fp", Result, body)) == (Result(value=1), False)
+    assert body.calls == 1
+
+
+def test_live_claim_is_not_taken_over(store):
+    assert store.claim_idempotency_key("next", "key", "fp", "worker-1", time.time() + 60) is None
+    record = store.claim_idempotency_key("next", "key", "fp", "worker-2", time.time() + 60)
+    assert record.fingerprint == "fp" and record.response is None
+    # Only the owner settles its claim
+    assert not store.complete_idempotency_key("next", "key", "worker-2", "{}", time.time() + 60)
+    store.release_idempotency_key("next", "key", "worker-2")
+    assert store.complete_idempotency_key("next", "key", "worker-1", '{"value": 7}', time.time() + 60)
+    assert store.claim_idempotency_key("next", "key", "fp", "worker-2", time.time() + 60).response == '{"value": 7}'
+
+
+def test_stored_response_expires(store):
+    idempotency = IdempotencyStore(store, ttl_seconds=-1)
+    body = Counter()
+
+    async def scenario():
+        await idempotency.run("start", "key", "fp", Result, body)
+        return await idempotency.run("start", "key", "fp", Result, body)
+
+    assert asyncio.run(scenario()) == (Result(value=2), False)
+    store.expire()
+    assert store.idempotency_keys() == 0
+
+
+def sqlite_workers(tmp_path, **options):
+    """Two workers' idempotency stores over one SQLite database"""
+    path = str(tmp_path / "sessions.db")
+    return [
+        IdempotencyStore(
+            SQLiteSessionStore(path, idle_ttl_seconds=3600, max_age_seconds=3600, max_sessions=10, history_size=5),
+            poll_interval_seconds=0.01,
+            **options
+        )
+        for _ in range(2)
+    ]
+
+
+def test_retry_on_another_worker_waits_for_the_response(tmp_path):
+    first, second = sqlite_workers(tmp_path)
+    body = Counter(delay=0.1)
+
+    async def scenario():
+        return await asyncio.gather(
+            first.run("start", "key", "fp", Result, body),
+            second.run("start", "key", "fp", Result, body),
+        )
+
+    try:
+        assert asyncio.run(scenario()) == [(Result(value=1), False), (Result(value=1), True)]
+        assert body.calls == 1
+        assert second.stats()["waited"] == 1
+    finally:
+        first.store.close()
+        second.store.close()
+
+
+def test_retry_on_another_worker_gives_up_while_original_runs(tmp_path):
+    first, second = sqlite_workers(tmp_path, max_wait_seconds=0.05)
+    body = Counter(delay=0.5)
+
+    async def scenario():
+        running = asyncio.ensure_future(first.run("start", "key", "fp", Result, body))
+        await asyncio.sleep(0.01)
+        with pytest.raises(IdempotencyPendingError):
+            await second.run("start", "key", "fp", Result, body)
+        return await running
+
+    try:
+        assert asyncio.run(scenario()) == (Result(value=1), False)
+        assert body.calls == 1
+    finally:
+        first.store.close()
+        second.store.close()
@@ -0,0 +1,126 @@
+import time
+
+from session_record import SessionRecord, unpack_answer
+from session_store import ANALYTICS_OTHER, SessionFilter, SQLiteSessionStore
+
+
+def new_session(store, session_id, interview_type="technical", role="Engineer", created_ts=None, counts=()):
+    store.create(SessionRecord(
+        session_id=session_id,
+        interview_type=interview_type,
+        role=role,
+        experience_level="senior",
+        created_ts=created_ts,
+        history_size=store.history_size
+    ), counts)
+
+
+def test_create_and_get(store):
+    new_session(store, "s1", role="Backend Engineer")
+    session = store.get("s1")
+    assert session.session_id == "s1"
+    assert session.role == "Backend Engineer"
+    assert session.questions_asked == 0
+    assert store.get("missing") is None
+    assert store.live_sessions() == 1
+
+
+def test_record_answers_updates_aggregates_and_trims_history(store):
+    new_session(store, "s1")
+    now = time.time()
+    assert store.record_answers("s1", [(score, f"q{score}", f"answer {score}", now) for score in range(10, 80, 10)])
+    assert store.record_answer("s1", 95, "last", "final answer", now)
+    assert not store.record_answer("missing", 50, "q", "a", now)
+
+    session = store.get("s1")
+    assert session.questions_asked == 8
+    assert session.total_score == sum(range(10, 80, 10)) + 95
+    assert (session.min_score, session.max_score) == (10, 95)
+    assert list(session.scores) == [10, 20, 30, 40, 50, 60, 70, 95]
+    # Only the last history_size answers are retained
+    assert [question for question, _, _, _ in session.history] == ["q40", "q50", "q60", "q70", "last"]
+
+    rows = store.history_page("s1", 0, 2)
+    assert [(seq, question, unpack_answer(answer)) for seq, question, answer, _, _ in rows] == [
+        (3, "q40", "answer 40"), (4, "q50", "answer 50")]
+    assert store.history_page("missing", 0, 2) is None
+
+
+def test_record_served_keeps_the_latest(store):
+    new_session(store, "s1")
+    for i in range(8):
+        assert store.record_served("s1", f"id{i}")
+    assert not store.record_served("missing", "id")
+    assert list(store.get("s1").served) == ["id3", "id4", "id5", "id6", "id7"]
+
+
+def test_sessions_page_walks_matching_sessions_in_id_order(store):
+    for i in range(12):
+        new_session(store, f"s{i:02d}", interview_type="technical" if i % 3 else "behavioral")
+    session_filter = SessionFilter(interview_type="technical")
+    seen, after_id = [], ""
+    while True:
+        page = store.sessions_page(session_filter, after_id, 3)
+        if not page:
+            break
+        seen.extend(session.session_id for session in page)
+        after_id = page[-1].session_id
+    assert seen == [f"s{i:02d}" for i in range(12) if i % 3]
+
+
+def test_expire_removes_sessions_past_max_age(store):
+    new_session(store, "old", created_ts=time.time() - store.max_age_seconds - 1)
+    new_session(store, "new")
+    assert store.get("old") is None
+    store.expire()
+    assert store.live_sessions() == 1
+    assert store.sessions_page(SessionFilter(), "", 10)[0].session_id == "new"
+
+
+def test_expire_evicts_least_recently_used_over_the_cap(store_factory):
+    store = store_factory(max_sessions=3)
+    for i in range(5):
+        new_session(store, f"s{i}")
+    store.expire()
+    assert store.live_sessions() == 3
+    assert store.get("s4") is not None
+
+
+def test_question_registry(store):
+    store.put_question("q1", '{"question": "first"}')
+    store.put_question("q1", '{"question": "changed"}')
+    assert store.get_question("q1") == '{"question": "first"}'
+    assert store.get_question("missing") is None
+    assert store.registered_questions() == 1
+
+
+def test_analytics_counts_cap_groups(store):
+    for i, role in enumerate(["a", "b", "c", "d", "e"]):
+        new_session(store, f"s{i}", counts=[("all", ""), ("role", role)])
+        store.record_answer(f"s{i}", 50 + i, "q", "answer", time.time(), [("role", role, 50 + i)])
+    # Counts for a session that does not exist are not written
+    store.record_answer("missing", 10, "q", "answer", time.time(), [("role", "a", 10)])
+
+    sessions, scores = store.analytics()
+    assert sorted(sessions) == [
+        ("all", "", 5), ("role", "a", 1), ("role", "b", 1), ("role", "c", 1), ("role", ANALYTICS_OTHER, 2)]
+    assert sorted(scores) == [
+        ("role", "a", 50, 1), ("role", "b", 51, 1), ("role", "c", 52, 1),
+        ("role", ANALYTICS_OTHER, 53, 1), ("role", ANALYTICS_OTHER, 54, 1)]
+
+
+def test_sqlite_stores_share_state(tmp_path):
+    # Two workers' stores on one database
+    path = str(tmp_path / "shared.db")
+    first, second = (
+        SQLiteSessionStore(path, idle_ttl_seconds=3600, max_age_seconds=3600, max_sessions=10, history_size=5)
+        for _ in range(2)
+    )
+    try:
+        new_session(first, "s1", counts=[("all", "")])
+        second.record_answer("s1", 70, "q", "answer", time.time(), [("all", "", 70)])
+        assert first.get("s1").questions_asked == 1
+        assert first.analytics() == second.analytics() == ([("all", "", 1)], [("all", "", 70, 1)])
+    finally:
+        first.close()
+        second.close()
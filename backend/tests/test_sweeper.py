@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+
+import utils
+from session_record import SessionRecord
+from session_store import SessionFilter, SessionStoreBusyError
+
+SESSIONS_PER_CLIENT = 200
+
+
+async def client(store, name: str) -> int:
+    """Requests creating, reading, paging and answering short-lived sessions"""
+    busy = 0
+    for i in range(SESSIONS_PER_CLIENT):
+        session_id = f"{name}-{i}"
+        try:
+            store.create(SessionRecord(
+                session_id=session_id,
+                interview_type="technical",
+                role="Engineer",
+                experience_level="senior",
+                history_size=store.history_size
+            ), [("all", "")])
+            store.get(session_id)
+            store.record_answers(session_id, [(70, "q", "answer", time.time())], [("all", "", 70)])
+            store.record_served(session_id, f"question-{i}")
+            store.sessions_page(SessionFilter(), "", 10)
+        except SessionStoreBusyError:
+            busy += 1
+        await asyncio.sleep(0)
+    return busy
+
+
+def test_sweep_runs_alongside_requests(store_factory, monkeypatch, caplog):
+    # Creates evict over the cap while sweeps expire idle sessions
+    store = store_factory(idle_ttl_seconds=0.01, max_sessions=20)
+    monkeypatch.setattr(utils, "session_store", store)
+    sweep_threads = set()
+    expire = store.expire
+
+    def recording_expire():
+        sweep_threads.add(threading.get_ident())
+        return expire()
+
+    monkeypatch.setattr(store, "expire", recording_expire)
+    # Switch threads often so a sweep on another thread interleaves with requests
+    loop_threads = set()
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    async def scenario():
+        loop_threads.add(threading.get_ident())
+        sweeper = asyncio.ensure_future(utils.run_session_sweeper(0))
+        try:
+            return await asyncio.gather(*(client(store, f"client{n}") for n in range(4)))
+        finally:
+            sweeper.cancel()
+            try:
+                await sweeper
+            except asyncio.CancelledError:
+                pass
+
+    try:
+        with caplog.at_level(logging.ERROR, logger=utils.logger.name):
+            busy = asyncio.run(scenario())
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert sweep_threads
+    # Only a store that can block is swept off the loop; the in-memory store has no lock
+    assert sweep_threads.isdisjoint(loop_threads) if store.blocking else sweep_threads == loop_threads
+    assert not [record.getMessage() for record in caplog.records if "Session sweep failed" in record.getMessage()]
+    # Sessions were swept while the clients ran
+    assert store.live_sessions() < 4 * SESSIONS_PER_CLIENT - sum(busy)
+    rows, _ = store.analytics()
+    assert sum(count for dimension, _, count in rows if dimension == "all") == 4 * SESSIONS_PER_CLIENT - sum(busy)
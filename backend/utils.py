@@ -1,84 +1,312 @@
+import asyncio
+import base64
+import json
+import os
+import zlib
 import uuid
 import logging
+import time
 from datetime import datetime
-from typing import Dict
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from adaptive import AbilityEstimate, AnsweredItem, create_adaptive_difficulty
+from analytics import Cohort, ScoreAnalytics
+from metrics import session_store_duration
+from models import DifficultyLevel, QuestionResponse
+from question_registry import QuestionRegistry, make_question_id
+from session_record import SessionRecord, unpack_answer
+from session_store import HistoryRow, SessionFilter, SessionStore, create_session_store
 
 logger = logging.getLogger(__name__)
 
-# In-memory session storage (use Redis/DB in production)
-sessions: Dict[str, dict] = {}
+# Session storage backend, selected by SESSION_STORE (memory or sqlite)
+session_store: SessionStore = create_session_store()
+
+# Questions served to clients, by question_id; persisted in the session store
+question_registry = QuestionRegistry(session_store)
+
+# Cross-session score aggregates, counted in the session store as answers are scored
+score_analytics = ScoreAnalytics(session_store)
+
+# Per-session ability estimates and calibrated question difficulties; None when disabled
+adaptive_difficulty = create_adaptive_difficulty()
 
 def generate_session_id() -> str:
     """Generate unique session ID"""
     return str(uuid.uuid4())
 
-def create_session(interview_type: str, role: str, experience_level: str) -> str:
+def create_session(interview_type: str, role: str, experience_level: str, domain: Optional[str] = None) -> str:
     """Create new interview session"""
     session_id = generate_session_id()
-    sessions[session_id] = {
-        "session_id": session_id,
-        "interview_type": interview_type,
-        "role": role,
-        "experience_level": experience_level,
-        "questions_asked": 0,
-        "total_score": 0,
-        "scores": [],
-        "created_at": datetime.now().isoformat(),
-        "history": []
-    }
+    with session_store_duration.time("create"):
+        session_store.create(SessionRecord(
+            session_id=session_id,
+            interview_type=interview_type,
+            role=role,
+            experience_level=experience_level,
+            domain=domain,
+            history_size=session_store.history_size
+        ), score_analytics.session_counts(interview_type, experience_level, role))
     logger.info(f"Created session: {session_id}")
     return session_id
 
-def get_session(session_id: str) -> dict:
+def get_session(session_id: str) -> Optional[SessionRecord]:
     """Get session data"""
-    return sessions.get(session_id)
+    with session_store_duration.time("get"):
+        return session_store.get(session_id)
 
-def update_session_score(session_id: str, score: int, question: str, answer: str):
+def update_session_score(session: SessionRecord, score: int, question: str, answer: str):
     """Update session with new Q&A and score"""
-    if session_id in sessions:
-        session = sessions[session_id]
-        session["questions_asked"] += 1
-        session["total_score"] += score
-        session["scores"].append(score)
-        session["history"].append({
-            "question": question,
-            "answer": answer,
-            "score": score,
-            "timestamp": datetime.now().isoformat()
-        })
-        logger.info(f"Session {session_id} updated. Score: {score}")
-
-def get_session_stats(session_id: str) -> dict:
+    now = time.time()
+    ability = session_ability(session)
+    counts = score_analytics.score_counts(session_cohort(session), [(question_difficulty(question), score)])
+    with session_store_duration.time("record_answers"):
+        recorded = session_store.record_answer(session.session_id, score, question, answer, now, counts)
+    if recorded:
+        if not session_store.live_records:
+            # Keep the caller's copy current, e.g. a session pinned to a WebSocket
+            session.add_answer(score, question, answer, now)
+        if ability is not None:
+            adaptive_difficulty.observe(session.session_id, ability, *answered_item(question), score)
+        logger.info(f"Session {session.session_id} updated. Score: {score}")
+
+def update_session_scores(session: SessionRecord, answers: List[Tuple[int, str, str]]):
+    """Record several (score, question, answer) results in one write"""
+    now = time.time()
+    ability = session_ability(session)
+    counts = score_analytics.score_counts(
+        session_cohort(session), [(question_difficulty(question), score) for score, question, _ in answers])
+    with session_store_duration.time("record_answers"):
+        recorded = session_store.record_answers(
+            session.session_id, [(score, question, answer, now) for score, question, answer in answers], counts)
+    if recorded:
+        if not session_store.live_records:
+            for score, question, answer in answers:
+                session.add_answer(score, question, answer, now)
+        if ability is not None:
+            for score, question, _ in answers:
+                ability = adaptive_difficulty.observe(session.session_id, ability, *answered_item(question), score)
+        logger.info(f"Session {session.session_id} updated with {len(answers)} answers")
+
+def session_cohort(session: SessionRecord) -> Cohort:
+    """(interview_type, experience_level, role) the session's scores are aggregated under"""
+    return session.interview_type, session.experience_level, session.role
+
+def question_difficulty(question: str) -> Optional[str]:
+    """Difficulty the question was served at, or None if it was not served by this API"""
+    registered = question_registry.get(make_question_id(question))
+    return registered.difficulty.value if registered else None
+
+def answered_item(question: str) -> Tuple[Optional[str], Optional[DifficultyLevel]]:
+    """(question_id, difficulty) of a question served by this API, else (None, None)"""
+    registered = question_registry.get(make_question_id(question))
+    return (registered.question_id, registered.difficulty) if registered else (None, None)
+
+def _answered_items(session: SessionRecord) -> Iterator[AnsweredItem]:
+    # Scores older than the retained history count as unknown questions
+    older = len(session.scores) - len(session.history)
+    for score in session.scores[:older]:
+        yield None, None, score
+    for question, _, score, _ in session.history:
+        yield (*answered_item(question), score)
+
+def session_ability(session: SessionRecord) -> Optional[AbilityEstimate]:
+    """
+    The session's ability estimate, or None when adaptive difficulty is off
+
+    Kept current as answers are recorded; rebuilt from the session's
+    scores when this process has not seen its latest answer.
+    """
+    if adaptive_difficulty is None:
+        return None
+    return adaptive_difficulty.estimate(session.session_id, len(session.scores), lambda: _answered_items(session))
+
+def next_difficulty(session: SessionRecord) -> Optional[DifficultyLevel]:
+    """The most informative difficulty for the session's next question, or None when adaptive difficulty is off"""
+    ability = session_ability(session)
+    return adaptive_difficulty.next_difficulty(ability) if ability is not None else None
+
+def bank_question_rank(session: SessionRecord) -> Optional[Callable[[str], float]]:
+    """Ranks bank questions by information for the session's next question, or None when adaptive difficulty is off"""
+    ability = session_ability(session)
+    if ability is None:
+        return None
+    return adaptive_difficulty.item_ranker(ability, adaptive_difficulty.next_difficulty(ability))
+
+def likely_difficulties(session: SessionRecord, question: str) -> Optional[List[DifficultyLevel]]:
+    """The difficulties most likely to follow the pending answer to `question`, for prefetching"""
+    ability = session_ability(session)
+    if ability is None:
+        return None
+    return adaptive_difficulty.likely_difficulties(ability, *answered_item(question))
+
+def difficulty_after(session: SessionRecord, question: str, score: int) -> Optional[DifficultyLevel]:
+    """The difficulty that will follow this score, computed before it is recorded"""
+    ability = session_ability(session)
+    if ability is None:
+        return None
+    return adaptive_difficulty.difficulty_after(ability, *answered_item(question), score)
+
+def register_question(question: QuestionResponse, session: Optional[SessionRecord] = None) -> QuestionResponse:
+    """
+    Register a question before it is sent to the client and stamp its question_id
+
+    Also notes it as served to its session, so it is not served again as a
+    near duplicate even if it is never answered. `session` is the caller's
+    copy of that session, kept current like update_session_score does.
+    """
+    with session_store_duration.time("put_question"):
+        question.question_id = question_registry.register(question)
+    if question.session_id:
+        with session_store_duration.time("record_served"):
+            recorded = session_store.record_served(question.session_id, question.question_id)
+        if recorded and session is not None and not session_store.live_records:
+            session.served.append(question.question_id)
+    return question
+
+def get_registered_question(question_id: str) -> Optional[QuestionResponse]:
+    """Look up a question previously sent to a client"""
+    with session_store_duration.time("get_question"):
+        return question_registry.get(question_id)
+
+def seen_questions(session: SessionRecord) -> list[str]:
+    """The questions answered in or served to a session, as far as they are retained"""
+    questions = {make_question_id(question): question for question, *_ in session.history}
+    for question_id in session.served:
+        if question_id not in questions:
+            registered = get_registered_question(question_id)
+            if registered is not None:
+                questions[question_id] = registered.question
+    return list(questions.values())
+
+def get_session_stats(session_id: str) -> Optional[dict]:
     """Get session statistics"""
-    session = sessions.get(session_id)
+    session = get_session(session_id)
     if not session:
         return None
     
-    questions_asked = session["questions_asked"]
-    avg_score = session["total_score"] / questions_asked if questions_asked > 0 else 0
-    
+    return session_stats(session)
+
+def session_stats(session: SessionRecord) -> dict:
+    """A session's statistics, with its ability estimate when adaptive difficulty is on"""
+    stats = session.stats()
+    ability = session_ability(session)
+    if ability is not None:
+        stats["ability"] = adaptive_difficulty.summary(ability)
+    return stats
+
+def encode_cursor(position: dict) -> str:
+    """Opaque pagination cursor for a position"""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
+
+def history_item(row: HistoryRow) -> dict:
+    """A history entry as returned by the API"""
+    seq, question, answer, score, timestamp = row
+    return {
+        "seq": seq,
+        "question": question,
+        "answer": unpack_answer(answer),
+        "score": score,
+        "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+    }
+
+def get_session_history(session_id: str, cursor: Optional[str], limit: int) -> Optional[dict]:
+    """One page of a session's retained history, oldest first, or None if the session does not exist"""
+    start_seq = int(decode_cursor(cursor).get("seq", 0)) if cursor else 0
+    with session_store_duration.time("history_page"):
+        rows = session_store.history_page(session_id, start_seq, limit + 1)
+    if rows is None:
+        return None
     return {
         "session_id": session_id,
-        "questions_asked": questions_asked,
-        "average_score": round(avg_score, 2),
-        "scores": session["scores"],
-        "created_at": session["created_at"]
+        "items": [history_item(row) for row in rows[:limit]],
+        "next_cursor": encode_cursor({"seq": rows[limit][0]}) if len(rows) > limit else None,
     }
 
-def cleanup_old_sessions(max_age_hours: int = 24):
-    """Remove sessions older than max_age_hours"""
-    # Simple cleanup - in production use proper job scheduler
-    current_time = datetime.now()
-    to_remove = []
-    
-    for session_id, session in sessions.items():
-        created_at = datetime.fromisoformat(session["created_at"])
-        age_hours = (current_time - created_at).total_seconds() / 3600
-        if age_hours > max_age_hours:
-            to_remove.append(session_id)
+async def export_history(
+    session_filter: SessionFilter,
+    session_id: Optional[str] = None,
+    page_size: int = 100
+) -> AsyncIterator[str]:
+    """
+    NDJSON export of retained history: one line per answer, with its session's settings
+
+    Covers one session, or every live session matching the filter in id
+    order. Sessions and their history are read a page at a time, so
+    memory stays constant however many sessions are stored.
+    """
+    after_id = ""
+    while True:
+        if session_id is not None:
+            session = get_session(session_id)
+            sessions = [session] if session else []
+        else:
+            with session_store_duration.time("sessions_page"):
+                sessions = session_store.sessions_page(session_filter, after_id, page_size)
+        for session in sessions:
+            meta = {
+                "session_id": session.session_id,
+                "interview_type": session.interview_type,
+                "role": session.role,
+                "experience_level": session.experience_level,
+                "domain": session.domain,
+            }
+            start_seq = 0
+            while True:
+                rows = session_store.history_page(session.session_id, start_seq, page_size)
+                if not rows:
+                    break
+                yield "".join(json.dumps({**meta, **history_item(row)}) + "\n" for row in rows)
+                start_seq = rows[-1][0] + 1
+                # Let other requests run between pages
+                await asyncio.sleep(0)
+        if session_id is not None or len(sessions) < page_size:
+            return
+        after_id = sessions[-1].session_id
+
+async def gzip_stream(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Gzip-compress a text stream as it is produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def cleanup_old_sessions() -> int:
+    """Remove expired and LRU-evicted sessions"""
+    with session_store_duration.time("expire"):
+        removed = session_store.expire()
     
-    for session_id in to_remove:
-        del sessions[session_id]
-        logger.info(f"Cleaned up session: {session_id}")
+    if removed:
+        logger.info(f"Cleaned up {len(removed)} sessions")
     
-    return len(to_remove)
+    return len(removed)
+
+async def run_session_sweeper(interval_seconds: float):
+    """Periodically expire sessions until cancelled"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if session_store.blocking:
+                # Off the event loop: a sweep may wait on another worker's write lock
+                await asyncio.to_thread(cleanup_old_sessions)
+            else:
+                # The in-memory store has no lock; it is only safe on the loop
+                cleanup_old_sessions()
+        except Exception as e:
+            logger.error(f"Session sweep failed: {str(e)}")
+
+def format_sse(event: str, data: dict) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
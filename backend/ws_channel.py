@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+from starlette.websockets import WebSocket
+
+from metrics import Counter
+from session_record import SessionRecord
+from utils import get_session, session_store
+
+
+class ChannelClosed(Exception):
+    """The connection can no longer carry messages"""
+
+
+class SlowClientError(ChannelClosed):
+    """The client stopped reading and its outgoing queue stayed full"""
+
+
+class ChannelSender:
+    """
+    Flow-controlled outgoing side of one WebSocket
+
+    Messages are JSON objects `{"type": ..., "data": ...}`, the same event
+    names and payloads as the Server-Sent Events endpoints. They go through
+    a queue of at most `max_pending` messages drained by one writer task.
+    When the client reads slower than messages are produced the queue
+    fills and `send` waits, which slows the producer (e.g. a streaming
+    evaluation) down to the client's pace. If no room frees up within
+    `send_timeout` seconds, SlowClientError is raised.
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int = 32, send_timeout: float = 10.0):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    async def send(self, event: str, data: dict):
+        if self._writer is None or self._writer.done():
+            raise ChannelClosed("connection closed")
+        text = json.dumps({"type": event, "data": data}, default=str)
+        try:
+            await asyncio.wait_for(self._queue.put(text), self.send_timeout)
+        except asyncio.TimeoutError:
+            raise SlowClientError(
+                f"{self.max_pending} messages unread for {self.send_timeout:g}s") from None
+        channel_messages.inc("sent", event)
+
+    async def _write(self):
+        while True:
+            text = await self._queue.get()
+            await self.websocket.send_text(text)
+            self._queue.task_done()
+
+    async def aclose(self, flush_timeout: float = 1.0):
+        """Stop the writer, first giving queued messages a moment to go out"""
+        if self._writer is None:
+            return
+        if not self._writer.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), flush_timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._writer.cancel()
+        try:
+            await self._writer
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+class PinnedSession:
+    """
+    A session held in connection state
+
+    Messages use the held record instead of looking the session up. It is
+    re-read from the store only every quarter of the idle TTL, to renew
+    the TTL. update_session_score keeps the held record current.
+    """
+
+    def __init__(self, session: SessionRecord):
+        self.session: Optional[SessionRecord] = session
+        self._read_at = time.monotonic()
+
+    def get(self) -> Optional[SessionRecord]:
+        """The session, or None if it expired"""
+        if self.session is None:
+            return None
+        if time.monotonic() - self._read_at >= session_store.idle_ttl_seconds / 4:
+            self.session = get_session(self.session.session_id)
+            self._read_at = time.monotonic()
+        return self.session
+
+
+class ConnectionLimiter:
+    """Caps the number of open channel connections"""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.max_connections:
+            channel_disconnects.inc("over_capacity")
+            return False
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+
+channel_messages = Counter(
+    "ws_messages_total", "Interview channel messages by direction and type", ("direction", "type"))
+channel_disconnects = Counter(
+    "ws_disconnects_total", "Interview channel connections ended, by reason", ("reason",))
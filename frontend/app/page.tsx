@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
 import {
     Sparkles,
@@ -45,6 +45,17 @@ export default function Home() {
     const [questionsAsked, setQuestionsAsked] = useState(0)
     const [totalScore, setTotalScore] = useState(0)
 
+    // One Idempotency-Key per pending request, reused when the same request is retried
+    const requestKeys = useRef<Record<string, { payload: string; key: string }>>({})
+    const requestKey = (action: string, payload: unknown) => {
+        const serialized = JSON.stringify(payload)
+        const pending = requestKeys.current[action]
+        if (pending && pending.payload === serialized) return pending.key
+        const key = crypto.randomUUID()
+        requestKeys.current[action] = { payload: serialized, key }
+        return key
+    }
+
     // Timer effect
     useEffect(() => {
         let interval: NodeJS.Timeout
@@ -64,12 +75,14 @@ export default function Home() {
 
         setLoading(true)
         try {
-            const question = await api.startInterview({
+            const request: StartInterviewRequest = {
                 interview_type: interviewType,
                 role: role.trim(),
                 experience_level: experienceLevel,
                 domain: domain.trim() || undefined,
-            })
+            }
+            const question = await api.startInterview(request, requestKey('start', request))
+            delete requestKeys.current.start
 
             setCurrentQuestion(question)
             setSessionId(question.session_id)
@@ -95,11 +108,16 @@ export default function Home() {
         setTimerActive(false)
 
         try {
-            const result = await api.submitAnswer({
+            const request = {
                 session_id: sessionId,
+                question_id: currentQuestion!.question_id,
+                // Used if the id expired or was registered by another worker
                 question: currentQuestion!.question,
+                expected_topics: currentQuestion!.expected_topics,
                 answer: answer.trim(),
-            })
+            }
+            const result = await api.submitAnswer(request, requestKey('answer', request))
+            delete requestKeys.current.answer
 
             setFeedback(result)
             setQuestionsAsked(prev => prev + 1)
@@ -125,7 +143,12 @@ export default function Home() {
     const handleNextQuestion = async () => {
         setLoading(true)
         try {
-            const question = await api.getNextQuestion(sessionId, feedback?.overall_score)
+            const question = await api.getNextQuestion(
+                sessionId,
+                feedback?.overall_score,
+                requestKey('next', [sessionId, feedback?.overall_score])
+            )
+            delete requestKeys.current.next
 
             setCurrentQuestion(question)
             setAnswer('')
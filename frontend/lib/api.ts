@@ -16,12 +16,18 @@ export interface QuestionResponse {
     difficulty: string
     expected_topics: string[]
     time_limit_seconds: number
+    question_id: string
 }
 
 export interface SubmitAnswerRequest {
     session_id: string
-    question: string
+    // Prefer question_id; question text and expected_topics are for clients without one,
+    // and are used if the id is no longer registered
+    question_id?: string
+    question?: string
     answer: string
+    expected_topics?: string[]
+    bypass_cache?: boolean
 }
 
 export interface FeedbackDetail {
@@ -41,12 +47,139 @@ export interface AnswerFeedback {
     follow_up_question?: string
 }
 
+export interface ProvisionalScore {
+    overall_score: number
+    feedback_detail: FeedbackDetail
+    covered_topics: string[]
+    missing_topics: string[]
+}
+
+export interface ProvisionalEvaluation {
+    evaluation_id: string
+    session_id: string
+    status: 'pending' | 'complete' | 'failed'
+    provisional: ProvisionalScore
+    feedback?: AnswerFeedback
+    detail?: string
+}
+
+export type AnswerStreamEvent =
+    | { event: 'provisional'; data: ProvisionalScore }
+    | { event: 'scores'; data: Pick<AnswerFeedback, 'overall_score' | 'feedback_detail'> }
+    | { event: 'strengths'; data: Pick<AnswerFeedback, 'strengths'> }
+    | { event: 'improvements'; data: Pick<AnswerFeedback, 'improvements' | 'missing_topics'> }
+    | { event: 'suggested_answer'; data: { delta: string } }
+    | { event: 'complete'; data: AnswerFeedback & { fallback: boolean } }
+    | { event: 'overloaded'; data: { detail: string; retry_after: number } }
+
+export interface BatchAnswerItem {
+    question_id?: string
+    question?: string
+    answer: string
+    expected_topics?: string[]
+}
+
+export interface BatchAnswerRequest {
+    session_id: string
+    items: BatchAnswerItem[]
+    bypass_cache?: boolean
+}
+
+export type BatchEvent =
+    | { event: 'item'; data: AnswerFeedback & { index: number } }
+    | { event: 'error'; data: { index: number; detail: string; retry_after: number } }
+    | { event: 'complete'; data: { evaluated: number; failed: number; average_score: number | null } }
+
+// Parses a Server-Sent Events body, calling onMessage for every event
+async function readEventStream(
+    body: ReadableStream<Uint8Array>,
+    onMessage: (event: string, data: any) => void
+): Promise<void> {
+    const reader = body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        let boundary = buffer.indexOf('\n\n')
+        while (boundary !== -1) {
+            const block = buffer.slice(0, boundary)
+            buffer = buffer.slice(boundary + 2)
+            boundary = buffer.indexOf('\n\n')
+
+            let event = 'message'
+            let payload = ''
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7)
+                else if (line.startsWith('data: ')) payload += line.slice(6)
+            }
+            onMessage(event, JSON.parse(payload))
+        }
+    }
+}
+
 export interface SessionStats {
     session_id: string
     questions_asked: number
     average_score: number
+    min_score: number | null
+    max_score: number | null
+    score_histogram: number[]
     scores: number[]
     created_at: string
+    ability?: AbilityEstimate
+}
+
+export interface AbilityEstimate {
+    ability: number
+    stderr: number
+    stable: boolean
+    next_difficulty: 'easy' | 'medium' | 'hard'
+}
+
+export type ChannelClientMessage =
+    | ({ type: 'start' } & StartInterviewRequest)
+    | { type: 'resume'; session_id: string }
+    | ({ type: 'answer'; stream?: boolean; next_question?: boolean } & Omit<SubmitAnswerRequest, 'session_id'>)
+    | { type: 'next'; previous_score?: number }
+    | { type: 'stats' }
+    | { type: 'ping' }
+
+// Server messages carry the same events as the answer stream, plus questions and stats
+export type ChannelServerMessage =
+    | { type: 'question'; data: QuestionResponse }
+    | { type: 'stats'; data: SessionStats }
+    | { type: 'pong'; data: {} }
+    | { type: 'error'; data: { detail: string } }
+    | (AnswerStreamEvent extends infer E ? E extends { event: infer T; data: infer D } ? { type: T; data: D } : never : never)
+
+// Runs a whole interview over one WebSocket; send ChannelClientMessage values as JSON
+export function openInterviewChannel(onMessage: (message: ChannelServerMessage) => void): WebSocket {
+    const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/interview`)
+    socket.onmessage = (event) => onMessage(JSON.parse(event.data) as ChannelServerMessage)
+    return socket
+}
+
+export interface HistoryEntry {
+    seq: number
+    question: string
+    answer: string
+    score: number
+    timestamp: string
+}
+
+export interface HistoryPage {
+    session_id: string
+    items: HistoryEntry[]
+    next_cursor: string | null
+}
+
+// Retrying with the same Idempotency-Key replays the original response instead of repeating the work
+function idempotencyHeaders(idempotencyKey?: string) {
+    return idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined
 }
 
 class API {
@@ -58,20 +191,80 @@ class API {
         timeout: 30000, // 30 seconds
     })
 
-    async startInterview(data: StartInterviewRequest): Promise<QuestionResponse> {
-        const response = await this.client.post<QuestionResponse>('/api/interview/start', data)
+    async startInterview(data: StartInterviewRequest, idempotencyKey?: string): Promise<QuestionResponse> {
+        const response = await this.client.post<QuestionResponse>('/api/interview/start', data, {
+            headers: idempotencyHeaders(idempotencyKey),
+        })
         return response.data
     }
 
-    async submitAnswer(data: SubmitAnswerRequest): Promise<AnswerFeedback> {
-        const response = await this.client.post<AnswerFeedback>('/api/interview/answer', data)
+    async submitAnswer(data: SubmitAnswerRequest, idempotencyKey?: string): Promise<AnswerFeedback> {
+        const response = await this.client.post<AnswerFeedback>('/api/interview/answer', data, {
+            headers: idempotencyHeaders(idempotencyKey),
+        })
         return response.data
     }
 
-    async getNextQuestion(session_id: string, previous_score?: number): Promise<QuestionResponse> {
+    // Instant local score; poll getEvaluation for the LLM feedback
+    async submitAnswerProvisional(data: SubmitAnswerRequest): Promise<ProvisionalEvaluation> {
+        const response = await this.client.post<ProvisionalEvaluation>('/api/interview/answer/provisional', data)
+        return response.data
+    }
+
+    async getEvaluation(evaluationId: string): Promise<ProvisionalEvaluation> {
+        const response = await this.client.get<ProvisionalEvaluation>(`/api/interview/evaluations/${evaluationId}`)
+        return response.data
+    }
+
+    // Streams feedback sections as they are produced; resolves with the final validated feedback
+    async submitAnswerStream(
+        data: SubmitAnswerRequest,
+        onEvent: (event: AnswerStreamEvent) => void
+    ): Promise<AnswerFeedback> {
+        const response = await fetch(`${API_URL}/api/interview/answer/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data),
+        })
+        if (!response.ok || !response.body) {
+            throw new Error(`Failed to stream feedback: ${response.status}`)
+        }
+
+        let feedback: AnswerFeedback | null = null
+        await readEventStream(response.body, (event, data) => {
+            const parsed = { event, data } as AnswerStreamEvent
+            if (parsed.event === 'complete') feedback = parsed.data
+            onEvent(parsed)
+        })
+
+        if (!feedback) {
+            throw new Error('Feedback stream ended before completion')
+        }
+        return feedback
+    }
+
+    // Evaluates a whole transcript; items are reported as they finish, in any order
+    async submitAnswerBatch(
+        data: BatchAnswerRequest,
+        onEvent: (event: BatchEvent) => void
+    ): Promise<void> {
+        const response = await fetch(`${API_URL}/api/interview/answer/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data),
+        })
+        if (!response.ok || !response.body) {
+            throw new Error(`Failed to evaluate batch: ${response.status}`)
+        }
+        await readEventStream(response.body, (event, payload) => onEvent({ event, data: payload } as BatchEvent))
+    }
+
+    async getNextQuestion(session_id: string, previous_score?: number, idempotencyKey?: string): Promise<QuestionResponse> {
         const response = await this.client.post<QuestionResponse>('/api/interview/next', {
             session_id,
             previous_score,
+        }, {
+            headers: idempotencyHeaders(idempotencyKey),
         })
         return response.data
     }
@@ -81,6 +274,14 @@ class API {
         return response.data
     }
 
+    // One page of retained history, oldest first; pass next_cursor back for the following page
+    async getSessionHistory(session_id: string, cursor?: string, limit = 20): Promise<HistoryPage> {
+        const response = await this.client.get<HistoryPage>(`/api/interview/history/${session_id}`, {
+            params: { cursor, limit },
+        })
+        return response.data
+    }
+
     async healthCheck(): Promise<{ status: string; agent_ready: boolean }> {
         const response = await this.client.get('/health')
         return response.data